@@ -1,8 +1,81 @@
-from flask import Flask, render_template, request, jsonify
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask, Response, g, render_template, request, jsonify
 from engine import KkokkiEngine
+from core.scheduler import DEFAULT_JOB_ID
+from core.polyline import compact_route
+from core.eventlog import format_event
+from core.metrics import REGISTRY, CONTENT_TYPE, HTTP_LATENCY, HTTP_REQUESTS
+from core.sharedstate import SharedState
+from core.bulkimport import BulkImporter, parse_rows
 
 app = Flask(__name__)
-engine = KkokkiEngine()
+# With KKOKKI_STATE_PATH this process is one of several web workers: monitor_service.py
+# owns the monitors, and job status/events are read from the state it publishes.
+STATE_PATH = os.getenv("KKOKKI_STATE_PATH")
+engine = KkokkiEngine(monitor=not STATE_PATH)
+monitor = SharedState(STATE_PATH) if STATE_PATH else engine
+# One TMAP rate budget shared by every import this process runs
+importer = BulkImporter(
+    engine, rate=float(os.getenv("KKOKKI_IMPORT_RATE", "5")),
+    workers=int(os.getenv("KKOKKI_IMPORT_WORKERS", "8")),
+    register=(lambda **job: monitor.submit("start", **job)) if STATE_PATH else None)
+
+GZIP_MIN_BYTES = 1024
+JOB_STATUSES = ("INITIALIZING", "MONITORING", "LATE_RISK", "ERROR", "LOCATION_ERROR", "STANDBY")
+
+
+def _job_status_counts():
+    counts = {(status,): 0 for status in JOB_STATUSES}
+    if STATE_PATH:
+        statuses = [status for status, _ in monitor.job_statuses()]
+    else:
+        statuses = [job.status for job in engine.scheduler.jobs()]
+    for status in statuses:
+        counts[(status,)] = counts.get((status,), 0) + 1
+    return counts
+
+
+REGISTRY.gauge("kkokki_active_jobs", "Commutes currently being monitored.",
+               callback=monitor.active_count if STATE_PATH else engine.scheduler.active_count)
+REGISTRY.gauge("kkokki_jobs", "Registered commutes by status.", ("status",), callback=_job_status_counts)
+
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    # Registered before gzip_response, so it runs after it and includes compression
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - started)
+        HTTP_REQUESTS.labels(endpoint, request.method, response.status_code).inc()
+    return response
+
+
+@app.after_request
+def gzip_response(response):
+    """Compress larger JSON bodies for clients that accept gzip."""
+    if (response.direct_passthrough or response.status_code != 200
+            or response.mimetype != 'application/json'
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')
+            or 'Content-Encoding' in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=5))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.headers.add('Vary', 'Accept-Encoding')
+    return response
 
 
 @app.route('/')
@@ -10,6 +83,11 @@ def index():
     return render_template('index.html')
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
 @app.route('/api/start', methods=['POST'])
 def start_monitoring():
     data = request.json
@@ -17,19 +95,51 @@ def start_monitoring():
     end_loc = data.get('end')
     arrival_time = data.get('time')
     transport_mode = data.get('transport', 'car')
+    job_id = data.get('job_id', DEFAULT_JOB_ID)
 
     if not all([start_loc, end_loc, arrival_time]):
         return jsonify({"error": "Missing required fields."}), 400
 
-    # Apply settings from frontend
-    engine.prep_time = data.get('prep_time', 30)
-    engine.buffer_time = data.get('buffer_time', 30)
-    engine.check_count = data.get('check_count', 5)
-    engine.early_warning_enabled = data.get('early_warning', False)
-    engine.urgent_alert_enabled = data.get('urgent_alert', True)
+    # Settings from frontend apply to this job only
+    job = dict(
+        start_name=start_loc, end_name=end_loc, arrival_time=arrival_time,
+        transport_mode=transport_mode, job_id=job_id,
+        prep_time=data.get('prep_time', 30),
+        buffer_time=data.get('buffer_time', 30),
+        check_count=data.get('check_count', 5),
+        early_warning_enabled=data.get('early_warning', False),
+        urgent_alert_enabled=data.get('urgent_alert', True),
+    )
+    if STATE_PATH:
+        monitor.submit("start", **job)
+    else:
+        engine.start_monitoring(**job)
+    return jsonify({"message": "Monitoring started.", "job_id": job_id})
 
-    engine.start_monitoring(start_loc, end_loc, arrival_time, transport_mode)
-    return jsonify({"message": "Monitoring started."})
+
+@app.route('/api/import', methods=['POST'])
+def import_commutes():
+    """Register many commutes from a CSV or JSONL body (or a "file" upload).
+
+    Streams NDJSON progress (see core/bulkimport.py) ending in a summary with
+    a per-row error report. ?dry_run=1 geocodes and validates only.
+    """
+    upload = request.files.get('file')
+    body = upload.read() if upload else request.get_data()
+    try:
+        text = body.decode('utf-8')
+    except UnicodeDecodeError:
+        return jsonify({"error": "Import must be UTF-8."}), 400
+    mimetype = (upload.mimetype if upload else request.mimetype) or ''
+    fmt = 'csv' if 'csv' in mimetype else 'jsonl' if ('ndjson' in mimetype or 'jsonl' in mimetype) else None
+    rows = parse_rows(text, fmt)
+    if not rows:
+        return jsonify({"error": "No rows to import."}), 400
+
+    events = importer.run(rows, dry_run=request.args.get('dry_run', type=int) == 1)
+    lines = (json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+    return Response(lines, mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @app.route('/api/route', methods=['POST'])
@@ -38,29 +148,100 @@ def get_route():
     start_loc = data.get('start')
     end_loc = data.get('end')
     transport_mode = data.get('transport', 'car')
+    # Opt-in compact geometry: {"format": "polyline", "zoom": <map zoom>}
+    geometry_format = data.get('format', 'coordinates')
+    zoom = data.get('zoom')
 
     if not all([start_loc, end_loc]):
         return jsonify({"error": "Start and end required."}), 400
 
     try:
-        route = engine.calculate_route(start_loc, end_loc, transport_mode)
-        return jsonify({"success": True, "route": route})
+        route, cache_status = engine.get_route(start_loc, end_loc, transport_mode)
+        if geometry_format == 'polyline':
+            route = compact_route(route, zoom=zoom)
+        return jsonify({"success": True, "route": route, "cache": cache_status})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/departure', methods=['POST'])
+def solve_departure():
+    """Latest departure that still arrives by "time" (HH:MM, today or tomorrow)."""
+    data = request.get_json(silent=True) or {}
+    start_loc = data.get('start')
+    end_loc = data.get('end')
+    arrival_time = data.get('time')
+    if not all([start_loc, end_loc, arrival_time]):
+        return jsonify({"error": "Start, end and time required."}), 400
+
+    now = datetime.now()
+    try:
+        arrival = datetime.strptime(arrival_time, "%H:%M").replace(year=now.year, month=now.month, day=now.day)
+    except ValueError:
+        return jsonify({"error": "Time must be HH:MM."}), 400
+    if arrival < now:
+        arrival += timedelta(days=1)
+
+    try:
+        solution = engine.solve_departure(start_loc, end_loc, arrival, data.get('transport', 'car'), now=now)
+        route = {k: v for k, v in solution.pop("route").items() if k != "coordinates"}
+        solution["departure"] = solution["departure"].isoformat()
+        solution["arrival"] = solution["arrival"].isoformat()
+        return jsonify({"success": True, **solution, "route": route})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route('/api/route/compare', methods=['POST'])
+def compare_routes():
+    """All modes and car variants at once.
+
+    Returns {"results", "ranking"} as JSON, or with {"stream": true} one
+    NDJSON line per result as it completes followed by the ranking.
+    """
+    data = request.get_json(silent=True) or {}
+    start_loc = data.get('start')
+    end_loc = data.get('end')
+    if not all([start_loc, end_loc]):
+        return jsonify({"error": "Start and end required."}), 400
+
+    try:
+        results = engine.compare_routes(start_loc, end_loc, data.get('options'), data.get('deadlines'))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    if not data.get('stream'):
+        results = list(results)
+        return jsonify({"success": True, "results": results, "ranking": engine.rank_routes(results)})
+
+    def lines():
+        seen = []
+        for result in results:
+            seen.append(result)
+            yield json.dumps({"type": "result", **result}, ensure_ascii=False) + "\n"
+        yield json.dumps({"type": "ranking", "ranking": engine.rank_routes(seen)}, ensure_ascii=False) + "\n"
+
+    return Response(lines(), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/search', methods=['GET'])
 def search_locations():
     keyword = request.args.get('keyword')
     if not keyword:
         return jsonify({"results": []})
-    results = engine.search_locations(keyword)
+    # ?local=1: instant autocomplete from the local index only, never TMAP
+    results = engine.search_locations(keyword, local_only=request.args.get('local', type=int) == 1)
     return jsonify({"results": results})
 
 
 @app.route('/api/stop', methods=['POST'])
 def stop_monitoring():
-    engine.stop_monitoring()
+    data = request.get_json(silent=True) or {}
+    if STATE_PATH:
+        monitor.submit("stop", job_id=data.get('job_id', DEFAULT_JOB_ID))
+    else:
+        engine.stop_monitoring(data.get('job_id', DEFAULT_JOB_ID))
     return jsonify({"message": "Monitoring stopped."})
 
 
@@ -77,9 +258,88 @@ def reverse_geocode():
         return jsonify({"success": False, "error": str(e)})
 
 
+@app.route('/api/events', methods=['GET'])
+def get_events():
+    """Structured events newer than ?since=<seq>, optionally for one ?job_id."""
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', 200, type=int)
+    job_id = request.args.get('job_id')
+    events = monitor.events.since(since, limit=limit, job_id=job_id)
+    return jsonify({
+        "events": events,
+        "last_seq": events[-1]["seq"] if events else max(since, monitor.events.last_seq),
+    })
+
+
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        "poi": engine.poi_cache.stats(),
+        "poi_index": engine.poi_index.stats(),
+        "reverse_geocode": engine.geo_cache.stats(),
+        "route": engine.route_cache.stats(),
+        "departure_probes": engine.probe_cache.stats(),
+        "alert_drafts": engine.drafts.stats(),
+        "notifications": engine.notifier.stats(),
+        "jobstore": engine.jobstore.stats() if engine.jobstore else None,
+    })
+
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
 @app.route('/api/status', methods=['GET'])
 def get_status():
-    return jsonify(engine.get_status())
+    job_id = request.args.get('job_id', DEFAULT_JOB_ID)
+    version = monitor.feed.version_of(job_id)   # other jobs' activity doesn't invalidate this one
+    etag = f'{job_id}-{version}'
+
+    # Cheap revalidation for pollers: ?since=<version> or If-None-Match
+    since = request.args.get('since', type=int)
+    if (since is not None and since >= version) or etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify(monitor.get_status(job_id))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/api/status/stream', methods=['GET'])
+def stream_status():
+    """Server-Sent Events: a full snapshot on connect, then only changed fields."""
+    job_id = request.args.get('job_id', DEFAULT_JOB_ID)
+
+    def events():
+        last = None
+        seen_version = -1
+        log_seq = 0
+        while True:
+            version = monitor.feed.wait(seen_version, timeout=SSE_KEEPALIVE_SECONDS, key=job_id)
+            if version == seen_version:
+                yield ": keepalive\n\n"
+                continue
+            seen_version = version
+
+            if last is None:
+                log_seq = monitor.events.last_seq
+                status = payload = monitor.get_status(job_id)
+            else:
+                status = monitor.get_status(job_id)
+                payload = {k: status[k] for k in ('is_running', 'status', 'latest_result')
+                           if status[k] != last[k]}
+                new_events = monitor.events.since(log_seq, job_id=job_id)
+                if new_events:
+                    log_seq = new_events[-1]["seq"]
+                    payload['new_logs'] = [format_event(e) for e in new_events]
+                if not payload:
+                    continue
+                payload['version'] = status['version']
+            last = status
+            yield f"id: {status['version']}\nevent: status\ndata: {json.dumps(payload)}\n\n"
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+"""End-to-end API benchmark against the local stub server (no live keys needed).
+
+Serves app.py on a local port with the engine pointed at benchmarks.stub_server,
+then reports throughput and p50/p99 latency for /api/search, /api/route,
+/api/status and one monitor-loop check. Results are saved as JSON; pass
+--compare with an earlier file to see the change.
+
+Usage:
+    python -m benchmarks.bench_api [--requests 400] [--concurrency 8] [--latency 40]
+        [--out results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.stub_server import StubServer, parse_latency_for
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+START = {"name": "강남역", "lat": 37.4979502, "lon": 127.0276368}
+END = {"name": "서울시청", "lat": 37.5662952, "lon": 126.9779692}
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, errors, wall):
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def run_load(call, count, concurrency):
+    """Run call(i) for i in range(count) on `concurrency` threads; (latencies, errors, wall)."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def one(i):
+        t0 = time.perf_counter()
+        try:
+            ok = call(i)
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(count)))
+    return latencies, errors[0], time.perf_counter() - t0
+
+
+def offset(point, i, distinct):
+    """Spread requests over `distinct` endpoints so caches see realistic reuse."""
+    k = i % distinct
+    return dict(point, lat=point["lat"] + 0.01 * k, lon=point["lon"] + 0.01 * k)
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    print(f"\nvs {baseline_path}")
+    for name, now in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        parts = []
+        for key in ("throughput_rps", "p50_ms", "p99_ms"):
+            if before.get(key) and now.get(key) is not None:
+                parts.append(f"{key} {before[key]} -> {now[key]} ({(now[key] - before[key]) / before[key] * 100:+.1f}%)")
+        print(f"  {name:8s} " + "  ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--distinct", type=int, default=50, help="distinct keywords / route endpoints")
+    parser.add_argument("--checks", type=int, default=200, help="monitor-loop checks")
+    parser.add_argument("--latency", type=float, default=40.0, help="stub latency in ms")
+    parser.add_argument("--jitter", type=float, default=10.0)
+    parser.add_argument("--latency-for", action="append", metavar="ENDPOINT=MS")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--out", default=None, help="JSON results path")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    stub = StubServer(latency_ms=args.latency, jitter_ms=args.jitter,
+                      latency_for=parse_latency_for(args.latency_for),
+                      error_rate=args.error_rate, seed=1).start()
+    os.environ.update(
+        KKOKKI_TMAP_URL=stub.url, KKOKKI_GEMINI_URL=stub.url,
+        SLACK_WEBHOOK_URL=f"{stub.url}/slack/T000/B000",
+        SK_API_KEY="stub", GOOGLE_API_KEY="stub",
+    )
+    os.environ.pop("KKOKKI_EVENT_LOG_PATH", None)
+
+    import requests
+    from werkzeug.serving import make_server
+
+    import app as kkokki_app
+    from core.scheduler import MonitorJob
+    from core.sampler import AdaptiveSampler
+
+    engine = kkokki_app.engine
+    # Keep the benchmark output readable; events still go to the ring buffer
+    devnull = open(os.devnull, "w")
+    sys.stdout, real_stdout = devnull, sys.stdout
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, kkokki_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def search(i):
+        r = session().get(f"{base}/api/search", params={"keyword": f"강남역 {i % args.distinct}"})
+        return r.status_code == 200 and r.json()["results"]
+
+    def route(i):
+        r = session().post(f"{base}/api/route", json={
+            "start": offset(START, i, args.distinct), "end": END, "transport": "car"})
+        return r.status_code == 200 and r.json()["success"]
+
+    def status(i):
+        return session().get(f"{base}/api/status").status_code == 200
+
+    arrival = (datetime.now() + timedelta(hours=3)).strftime("%H:%M")
+
+    def monitor_check(i):
+        job = MonitorJob(offset(START, i, 10_000), END, arrival, "car", job_id=f"bench-{i}")
+        job.sampler = AdaptiveSampler()
+        engine._run_check(job)
+        return job.latest_result is not None
+
+    results = {}
+    try:
+        for name, call, count in (("search", search, args.requests), ("route", route, args.requests),
+                                  ("status", status, args.requests), ("monitor", monitor_check, args.checks)):
+            latencies, errors, wall = run_load(call, count, args.concurrency)
+            results[name] = summarize(latencies, errors, wall)
+    finally:
+        sys.stdout = real_stdout
+        server.shutdown()
+        stub.stop()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_rev": git_rev(),
+            "python": platform.python_version(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        },
+        "results": results,
+        "stub": stub.snapshot(),
+    }
+    print(f"{'endpoint':10s} {'count':>6s} {'err':>4s} {'rps':>8s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for name, r in results.items():
+        print(f"{name:10s} {r['count']:6d} {r['errors']:4d} {r['throughput_rps']:8.1f} "
+              f"{r['p50_ms']:8.2f} {r['p99_ms']:8.2f}")
+
+    out = args.out or os.path.join(tempfile.gettempdir(),
+                                   f"kkokki-bench-api-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved {out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Upstream calls per departure solve: fixed point + bisection vs. a linear scan.
+
+Profiles are synthetic: rush-hour driving (smooth peak around 08:30) and a
+transit line (walk to the stop, fixed headway, fixed ride time). The linear
+scan walks back minute by minute from the arrival time, which is what a naive
+"try every departure" search costs.
+
+Usage:
+    python -m benchmarks.bench_departure [--solves 2000]
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.departure import solve_departure
+
+DAY = 86400
+
+
+def rush_hour(base, peak, center=8.5 * 3600, width=3600):
+    def minutes(ts):
+        t = ts % DAY
+        return round(base + peak * math.exp(-((t - center) / width) ** 2))
+    return minutes
+
+
+def transit_line(walk, headway, ride, offset):
+    def minutes(ts):
+        at_stop = ts + walk * 60
+        wait = (offset - at_stop) % (headway * 60)
+        return math.ceil((walk * 60 + wait + ride * 60) / 60)
+    return minutes
+
+
+def linear_scan(travel_minutes, arrival, earliest, resolution=60):
+    calls = 0
+    d = arrival // resolution * resolution
+    while d >= earliest:
+        calls += 1
+        if d + travel_minutes(d) * 60 <= arrival:
+            return d, calls
+        d -= resolution
+    return None, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--solves", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    for name, make in (
+        ("car", lambda: rush_hour(rng.uniform(20, 40), rng.uniform(0, 35))),
+        ("transit", lambda: transit_line(rng.randint(3, 10), rng.choice([5, 8, 12, 20]),
+                                         rng.randint(15, 50), rng.randint(0, 1200))),
+    ):
+        solver_calls, scan_calls, mismatches = [], [], 0
+        for _ in range(args.solves):
+            profile = make()
+            arrival = rng.randint(7 * 3600, 10 * 3600)
+            earliest = arrival - 3 * 3600
+            calls = [0]
+
+            def counted(ts):
+                calls[0] += 1
+                return profile(ts)
+
+            # Seed with the travel time measured "now", as the monitor does
+            now = earliest + rng.randint(0, 3600)
+            solution = solve_departure(counted, arrival, guess_minutes=profile(now), earliest=earliest)
+            best, scanned = linear_scan(profile, arrival, earliest)
+            solver_calls.append(calls[0])
+            scan_calls.append(scanned)
+            if solution["departure"] != best:
+                mismatches += 1
+
+        print(f"{name:8s} solves={args.solves}  calls/solve: solver mean={statistics.mean(solver_calls):.2f} "
+              f"max={max(solver_calls)}  linear mean={statistics.mean(scan_calls):.1f} "
+              f"max={max(scan_calls)}  mismatches={mismatches}")
+
+
+if __name__ == "__main__":
+    main()
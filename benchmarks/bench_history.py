@@ -0,0 +1,72 @@
+"""Travel-history benchmark: ingest, reload (mmap scan) and query at a million samples.
+
+Usage: python -m benchmarks.bench_history [--samples 1000000] [--routes 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.history import TravelHistory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    routes = [f"wydm{i:04d}:wydq{i:04d}" for i in range(args.routes)]
+    base = {r: rng.uniform(20, 60) for r in routes}
+    start_ts = 1_760_000_000
+    span = 90 * 86400
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.bin")
+        store = TravelHistory(path)
+
+        t0 = time.perf_counter()
+        batch = []
+        for i in range(args.samples):
+            route = routes[i % args.routes]
+            ts = start_ts + rng.randrange(span)
+            batch.append((route, "car", base[route] + rng.uniform(-3, 3), 12.5, ts))
+            if len(batch) == args.batch:
+                store.append_many(batch)
+                batch = []
+        store.append_many(batch)
+        ingest_s = time.perf_counter() - t0
+        store.close()
+
+        t0 = time.perf_counter()
+        store = TravelHistory(path)
+        reload_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        matched = sum(1 for _ in store.scan(route_key=routes[0]))
+        scan_s = time.perf_counter() - t0
+
+        queries = 10000
+        t0 = time.perf_counter()
+        for i in range(queries):
+            store.predict(routes[i % args.routes], "car", start_ts + rng.randrange(span))
+        predict_us = (time.perf_counter() - t0) / queries * 1e6
+
+        size_mb = os.path.getsize(path) / 1e6
+        store.close()
+
+    print(f"samples:        {args.samples:,} across {args.routes} routes ({size_mb:.1f} MB on disk)")
+    print(f"ingest:         {ingest_s:.2f} s ({args.samples / ingest_s:,.0f} samples/s, batches of {args.batch})")
+    print(f"reload:         {reload_s:.2f} s (mmap scan + slot aggregates)")
+    print(f"scan one route: {scan_s * 1000:.0f} ms ({matched:,} matches)")
+    print(f"predict:        {predict_us:.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Per-operation cost of the metrics hot paths, and of /metrics rendering.
+
+Usage:
+    python -m benchmarks.bench_metrics [--ops 1000000] [--threads 4] [--flask 5000]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.metrics import Registry, track_upstream
+
+
+def per_op_ns(fn, ops):
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return (time.perf_counter() - t0) / ops * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--flask", type=int, default=0,
+                        help="also time N GET /api/status with and without the request hooks")
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = registry.counter("bench_total", "bench", ("mode", "source"))
+    histogram = registry.histogram("bench_seconds", "bench", ("upstream", "method"))
+
+    baseline = per_op_ns(lambda: None, args.ops)
+    cases = [
+        ("counter.labels().inc()", lambda: counter.labels("car", "tmap").inc()),
+        ("histogram.labels().observe()", lambda: histogram.labels("tmap", "car_route").observe(0.042)),
+    ]
+    print(f"{'operation':32s} {'ns/op':>8s}  (empty call baseline {baseline:.0f} ns)")
+    for name, fn in cases:
+        print(f"{name:32s} {per_op_ns(fn, args.ops) - baseline:8.0f}")
+
+    def tracked():
+        with track_upstream("tmap", "bench"):
+            pass
+    print(f"{'with track_upstream(...)':32s} {per_op_ns(tracked, args.ops) - baseline:8.0f}")
+
+    # Contention: the same child observed from several threads
+    per_thread = args.ops // args.threads
+    child = histogram.labels("tmap", "contended")
+
+    def worker():
+        for _ in range(per_thread):
+            child.observe(0.01)
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    print(f"{f'observe() x{args.threads} threads':32s} {elapsed / (per_thread * args.threads) * 1e9:8.0f}")
+
+    # Scrape cost with a realistic number of series
+    for i in range(200):
+        histogram.labels("tmap", f"method{i}").observe(0.01)
+    t0 = time.perf_counter()
+    body = registry.render()
+    print(f"render {body.count(chr(10))} lines: {(time.perf_counter() - t0) * 1000:.2f} ms")
+
+    if args.flask:
+        bench_flask(args.flask)
+
+
+def bench_flask(requests):
+    """End-to-end request cost with the metrics hooks on and off."""
+    import app as kkokki_app
+    flask_app = kkokki_app.app
+    client = flask_app.test_client()
+    hooks = (kkokki_app.start_timer, kkokki_app.record_request_metrics)
+
+    def run():
+        t0 = time.perf_counter()
+        for _ in range(requests):
+            client.get("/api/status")
+        return (time.perf_counter() - t0) / requests * 1e6
+
+    run()   # warm up
+    with_hooks = run()
+    flask_app.before_request_funcs[None].remove(hooks[0])
+    flask_app.after_request_funcs[None].remove(hooks[1])
+    without_hooks = run()
+    print(f"GET /api/status: {with_hooks:.0f} us with metrics, {without_hooks:.0f} us without "
+          f"({(with_hooks - without_hooks) / without_hooks * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
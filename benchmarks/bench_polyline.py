@@ -0,0 +1,56 @@
+"""Route geometry payload benchmark: JSON coordinate list vs encoded polyline (+ simplification, gzip).
+
+Usage: python -m benchmarks.bench_polyline [--points 8000] [--repeat 20]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.polyline import compact_route
+
+
+def synthetic_route(points, seed=7):
+    """Random-walk car route around Seoul, with TMAP-like 7-decimal coordinates."""
+    rng = random.Random(seed)
+    lon, lat = 126.9780, 37.5665
+    heading = 0.0
+    coords = []
+    for _ in range(points):
+        heading += rng.uniform(-0.3, 0.3)
+        lon += 0.00012 * rng.uniform(0.5, 1.5) * (1 if heading > 0 else -1)
+        lat += 0.00009 * rng.uniform(0.5, 1.5)
+        coords.append([round(lon, 7), round(lat, 7)])
+    return {"mode": "car", "minutes": 48, "distance": 31.2, "coordinates": coords}
+
+
+def measure(label, build, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        body = json.dumps({"success": True, "route": build()}).encode("utf-8")
+    serialize_ms = (time.perf_counter() - t0) / repeat * 1000
+    gz = len(gzip.compress(body, compresslevel=5))
+    print(f"{label:<28} {len(body):>10,} B {gz:>10,} B {serialize_ms:>10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=8000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    route = synthetic_route(args.points)
+    print(f"{'format':<28} {'raw':>12} {'gzip':>12} {'serialize':>13}")
+    measure("coordinates (current)", lambda: route, args.repeat)
+    measure("polyline", lambda: compact_route(route), args.repeat)
+    for zoom in (16, 14, 12):
+        measure(f"polyline + simplify z{zoom}", lambda: compact_route(route, zoom=zoom), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Crash-recovery benchmark: restart the engine on a job store with N active jobs.
+
+Fills a fresh SQLite job store with `--jobs` commutes (resolved coordinates,
+a last result, and for `--late-share` of them an already-sent late alert),
+then times a cold KkokkiEngine start against the offline stub server:
+
+- recover: loading the rows and rescheduling every job,
+- engine start: the whole constructor, recovery included,
+- drain: until every recovered job finished its first check
+  (first checks are spread over `--spread` seconds; 0 = all at once).
+
+It also checks that the restart geocoded nothing and posted no Slack alerts.
+
+Usage:
+    python -m benchmarks.bench_recovery [--jobs 5000] [--spread 0] [--workers 16]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.stub_server import StubServer
+
+
+def populate(path, jobs, late_share):
+    from core.jobstore import JobStore
+    from core.scheduler import MonitorJob
+
+    store = JobStore(path)
+    now = datetime.now()
+    late_jobs = int(jobs * late_share)
+    t0 = time.perf_counter()
+    for i in range(jobs):
+        late = i < late_jobs
+        arrival = now + (timedelta(minutes=20) if late else timedelta(hours=6))
+        job = MonitorJob(f"출발지 {i}", f"도착지 {i % 50}", arrival.strftime("%H:%M"), "car", job_id=f"job-{i}")
+        job.start_coord = {"name": f"출발지 {i}", "lat": 37.45 + (i % 1000) * 1e-4, "lon": 127.0 + (i // 1000) * 1e-3}
+        job.end_coord = {"name": f"도착지 {i % 50}", "lat": 37.56, "lon": 126.97 + (i % 50) * 1e-3}
+        wake = arrival - timedelta(minutes=75)
+        job.latest_result = {"travel_minutes": 35, "distance": 12.3, "wake_up_iso": wake.isoformat(),
+                             "is_late": late, "source": "tmap"}
+        job.status = "LATE_RISK" if late else "MONITORING"
+        job.slack_sent = late
+        store.adopt(job)
+        store.save_state(job)
+    store.flush()
+    store.close()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--late-share", type=float, default=0.2, help="share of jobs whose alert was already sent")
+    parser.add_argument("--spread", type=float, default=0.0, help="seconds to spread first checks over")
+    parser.add_argument("--workers", type=int, default=16, help="KKOKKI_CHECK_WORKERS")
+    parser.add_argument("--latency", type=float, default=5.0, help="stub latency in ms")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="kkokki-recovery-"), "jobs.db")
+    fill = populate(path, args.jobs, args.late_share)
+
+    stub = StubServer(latency_ms=args.latency, seed=1).start()
+    os.environ.update(
+        KKOKKI_TMAP_URL=stub.url, KKOKKI_GEMINI_URL=stub.url, SLACK_WEBHOOK_URL=f"{stub.url}/slack/T000/B000",
+        SK_API_KEY="stub", GOOGLE_API_KEY="stub", KKOKKI_JOBSTORE_PATH=path,
+        KKOKKI_RECOVERY_SPREAD=str(args.spread), KKOKKI_CHECK_WORKERS=str(args.workers),
+    )
+    os.environ.pop("KKOKKI_EVENT_LOG_PATH", None)
+    devnull = open(os.devnull, "w")
+    sys.stdout, real_stdout = devnull, sys.stdout
+
+    from engine import KkokkiEngine
+
+    try:
+        t0 = time.perf_counter()
+        engine = KkokkiEngine()
+        started = time.perf_counter() - t0
+        jobs = engine.scheduler.jobs()
+        deadline = time.monotonic() + args.timeout
+        while any(job.check_runs == 0 for job in jobs) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        drained = time.perf_counter() - t0
+        unchecked = sum(job.check_runs == 0 for job in jobs)
+        engine.notifier.flush(timeout=5)
+        engine.scheduler.shutdown()
+        engine.jobstore.close()
+    finally:
+        sys.stdout = real_stdout
+        stub.stop()
+
+    hits = stub.snapshot()
+    print(f"jobs {args.jobs}, workers {args.workers}, spread {args.spread:g}s, stub latency {args.latency:g} ms")
+    print(f"  populate store      {fill * 1000:9.0f} ms")
+    print(f"  recover (load+schedule) {engine.recovery['seconds'] * 1000:5.0f} ms for {engine.recovery['jobs']} jobs")
+    print(f"  engine start        {started * 1000:9.0f} ms")
+    print(f"  first checks done   {drained * 1000:9.0f} ms" + (f"  ({unchecked} still pending)" if unchecked else ""))
+    print(f"  geocoding calls     {hits.get('pois', {}).get('hits', 0):9d}")
+    print(f"  Slack posts         {hits.get('slack', {}).get('hits', 0):9d}")
+    print(f"  route calls         {hits.get('car', {}).get('hits', 0):9d}")
+
+
+if __name__ == "__main__":
+    main()
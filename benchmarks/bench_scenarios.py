@@ -0,0 +1,200 @@
+"""Concurrent scenario load test for the ADK orchestrator, with a scripted model.
+
+Runs `--sessions` scenario sessions (the queries in tests/test_scenarios.py,
+round-robin) through ONE reused InMemoryRunner, at most `--concurrency` at a
+time, against benchmarks.fake_llm.ScriptedLlm. Model latency is fixed
+(`--model-latency`, default 0), so the numbers are orchestrator cost:
+
+- session latency p50/p99 and sessions/s,
+- overhead per model turn (session time minus the simulated model latency,
+  so it includes waiting for the event loop) and event-loop time per model
+  turn (wall / turns: the CPU one process spends per turn),
+- events_to_text cost per session (plain and with the timing breakdown),
+- memory retained per session (separate tracemalloc pass; sessions, traces
+  and tool memo entries all stay in-process, as they would in production).
+
+`--sensing sequential` scripts the morning workflow with the three
+individual sensing tools instead of get_morning_snapshot, to compare.
+
+Usage:
+    python -m benchmarks.bench_scenarios [--sessions 500] [--concurrency 100]
+        [--model-latency 0] [--sensing snapshot|sequential] [--memory-sessions 200]
+        [--out results.json]
+    python -m tests.test_scenarios load [same options]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_api import git_rev, percentile
+
+# Tool calls each scenario should produce with the scripted model
+EXPECTED_TOOLS = {
+    "late": ["check_user_movement", "send_team_notification"],
+    "morning": ["get_morning_snapshot", "calculate_optimal_wakeup"],
+    "morning_sequential": ["get_calendar_schedule", "get_realtime_traffic", "get_weather_impact",
+                           "calculate_optimal_wakeup"],
+}
+
+
+def build_runner(latency_ms=0.0, sensing="snapshot"):
+    """One InMemoryRunner for the real orchestrator agent, with the model swapped out."""
+    from google.adk.apps import App
+    from google.adk.runners import InMemoryRunner
+
+    from benchmarks.fake_llm import ScriptedLlm
+    from src.agents.kkokki_orchestrator import get_kkokki_agent
+    from src.agents.tracing_plugin import TracingPlugin
+
+    agent = get_kkokki_agent()
+    agent.model = ScriptedLlm(latency_ms=latency_ms, sensing=sensing)
+    return InMemoryRunner(app=App(name="kkokki", root_agent=agent, plugins=[TracingPlugin()]))
+
+
+async def run_session(runner, user_id, query):
+    """Create a session and run one user turn; (seconds, events)."""
+    from google.genai import types
+
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id)
+    message = types.Content(role="user", parts=[types.Part(text=query)])
+    t0 = time.perf_counter()
+    events = [event async for event in runner.run_async(user_id=user_id, session_id=session.id,
+                                                        new_message=message)]
+    return time.perf_counter() - t0, events
+
+
+async def run_load(runner, queries, sessions, concurrency):
+    """Run `sessions` sessions with at most `concurrency` in flight; (results, wall seconds)."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            return await run_session(runner, f"load-{i}", queries[i % len(queries)])
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(sessions)))
+    return results, time.perf_counter() - t0
+
+
+def tool_sequence(events):
+    return [p.function_call.name for e in events if e.content and e.content.parts
+            for p in e.content.parts if p.function_call]
+
+
+def measure_load(queries, sessions, concurrency, latency_ms, sensing="snapshot"):
+    from benchmarks.fake_llm import LATE_WORDS
+    from src.utils import count_turns, events_to_text
+
+    runner = build_runner(latency_ms, sensing)
+    asyncio.run(run_load(runner, queries, min(10, sessions), concurrency))    # warm-up
+    results, wall = asyncio.run(run_load(runner, queries, sessions, concurrency))
+
+    latencies = sorted(seconds for seconds, _ in results)
+    model_turns = sum(count_turns(events)["llm_turns"] for _, events in results)
+    morning = "morning" if sensing == "snapshot" else "morning_sequential"
+    expected = [EXPECTED_TOOLS["late" if any(w in q for w in LATE_WORDS) else morning] for q in queries]
+    mismatched = sum(tool_sequence(events) != expected[i % len(queries)] for i, (_, events) in enumerate(results))
+    simulated = model_turns * latency_ms / 1000
+
+    event_lists = [events for _, events in results]
+    text_cost = {}
+    for label, kwargs in (("plain", {}), ("timings", {"timings": True})):
+        t0 = time.perf_counter()
+        for events in event_lists:
+            events_to_text(events, **kwargs)
+        text_cost[label] = round((time.perf_counter() - t0) / len(event_lists) * 1e6, 1)
+
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "errors": mismatched,
+        "sessions_per_s": round(sessions / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "model_turns_per_session": round(model_turns / sessions, 2),
+        "overhead_per_model_turn_ms": round((sum(latencies) - simulated) / model_turns * 1000, 3),
+        "loop_ms_per_model_turn": round(wall / model_turns * 1000, 3),
+        "events_to_text_us": text_cost["plain"],
+        "events_to_text_timings_us": text_cost["timings"],
+    }
+
+
+def measure_memory(queries, sessions, concurrency):
+    """Bytes still allocated per session after its turn finished."""
+    runner = build_runner()
+    asyncio.run(run_load(runner, queries, min(10, sessions), concurrency))
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results, _ = asyncio.run(run_load(runner, queries, sessions, concurrency))
+    del results
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return {"sessions": sessions, "retained_kb_per_session": round(retained / sessions / 1024, 1)}
+
+
+def quiet_logs():
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith(("src.", "google")):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--model-latency", type=float, default=0.0, help="simulated ms per model call")
+    parser.add_argument("--sensing", choices=("snapshot", "sequential"), default="snapshot",
+                        help="morning workflow the scripted model follows")
+    parser.add_argument("--memory-sessions", type=int, default=200, help="0 skips the memory pass")
+    parser.add_argument("--out", default=None, help="JSON results path")
+    args = parser.parse_args(argv)
+
+    from tests.test_scenarios import SCENARIOS
+
+    queries = [query for _, query in SCENARIOS.values()]
+    build_runner()    # import ADK and the tools before silencing their loggers
+    quiet_logs()
+
+    results = {"load": measure_load(queries, args.sessions, args.concurrency, args.model_latency,
+                                     args.sensing)}
+    if args.memory_sessions:
+        results["memory"] = measure_memory(queries, args.memory_sessions, args.concurrency)
+
+    load = results["load"]
+    print(f"sessions {load['sessions']} @ concurrency {load['concurrency']}, "
+          f"model latency {args.model_latency:g} ms, {args.sensing} sensing, "
+          f"wrong tool sequences {load['errors']}")
+    print(f"  throughput             {load['sessions_per_s']:10.1f} sessions/s")
+    print(f"  session p50 / p99      {load['p50_ms']:10.2f} / {load['p99_ms']:.2f} ms")
+    print(f"  model turns / session  {load['model_turns_per_session']:10.2f}")
+    print(f"  overhead / model turn  {load['overhead_per_model_turn_ms']:10.3f} ms")
+    print(f"  loop time / model turn {load['loop_ms_per_model_turn']:10.3f} ms")
+    print(f"  events_to_text         {load['events_to_text_us']:10.1f} us "
+          f"({load['events_to_text_timings_us']:.1f} us with timings)")
+    if "memory" in results:
+        print(f"  retained / session     {results['memory']['retained_kb_per_session']:10.1f} KB")
+
+    out = args.out or os.path.join(tempfile.gettempdir(),
+                                   f"kkokki-bench-scenarios-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "git_rev": git_rev(),
+                            "config": {k: v for k, v in vars(args).items() if k != "out"}},
+                   "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved {out}")
+    return 0 if not load["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Scheduler benchmark: N concurrent commutes on one core against a stubbed TMAP.
+
+Usage: python -m benchmarks.bench_scheduler [--jobs 10000] [--workers 64] [--latency-ms 5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import resource
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from engine import KkokkiEngine
+from core.scheduler import MonitorScheduler
+
+START = {"name": "Start", "lat": 37.4979, "lon": 127.0276}
+END = {"name": "End", "lat": 37.5665, "lon": 126.9780}
+
+
+def make_stub_route(latency_s):
+    def calculate_route(start, end, transport_mode='car'):
+        if latency_s:
+            time.sleep(latency_s)
+        return {"mode": transport_mode, "minutes": 35, "distance": 12.4, "coordinates": []}
+    return calculate_route
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {sorted(os.sched_getaffinity(0))[0]})
+
+    engine = KkokkiEngine()
+    engine.calculate_route = make_stub_route(args.latency_ms / 1000)
+    engine.scheduler = MonitorScheduler(engine._run_check, max_workers=args.workers,
+                                        on_error=engine._on_check_error)
+    threads_before = threading.active_count()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        for i in range(args.jobs):
+            engine.start_monitoring(START, END, "09:00", job_id=f"user-{i}")
+        submit_s = time.perf_counter() - t0
+
+        while sum(job.check_runs for job in engine.scheduler.jobs()) < args.jobs:
+            time.sleep(0.01)
+        first_pass_s = time.perf_counter() - t0
+        threads_peak = threading.active_count()
+
+        t1 = time.perf_counter()
+        for i in range(args.jobs):
+            engine.stop_monitoring(f"user-{i}")
+        stop_s = time.perf_counter() - t1
+
+    engine.scheduler.shutdown()
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"jobs:                 {args.jobs}")
+    print(f"workers:              {args.workers} (stub latency {args.latency_ms} ms)")
+    print(f"submit:               {submit_s * 1000:.1f} ms ({submit_s / args.jobs * 1e6:.1f} us/job)")
+    print(f"first check for all:  {first_pass_s:.2f} s ({args.jobs / first_pass_s:.0f} checks/s)")
+    print(f"threads:              {threads_before} -> {threads_peak}")
+    print(f"stop_monitoring:      {stop_s / args.jobs * 1e6:.1f} us/call")
+    print(f"active after stop:    {engine.scheduler.active_count()}")
+    print(f"max RSS:              {rss_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
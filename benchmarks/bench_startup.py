@@ -0,0 +1,57 @@
+"""Cold-start timings: imports and time to the first /api/status response.
+
+Every measurement runs in a fresh interpreter and is timed from the parent
+(process spawn included), so it reflects what an autoscaled container pays.
+`--eager` also times the same steps with the Gemini/ADK SDKs imported up
+front, as the app did before they were loaded lazily.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--eager]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+EAGER = "import google.generativeai; import google.adk.agents; import google.adk.apps\n"
+
+STEPS = [
+    ("interpreter", "pass"),
+    ("import engine", "import engine"),
+    ("import app", "import app"),
+    ("first /api/status", "import app\nassert app.app.test_client().get('/api/status').status_code == 200"),
+    ("import src.agents", "import src.agents"),
+    ("build ADK app", "from src.agents import app"),
+]
+
+
+def time_child(code, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eager", action="store_true", help="also time with SDKs imported up front")
+    args = parser.parse_args()
+
+    print(f"{'step':20s} {'lazy (ms)':>10s}" + (f" {'eager (ms)':>11s}" if args.eager else ""))
+    for name, code in STEPS:
+        line = f"{name:20s} {time_child(code, args.runs) * 1000:10.0f}"
+        if args.eager:
+            line += f" {time_child(EAGER + code, args.runs) * 1000:11.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
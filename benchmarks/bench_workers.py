@@ -0,0 +1,187 @@
+"""Multi-process serving benchmark: API throughput by web worker count.
+
+Starts the stub server and one monitor_service.py process (with a seeded
+commute so /api/status has a live job), then for each `--workers` count
+forks that many app.py web workers accepting on one shared listening socket
+(the prefork model gunicorn uses) and drives /api/status, /api/search and
+/api/route from `--clients` client processes. Workers read job state from
+the shared KKOKKI_STATE_PATH file; each has its own in-memory caches.
+
+Throughput can only scale up to the number of cores: on a single-core host
+expect flat numbers (the report prints os.cpu_count()).
+
+Usage:
+    python -m benchmarks.bench_workers [--workers 1 2 4] [--requests 2000]
+        [--clients 4] [--threads 8] [--latency 5] [--out results.json]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_api import END, ROOT, START, git_rev, offset, percentile, run_load
+from benchmarks.stub_server import StubServer
+
+ENDPOINTS = ("status", "search", "route")
+
+
+def serve(fd):
+    """Web worker: serve app.py on an already listening socket (run in a child process)."""
+    from werkzeug.serving import make_server
+
+    sys.stdout = open(os.devnull, "w")
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    import app as kkokki_app
+
+    make_server("127.0.0.1", 0, kkokki_app.app, threaded=True, fd=fd).serve_forever()
+
+
+def client(task):
+    """One client process: `count` requests to one endpoint on `threads` threads."""
+    import requests
+
+    base, endpoint, count, threads, distinct, first = task
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def call(i):
+        i += first
+        if endpoint == "status":
+            return session().get(f"{base}/api/status").status_code == 200
+        if endpoint == "search":
+            r = session().get(f"{base}/api/search", params={"keyword": f"강남역 {i % distinct}"})
+            return r.status_code == 200 and r.json()["results"]
+        r = session().post(f"{base}/api/route", json={
+            "start": offset(START, i, distinct), "end": END, "transport": "car"})
+        return r.status_code == 200 and r.json()["success"]
+
+    latencies, errors, _ = run_load(call, count, threads)
+    return latencies, errors
+
+
+def wait_until_up(base, timeout=30.0):
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base}/api/status", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{base} did not come up")
+
+
+def measure(pool, base, workers, args):
+    results = {}
+    per_client = args.requests // args.clients
+    for endpoint in ENDPOINTS:
+        tasks = [(base, endpoint, per_client, args.threads, args.distinct, k * per_client)
+                 for k in range(args.clients)]
+        pool.map(client, [(base, endpoint, 20, 2, args.distinct, 0)] * args.clients)   # warm-up
+        t0 = time.perf_counter()
+        outcomes = pool.map(client, tasks)
+        wall = time.perf_counter() - t0
+        latencies = sorted(l for ls, _ in outcomes for l in ls)
+        results[endpoint] = {
+            "workers": workers,
+            "count": len(latencies),
+            "errors": sum(e for _, e in outcomes),
+            "throughput_rps": round(len(latencies) / wall, 1),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint and worker count")
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--threads", type=int, default=8, help="threads per client process")
+    parser.add_argument("--distinct", type=int, default=50, help="distinct keywords / route endpoints")
+    parser.add_argument("--latency", type=float, default=5.0, help="stub latency in ms")
+    parser.add_argument("--serve-fd", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out", default=None, help="JSON results path")
+    args = parser.parse_args()
+
+    if args.serve_fd is not None:
+        return serve(args.serve_fd)
+
+    stub = StubServer(latency_ms=args.latency, seed=1).start()
+    state_dir = tempfile.mkdtemp(prefix="kkokki-workers-")
+    env = dict(os.environ, KKOKKI_TMAP_URL=stub.url, KKOKKI_GEMINI_URL=stub.url,
+               SLACK_WEBHOOK_URL=f"{stub.url}/slack/T000/B000", SK_API_KEY="stub", GOOGLE_API_KEY="stub",
+               KKOKKI_STATE_PATH=os.path.join(state_dir, "state.db"), PYTHONPATH=ROOT)
+    for name in ("KKOKKI_EVENT_LOG_PATH", "KKOKKI_JOBSTORE_PATH", "KKOKKI_OUTBOX_PATH", "KKOKKI_GEOCACHE_PATH"):
+        env.pop(name, None)
+
+    import requests
+
+    quiet = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL, "cwd": ROOT, "env": env}
+    monitor = subprocess.Popen([sys.executable, os.path.join(ROOT, "monitor_service.py")], **quiet)
+    pool = multiprocessing.get_context("spawn").Pool(args.clients)
+    results = {}
+    try:
+        for workers in args.workers:
+            listener = socket.create_server(("127.0.0.1", 0), backlog=1024)
+            base = f"http://127.0.0.1:{listener.getsockname()[1]}"
+            procs = [subprocess.Popen([sys.executable, "-m", "benchmarks.bench_workers",
+                                       "--serve-fd", str(listener.fileno())],
+                                      pass_fds=[listener.fileno()], **quiet) for _ in range(workers)]
+            try:
+                wait_until_up(base)
+                if not results:
+                    arrival = (datetime.now() + timedelta(hours=3)).strftime("%H:%M")
+                    requests.post(f"{base}/api/start", json={"start": "강남역", "end": "서울시청", "time": arrival})
+                results[workers] = measure(pool, base, workers, args)
+            finally:
+                for proc in procs:
+                    proc.terminate()
+                for proc in procs:
+                    proc.wait()
+                listener.close()
+    finally:
+        pool.terminate()
+        monitor.terminate()
+        monitor.wait()
+        stub.stop()
+
+    print(f"cpus {os.cpu_count()}, {args.clients} client processes x {args.threads} threads, "
+          f"stub latency {args.latency:g} ms")
+    print(f"{'endpoint':8s} {'workers':>7s} {'err':>4s} {'rps':>8s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for endpoint in ENDPOINTS:
+        for workers, by_endpoint in results.items():
+            r = by_endpoint[endpoint]
+            print(f"{endpoint:8s} {workers:7d} {r['errors']:4d} {r['throughput_rps']:8.1f} "
+                  f"{r['p50_ms']:8.2f} {r['p99_ms']:8.2f}")
+
+    out = args.out or os.path.join(tempfile.gettempdir(),
+                                   f"kkokki-bench-workers-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "git_rev": git_rev(),
+                            "python": platform.python_version(), "cpus": os.cpu_count(),
+                            "config": {k: v for k, v in vars(args).items() if k not in ("out", "serve_fd")}},
+                   "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved {out}")
+
+
+if __name__ == "__main__":
+    main()
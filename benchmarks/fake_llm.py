@@ -0,0 +1,116 @@
+"""Deterministic stand-in for Gemini that drives the orchestrator through its tools.
+
+ScriptedLlm reads the user's message and the tool results already in the
+request, then emits the next step of the workflow the instruction asks for:
+
+    morning (default):   get_morning_snapshot -> calculate_optimal_wakeup -> proposal
+    late ("늦" / "지각"): check_user_movement -> send_team_notification -> summary
+
+With `sensing="sequential"` the morning workflow instead calls
+get_calendar_schedule, get_realtime_traffic and get_weather_impact one per
+turn, as the instruction did before the snapshot tool, for comparisons.
+
+No network, no randomness: the same query always yields the same calls, so
+runs measure ADK/orchestrator overhead rather than model latency. Set
+`latency_ms` to add a fixed per-call delay.
+"""
+import asyncio
+import re
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+LATE_WORDS = ("늦", "지각", "late")
+
+
+def _last_user_text(contents):
+    for content in reversed(contents):
+        if content.role == "user":
+            text = " ".join(p.text for p in content.parts or [] if p.text)
+            if text:
+                return text
+    return ""
+
+
+def _tool_results(contents):
+    """Tool name -> response dict for results after the latest user message."""
+    results = {}
+    for content in reversed(contents):
+        parts = content.parts or []
+        if content.role == "user" and any(p.text for p in parts):
+            break
+        for part in parts:
+            if part.function_response:
+                results.setdefault(part.function_response.name, part.function_response.response or {})
+    return results
+
+
+def _conditions(query):
+    for word in ("폭설", "눈", "비"):
+        if word in query:
+            return word
+    return None
+
+
+def _call(name, **args):
+    return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+
+SEQUENTIAL_SENSING = ("get_calendar_schedule", "get_realtime_traffic", "get_weather_impact")
+
+
+def next_step(query, results, sensing="snapshot"):
+    """The Part the scripted model answers with, given the query and tool results so far."""
+    if any(word in query for word in LATE_WORDS):
+        if "check_user_movement" not in results:
+            return _call("check_user_movement", current_speed_kmh=2.0, expected_arrival_minutes=50)
+        if "send_team_notification" not in results:
+            match = re.search(r"(\d{1,2})시", query)
+            meeting = f"{int(match.group(1)):02d}:00" if match else "09:00"
+            return _call("send_team_notification",
+                         message=f"교통사고로 {meeting} 회의에 늦을 것 같습니다.", expected_arrival="09:20")
+        return types.Part(text="팀에 지연 상황과 예상 도착 시간(09:20)을 알렸습니다.")
+
+    conditions = _conditions(query)
+    if sensing == "sequential":
+        for name in SEQUENTIAL_SENSING:
+            if name not in results:
+                args = {"conditions": conditions} if name == "get_weather_impact" and conditions else {}
+                return _call(name, **args)
+        snapshot = {"calendar": results["get_calendar_schedule"], "traffic": results["get_realtime_traffic"],
+                    "weather": results["get_weather_impact"]}
+    elif "get_morning_snapshot" not in results:
+        return _call("get_morning_snapshot", **({"conditions": conditions} if conditions else {}))
+    else:
+        snapshot = results["get_morning_snapshot"]
+    if "calculate_optimal_wakeup" not in results:
+        event = (snapshot.get("calendar") or {}).get("first_event") or {}
+        match = re.search(r"(\d{1,2})시", query)
+        return _call(
+            "calculate_optimal_wakeup",
+            first_event_time=f"{int(match.group(1)):02d}:00" if match else event.get("start", "09:00"),
+            commute_minutes=(snapshot.get("traffic") or {}).get("duration_minutes", 45),
+            weather_delay_minutes=(snapshot.get("weather") or {}).get("additional_minutes", 0),
+        )
+    wakeup = results["calculate_optimal_wakeup"].get("optimal_wakeup_time")
+    return types.Part(text=f"{wakeup}에 깨워드릴까요?")
+
+
+class ScriptedLlm(BaseLlm):
+    """BaseLlm whose responses come from next_step(); see the module docstring."""
+
+    model: str = "scripted"
+    latency_ms: float = 0.0
+    sensing: str = "snapshot"
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        contents = llm_request.contents or []
+        part = next_step(_last_user_text(contents), _tool_results(contents), self.sensing)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=0, candidates_token_count=0, total_token_count=0),
+        )
@@ -0,0 +1,162 @@
+"""Polling-policy simulator: API calls saved vs. alert-timing error, legacy vs. adaptive.
+
+Traces come from an event sink written with KKOKKI_EVENT_LOG_PATH (route_sample
+events, one trace per job) or are generated synthetically.
+
+Usage:
+    python -m benchmarks.sim_sampler --synthetic 500
+    python -m benchmarks.sim_sampler --events events.jsonl
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.eventlog import read_events
+from core.sampler import AdaptiveSampler, legacy_interval
+
+
+class Trace:
+    """Travel minutes over time (seconds from monitoring start), linearly interpolated."""
+
+    def __init__(self, name, samples, arrival, slack):
+        self.name = name
+        self.samples = sorted(samples)
+        self.arrival = arrival      # seconds from start
+        self.slack = slack          # prep + buffer, seconds
+
+    def minutes_at(self, t):
+        pts = self.samples
+        if t <= pts[0][0]:
+            return pts[0][1]
+        for (t0, m0), (t1, m1) in zip(pts, pts[1:]):
+            if t <= t1:
+                return m0 + (m1 - m0) * (t - t0) / (t1 - t0) if t1 > t0 else m1
+        return pts[-1][1]
+
+    def seconds_until_wake(self, t):
+        return self.arrival - self.minutes_at(t) * 60 - self.slack - t
+
+    def late_at(self, step=10):
+        """First moment the true wake deadline is crossed, or None."""
+        t = 0
+        while t < self.arrival:
+            if self.seconds_until_wake(t) <= 0:
+                return t
+            t += step
+        return None
+
+
+def synthetic_traces(count, seed=11):
+    rng = random.Random(seed)
+    traces = []
+    for i in range(count):
+        base = rng.uniform(25, 50)
+        surge = rng.choice([0, 0, rng.uniform(5, 20), rng.uniform(20, 60)])
+        surge_start = rng.uniform(0, 7200)
+        ramp = rng.uniform(600, 2400)
+        samples = []
+        for t in range(0, 3 * 3600 + 1, 60):
+            rise = surge * min(1.0, max(0.0, (t - surge_start) / ramp))
+            samples.append((t, round(base + rise + rng.uniform(-1, 1))))
+        traces.append(Trace(f"synthetic-{i}", samples, arrival=3 * 3600, slack=40 * 60))
+    return traces
+
+
+def traces_from_events(path):
+    by_job = defaultdict(list)
+    for event in read_events(path):
+        if event.get("kind") == "route_sample" and "arrival_iso" in event.get("fields", {}):
+            by_job[event["job_id"]].append(event)
+    traces = []
+    for job_id, events in by_job.items():
+        t0 = datetime.fromisoformat(events[0]["time"])
+        fields = events[0]["fields"]
+        arrival = (datetime.fromisoformat(fields["arrival_iso"]) - t0).total_seconds()
+        samples = [((datetime.fromisoformat(e["time"]) - t0).total_seconds(), e["fields"]["travel_minutes"])
+                   for e in events]
+        traces.append(Trace(job_id, samples, arrival, fields["slack_minutes"] * 60))
+    return traces
+
+
+def run_legacy(trace, check_count, until_alert=False):
+    """Original loop: never stops on its own, polls every 60 s once late."""
+    t, calls, detected = 0, 0, None
+    while t < trace.arrival - trace.minutes_at(t) * 60:
+        calls += 1
+        wake = trace.seconds_until_wake(t)
+        if wake <= 0 and detected is None:
+            detected = t
+            if until_alert:
+                break
+        t += legacy_interval(wake, check_count)
+    return calls, detected
+
+
+def run_adaptive(trace, check_count, max_calls):
+    sampler = AdaptiveSampler(check_count=check_count, max_calls=max_calls)
+    t, detected = 0, None
+    while True:
+        minutes = trace.minutes_at(t)
+        sampler.record(minutes, at=t)
+        wake = trace.seconds_until_wake(t)
+        if wake <= 0 and detected is None:
+            detected = t
+        departure = trace.arrival - minutes * 60 - t
+        interval = sampler.next_interval(wake, departure, alert_fired=detected is not None)
+        if interval is None:
+            return sampler.calls, detected
+        t += interval
+
+
+def summarize(label, calls, errors, missed):
+    errors_min = [e / 60 for e in errors]
+    p90 = statistics.quantiles(errors_min, n=10)[-1] if len(errors_min) >= 2 else (errors_min or [0])[0]
+    print(f"{label:<10} calls total {sum(calls):>7}  mean {statistics.mean(calls):6.1f}  "
+          f"alert delay mean {statistics.mean(errors_min) if errors_min else 0:5.1f} min  "
+          f"p90 {p90:5.1f} min  missed {missed}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", help="event sink JSONL with route_sample events")
+    parser.add_argument("--synthetic", type=int, default=300)
+    parser.add_argument("--check-count", type=int, default=5)
+    parser.add_argument("--max-calls", type=int, default=40)
+    args = parser.parse_args()
+
+    traces = traces_from_events(args.events) if args.events else synthetic_traces(args.synthetic)
+    results = {"legacy": ([], [], 0), "legacy*": ([], [], 0), "adaptive": ([], [], 0)}
+    late = 0
+    for trace in traces:
+        truth = trace.late_at()
+        late += truth is not None
+        for name, (calls, detected) in (
+                ("legacy", run_legacy(trace, args.check_count)),
+                ("legacy*", run_legacy(trace, args.check_count, until_alert=True)),
+                ("adaptive", run_adaptive(trace, args.check_count, args.max_calls))):
+            c, errs, missed = results[name]
+            c.append(calls)
+            if truth is not None:
+                if detected is None:
+                    missed += 1
+                else:
+                    errs.append(max(0, detected - truth))
+            results[name] = (c, errs, missed)
+
+    print(f"traces: {len(traces)} ({late} become late)")
+    for name, (calls, errs, missed) in results.items():
+        summarize(name, calls, errs, missed)
+    print("(legacy* = legacy calls counted only up to the alert)")
+    for name in ("legacy", "legacy*"):
+        saved = 1 - sum(results["adaptive"][0]) / max(1, sum(results[name][0]))
+        print(f"API calls saved vs {name}: {saved:.1%}")
+
+
+if __name__ == "__main__":
+    main()
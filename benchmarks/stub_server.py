@@ -0,0 +1,189 @@
+"""Local stand-in for TMAP, Slack webhooks and Gemini, for offline benchmarks.
+
+Replays the recorded responses in benchmarks/fixtures (or --fixtures DIR) with
+configurable latency and error injection. Point the engine at it with:
+
+    KKOKKI_TMAP_URL=http://127.0.0.1:8765
+    KKOKKI_GEMINI_URL=http://127.0.0.1:8765
+    SLACK_WEBHOOK_URL=http://127.0.0.1:8765/slack/T000/B000
+
+Usage:
+    python -m benchmarks.stub_server [--port 8765] [--latency 40] [--jitter 20]
+        [--latency-for transit=250] [--error-rate 0.02] [--rate-limit-rate 0.01]
+
+GET /__stats returns per-endpoint hit and injected-error counts.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (method, path pattern, endpoint name, fixture file or None for an empty "ok")
+ROUTES = [
+    ("GET", r"/tmap/pois$", "pois", "tmap_pois.json"),
+    ("GET", r"/tmap/geo/reversegeocoding$", "reverse_geocode", "tmap_reversegeocoding.json"),
+    ("POST", r"/tmap/routes$", "car", "tmap_route_car.json"),
+    ("POST", r"/tmap/routes/pedestrian$", "walk", "tmap_route_pedestrian.json"),
+    ("POST", r"/transit/routes/sub/?$", "transit", "tmap_transit.json"),
+    ("POST", r"/v1beta/models/[^/:]+:generateContent$", "gemini", "gemini_generate.json"),
+    ("POST", r"/slack/.*$", "slack", None),
+]
+
+
+class StubServer:
+    """Threaded stub HTTP server; usable in-process (start/stop) or from the CLI."""
+
+    def __init__(self, host="127.0.0.1", port=0, fixtures=FIXTURES, latency_ms=0.0, jitter_ms=0.0,
+                 latency_for=None, error_rate=0.0, error_status=503, rate_limit_rate=0.0,
+                 retry_after=1, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency_for = dict(latency_for or {})
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {}
+        self._routes = []
+        for method, pattern, name, fixture in ROUTES:
+            body = b'ok'
+            if fixture:
+                with open(os.path.join(fixtures, fixture), "rb") as f:
+                    body = f.read()
+            self._routes.append((method, re.compile(pattern), name, body))
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def snapshot(self):
+        with self._lock:
+            return {name: dict(counts) for name, counts in self.stats.items()}
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    def _plan(self, name):
+        """(delay seconds, injected status or None) for one request."""
+        with self._lock:
+            base = self.latency_for.get(name, self.latency_ms)
+            delay = max(0.0, base + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self._rng.random()
+            counts = self.stats.setdefault(name, {"hits": 0, "errors": 0, "rate_limited": 0})
+            counts["hits"] += 1
+            if roll < self.rate_limit_rate:
+                counts["rate_limited"] += 1
+                return delay, 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                counts["errors"] += 1
+                return delay, self.error_status
+        return delay, None
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without TCP_NODELAY
+            # Nagle + delayed ACK add ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def _dispatch(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                path = urlsplit(self.path).path
+                if path == "/__stats":
+                    return self._send(200, json.dumps(stub.snapshot()).encode())
+                for route_method, pattern, name, body in stub._routes:
+                    if route_method == method and pattern.search(path):
+                        delay, status = stub._plan(name)
+                        time.sleep(delay)
+                        if status == 429:
+                            return self._send(429, b'{"error": "rate limited"}',
+                                              {"Retry-After": str(stub.retry_after)})
+                        if status is not None:
+                            return self._send(status, b'{"error": "injected"}')
+                        return self._send(200, body)
+                self._send(404, b'{"error": "no stub route"}')
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def parse_latency_for(values):
+    latency_for = {}
+    for value in values or []:
+        name, _, ms = value.partition("=")
+        latency_for[name] = float(ms)
+    return latency_for
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--latency", type=float, default=0.0, help="mean latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="uniform +/- jitter in ms")
+    parser.add_argument("--latency-for", action="append", metavar="ENDPOINT=MS",
+                        help="per-endpoint latency (pois, reverse_geocode, car, walk, transit, gemini, slack)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.fixtures, args.latency, args.jitter,
+                        parse_latency_for(args.latency_for), args.error_rate, args.error_status,
+                        args.rate_limit_rate, seed=args.seed)
+    print(f"Stub server on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Engine subsystems: scheduling, transport, caching."""
+from .scheduler import MonitorScheduler, MonitorJob, DEFAULT_JOB_ID, IDLE
+from .sampler import AdaptiveSampler, legacy_interval
+from .transport import HttpTransport, get_transport
+from .cache import TTLCache, normalize_keyword
+from .geocache import GeohashCache, MmapGeoStore, geohash_encode
+from .routecache import RouteCache
+from .feed import VersionFeed
+from .eventlog import EventLog, format_event, read_events
+from .history import TravelHistory
+from .departure import solve_departure
+from .drafts import DraftCache, fill_slots
+from .notify import NotificationDispatcher, Outbox
+from .metrics import REGISTRY, Registry, track_upstream, upstream_call
+from .jobstore import JobStore
+from .sharedstate import SharedState, StatePublisher
+from .bulkimport import BulkImporter, RateBudget, parse_rows
+from .poiindex import PoiIndex, to_chosung, to_jamo
+
+__all__ = [
+    "MonitorScheduler", "MonitorJob", "DEFAULT_JOB_ID", "IDLE",
+    "AdaptiveSampler", "legacy_interval",
+    "HttpTransport", "get_transport",
+    "TTLCache", "normalize_keyword",
+    "GeohashCache", "MmapGeoStore", "geohash_encode",
+    "RouteCache",
+    "VersionFeed",
+    "EventLog", "format_event", "read_events",
+    "TravelHistory",
+    "solve_departure",
+    "DraftCache", "fill_slots",
+    "NotificationDispatcher", "Outbox",
+    "REGISTRY", "Registry", "track_upstream", "upstream_call",
+    "JobStore",
+    "SharedState", "StatePublisher",
+    "BulkImporter", "RateBudget", "parse_rows",
+    "PoiIndex", "to_chosung", "to_jamo",
+]
@@ -0,0 +1,275 @@
+"""Bulk commute import: parse CSV/JSONL, geocode each distinct place once, validate, register.
+
+Rows carry user, origin, destination, arrival_time (HH:MM) and optionally
+mode (car/transit/walk, default car), prep_time and buffer_time. The user
+becomes the job id. `BulkImporter.run` yields progress dicts, suitable for
+streaming as NDJSON:
+
+    {"type": "parsed", "rows", "invalid", "places"}
+    {"type": "geocode", "done", "total"}        one per distinct place
+    {"type": "route", "done", "total"}          one per distinct (origin, destination, mode)
+    {"type": "row", "line", "user", "ok", "error" | "minutes"}
+    {"type": "summary", "rows", "imported", "failed", "errors", ...}
+
+Upstream TMAP calls (POI cache misses and route validations) share one
+RateBudget across concurrent imports.
+
+Usage (against a running server):
+    python -m core.bulkimport commutes.csv [--url http://127.0.0.1:5050] [--dry-run]
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from .cache import normalize_keyword
+
+FIELDS = ("user", "origin", "destination", "arrival_time", "mode")
+MODES = ("car", "transit", "walk")
+INT_SETTINGS = ("prep_time", "buffer_time")
+
+
+class RateBudget:
+    """Token bucket: `acquire()` blocks until one of `rate` calls per second is available."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # Reserve the token now; a negative balance is the wait before it is ours
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.waited += wait
+        if wait:
+            time.sleep(wait)
+
+
+def parse_rows(text, fmt=None):
+    """List of (line, row, error) from CSV (header required) or JSONL text.
+
+    `fmt` is "csv" or "jsonl"; None guesses from the first character. Rows
+    that fail validation have row=None and an error message.
+    """
+    text = text.lstrip("\ufeff")
+    if fmt is None:
+        fmt = "jsonl" if text.lstrip().startswith("{") else "csv"
+    if fmt == "jsonl":
+        raw = []
+        for line, source in enumerate(text.splitlines(), 1):
+            if not source.strip():
+                continue
+            try:
+                record = json.loads(source)
+            except ValueError as e:
+                raw.append((line, None, f"invalid JSON: {e}"))
+                continue
+            if not isinstance(record, dict):
+                raw.append((line, None, "expected a JSON object"))
+                continue
+            raw.append((line, record, None))
+    elif fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        raw = [(reader.line_num, record, None) for record in reader]
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+    rows, seen = [], set()
+    for line, record, error in raw:
+        if record is not None:
+            try:
+                record = _validate(record)
+                if record["user"] in seen:
+                    raise ValueError(f"duplicate user '{record['user']}'")
+                seen.add(record["user"])
+            except ValueError as e:
+                record, error = None, str(e)
+        rows.append((line, record, error))
+    return rows
+
+
+def _validate(record):
+    row = {k.strip().lower(): (v.strip() if isinstance(v, str) else v)
+           for k, v in record.items() if k}
+    missing = [f for f in FIELDS[:4] if not row.get(f)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    try:
+        datetime.strptime(str(row["arrival_time"]), "%H:%M")
+    except ValueError:
+        raise ValueError(f"arrival_time must be HH:MM, got '{row['arrival_time']}'")
+    mode = row.get("mode") or "car"
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}, got '{mode}'")
+    clean = {"user": str(row["user"]), "origin": str(row["origin"]), "destination": str(row["destination"]),
+             "arrival_time": str(row["arrival_time"]), "mode": mode}
+    for name in INT_SETTINGS:
+        if row.get(name) not in (None, ""):
+            try:
+                clean[name] = int(row[name])
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a whole number of minutes")
+    return clean
+
+
+class BulkImporter:
+    """Runs imports against an engine; `register(**job)` defaults to engine.start_monitoring."""
+
+    def __init__(self, engine, rate=5.0, workers=8, register=None):
+        self.engine = engine
+        self.budget = RateBudget(rate)
+        self.workers = workers
+        self.register = register or engine.start_monitoring
+        self._lock = threading.Lock()
+
+    def run(self, rows, dry_run=False):
+        """Generator of progress dicts for parsed `rows` (see parse_rows); see the module docstring."""
+        t0 = time.perf_counter()
+        calls = {"geocode": 0, "route": 0}
+        valid = [(line, row) for line, row, _ in rows if row is not None]
+        errors = [{"line": line, "error": error} for line, row, error in rows if row is None]
+
+        places = {}
+        for _, row in valid:
+            for field in ("origin", "destination"):
+                places.setdefault(normalize_keyword(row[field]), row[field])
+        yield {"type": "parsed", "rows": len(rows), "invalid": len(errors), "places": len(places)}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="kkokki-import") as pool:
+            try:
+                coords = {}
+                for done, (key, result) in enumerate(self._map(pool, self._geocode, places, calls), 1):
+                    coords[key] = result
+                    yield {"type": "geocode", "done": done, "total": len(places)}
+
+                routes = {}
+                for _, row in valid:
+                    start, end = coords[normalize_keyword(row["origin"])], coords[normalize_keyword(row["destination"])]
+                    if isinstance(start, dict) and isinstance(end, dict):
+                        key = (normalize_keyword(row["origin"]), normalize_keyword(row["destination"]), row["mode"])
+                        routes.setdefault(key, (start, end, row["mode"]))
+                checked = {}
+                for done, (key, result) in enumerate(self._map(pool, self._route, routes, calls), 1):
+                    checked[key] = result
+                    yield {"type": "route", "done": done, "total": len(routes)}
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        imported = 0
+        for line, row in valid:
+            origin, destination = normalize_keyword(row["origin"]), normalize_keyword(row["destination"])
+            error = _failure("origin", coords[origin]) or _failure("destination", coords[destination])
+            route = checked.get((origin, destination, row["mode"]))
+            error = error or _failure("route", route)
+            if error is None and not dry_run:
+                try:
+                    self.register(start_name=coords[origin], end_name=coords[destination],
+                                  arrival_time=row["arrival_time"], transport_mode=row["mode"],
+                                  job_id=row["user"], **{k: row[k] for k in INT_SETTINGS if k in row})
+                except Exception as e:
+                    error = f"register: {e}"
+            if error is None:
+                imported += 1
+                yield {"type": "row", "line": line, "user": row["user"], "ok": True, "minutes": route.get("minutes")}
+            else:
+                errors.append({"line": line, "user": row["user"], "error": error})
+                yield {"type": "row", "line": line, "user": row["user"], "ok": False, "error": error}
+
+        errors.sort(key=lambda e: e["line"])
+        elapsed = time.perf_counter() - t0
+        self.engine.log(f"Bulk import: {imported}/{len(rows)} commutes" + (" (dry run)" if dry_run else ""),
+                        kind="import", imported=imported, failed=len(errors), geocode_calls=calls["geocode"])
+        yield {"type": "summary", "rows": len(rows), "imported": imported, "failed": len(errors),
+               "dry_run": dry_run, "places": len(places), "geocode_calls": calls["geocode"],
+               "route_calls": calls["route"], "seconds": round(elapsed, 3), "errors": errors}
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    @staticmethod
+    def _map(pool, fn, items, calls):
+        """Yield (key, result or exception) as `fn(value, calls)` completes for each item."""
+        futures = {pool.submit(fn, value, calls): key for key, value in items.items()}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+
+    def _spend(self, calls, kind, fn, *args):
+        self.budget.acquire()
+        with self._lock:
+            calls[kind] += 1
+        return fn(*args)
+
+    def _geocode(self, place, calls):
+        # Fill the POI cache (and the autocomplete index) through the budget; get_coordinates reads it back
+        self.engine._search_pois(
+            place, fetch=lambda keyword: self._spend(calls, "geocode", self.engine._fetch_pois, keyword))
+        return self.engine.get_coordinates(place)
+
+    def _route(self, job, calls):
+        start, end, mode = job
+        return self.engine.route_cache.get_or_load(
+            start, end, mode, lambda: self._spend(calls, "route", self.engine.calculate_route, start, end, mode))[0]
+
+
+def _failure(label, result):
+    if isinstance(result, Exception):
+        return f"{label}: {result}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import commutes from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV (user,origin,destination,arrival_time,mode) or JSONL file; - for stdin")
+    parser.add_argument("--url", default="http://127.0.0.1:5050", help="running Kkokki server")
+    parser.add_argument("--dry-run", action="store_true", help="geocode and validate only")
+    args = parser.parse_args()
+
+    import requests
+
+    data = sys.stdin.buffer.read() if args.path == "-" else open(args.path, "rb").read()
+    content_type = "application/x-ndjson" if args.path.endswith((".jsonl", ".ndjson")) else "text/csv"
+    response = requests.post(f"{args.url.rstrip('/')}/api/import", data=data, stream=True,
+                             params={"dry_run": 1} if args.dry_run else None,
+                             headers={"Content-Type": content_type})
+    if response.status_code != 200:
+        sys.exit(f"Import failed: {response.status_code} {response.text}")
+
+    summary = None
+    for line in response.iter_lines():
+        if not line:
+            continue
+        event = json.loads(line)
+        if event["type"] in ("geocode", "route"):
+            print(f"\r{event['type']:8s} {event['done']}/{event['total']}", end="", file=sys.stderr)
+            if event["done"] == event["total"]:
+                print(file=sys.stderr)
+        elif event["type"] == "summary":
+            summary = event
+    if summary is None:
+        sys.exit("Import stream ended early.")
+    for error in summary["errors"]:
+        user = f" {error['user']}:" if error.get("user") else ""
+        print(f"line {error['line']}:{user} {error['error']}")
+    print(f"{'Validated' if summary['dry_run'] else 'Imported'} {summary['imported']}/{summary['rows']} commutes "
+          f"({summary['places']} places, {summary['geocode_calls']} geocoding calls, "
+          f"{summary['route_calls']} route calls, {summary['seconds']:.1f}s)")
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
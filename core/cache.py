@@ -0,0 +1,119 @@
+"""Bounded TTL + LRU cache with single-flight loading."""
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def normalize_keyword(keyword):
+    """Cache key for a search keyword: NFC, trimmed, collapsed whitespace, case-folded."""
+    keyword = unicodedata.normalize("NFC", str(keyword))
+    return " ".join(keyword.split()).casefold()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds.
+
+    `get_or_load(key, loader)` coalesces concurrent misses for the same key:
+    only the first caller runs `loader`, the rest wait for its result (or its
+    exception). Failed loads are never cached; empty loads (no results) are
+    cached for `empty_ttl` seconds when given, so a typo or an upstream
+    hiccup is retried soon instead of sticking for the full `ttl`.
+    """
+
+    def __init__(self, maxsize=512, ttl=600.0, empty_ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.empty_ttl = empty_ttl
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._inflight = {}          # key -> Future
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return entry[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return flight.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            empty = self.empty_ttl is not None and not value
+            self.set(key, value, ttl=self.empty_ttl if empty else None)
+            flight.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            }
+
+    def _lookup(self, key):
+        """Return a live entry and mark it recently used. Caller holds the lock."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry
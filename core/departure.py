@@ -0,0 +1,98 @@
+"""Latest departure that still arrives on time, over time-dependent travel times.
+
+Travel time depends on when you leave (rush hour, transit timetables), so
+"arrival minus travel time measured now" can be off by a whole train. The
+solver looks for the latest departure d with d + travel(d) <= arrival:
+
+1. Fixed-point iteration d <- arrival - travel(d) from an initial guess. With
+   a flat or slowly varying profile this settles in one or two probes.
+2. If the fixed point is not provably the latest feasible minute, bisection
+   between the latest feasible and earliest infeasible probe seen so far.
+
+Probes are snapped to `resolution` seconds and memoised, so a solve costs
+O(log(window / resolution)) upstream calls instead of a linear scan.
+"""
+
+DEFAULT_RESOLUTION = 60
+DEFAULT_MAX_PROBES = 12
+EXPAND_STEP = 15 * 60
+
+
+def solve_departure(travel_minutes, arrival, guess_minutes=None, earliest=None,
+                    resolution=DEFAULT_RESOLUTION, max_probes=DEFAULT_MAX_PROBES,
+                    max_fixed_point=3):
+    """Latest departure (epoch seconds) whose predicted arrival is <= `arrival`.
+
+    `travel_minutes(departure_epoch)` returns the travel time when leaving at
+    that moment. `guess_minutes` seeds the fixed-point step (e.g. the travel
+    time measured now); without it the first probe is at `earliest` or, failing
+    that, one resolution step before `arrival`. Departures before `earliest`
+    are never probed.
+
+    Returns a dict: departure, minutes, arrival, feasible, method, probes.
+    When no departure in range is feasible, `departure` is the earliest one
+    probed and `feasible` is False.
+    """
+    memo = {}
+
+    def snap(ts):
+        ts = int(ts // resolution * resolution)
+        if earliest is not None:
+            ts = max(ts, int(earliest // resolution * resolution))
+        return ts
+
+    def minutes_at(d):
+        if d not in memo:
+            memo[d] = travel_minutes(d)
+        return memo[d]
+
+    def feasible(d):
+        return d + minutes_at(d) * 60 <= arrival
+
+    def result(d, method):
+        m = minutes_at(d)
+        return {"departure": d, "minutes": m, "arrival": d + m * 60,
+                "feasible": d + m * 60 <= arrival, "method": method, "probes": len(memo)}
+
+    # 1. Fixed point
+    if guess_minutes is None:
+        guess_minutes = minutes_at(snap(earliest if earliest is not None else arrival - resolution))
+    d = snap(arrival - guess_minutes * 60)
+    for _ in range(max_fixed_point):
+        nd = snap(arrival - minutes_at(d) * 60)
+        if nd == d:
+            break
+        d = nd
+    # Latest if feasible and the next slot is not (or lies past the arrival)
+    nxt = d + resolution
+    if feasible(d) and (nxt > arrival or not feasible(nxt)):
+        return result(d, "fixed_point")
+
+    # 2. Bracket from what has been probed, then bisect
+    ok = [p for p in memo if p + memo[p] * 60 <= arrival]
+    lo = max(ok) if ok else None
+    bad = [p for p in memo if p + memo[p] * 60 > arrival and (lo is None or p > lo)]
+    # Leaving after the arrival time can never be on time, so no probe is needed
+    hi = min(bad) if bad else snap(arrival) + resolution
+
+    step = EXPAND_STEP
+    while lo is None:
+        candidate = snap(min(memo) - step)
+        if candidate in memo or len(memo) >= max_probes:
+            # Hit `earliest` (or the probe budget) without finding a feasible departure
+            return result(min(memo), "bisection")
+        if feasible(candidate):
+            lo = candidate
+        else:
+            hi = min(hi, candidate)
+            step *= 2
+
+    while hi - lo > resolution and len(memo) < max_probes:
+        mid = snap((lo + hi) // 2)
+        if mid <= lo or mid >= hi:
+            break
+        if feasible(mid):
+            lo = mid
+        else:
+            hi = mid
+    return result(lo, "bisection")
@@ -0,0 +1,81 @@
+"""Speculatively generated alert messages with slots filled in at send time."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import TTLCache
+
+# Placeholders a draft must contain; filled with str.replace so other braces survive
+SLOTS = ("{delay}", "{eta}")
+
+
+def fill_slots(draft, **values):
+    for name, value in values.items():
+        draft = draft.replace("{" + name + "}", str(value))
+    return draft
+
+
+class DraftCache:
+    """Background drafts of slow-to-generate messages, keyed per route.
+
+    `prefetch(key, *args)` starts `generate(*args)` on a worker unless a
+    draft is cached or already being written. `render(key, fallback, **slots)`
+    never waits: it fills the cached draft, or `fallback` if there is none.
+    A draft missing any of SLOTS, or a failed/None generation, is discarded.
+    """
+
+    def __init__(self, generate, ttl=3600, maxsize=256, workers=1):
+        self._generate = generate
+        self._drafts = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="kkokki-draft")
+        self.generated = 0
+        self.rejected = 0
+        self.served = 0
+        self.fallbacks = 0
+
+    def prefetch(self, key, *args):
+        """Start drafting in the background. Returns True if a new draft was started."""
+        with self._lock:
+            if key in self._pending or self._drafts.get(key) is not None:
+                return False
+            self._pending.add(key)
+        self._pool.submit(self._draft, key, args)
+        return True
+
+    def ready(self, key):
+        return self._drafts.get(key) is not None
+
+    def render(self, key, fallback, **slots):
+        """(message, source) with source "draft" or "template"."""
+        draft = self._drafts.get(key)
+        with self._lock:
+            if draft is None:
+                self.fallbacks += 1
+            else:
+                self.served += 1
+        return fill_slots(draft or fallback, **slots), "draft" if draft else "template"
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._drafts),
+                "pending": len(self._pending),
+                "generated": self.generated,
+                "rejected": self.rejected,
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+            }
+
+    def _draft(self, key, args):
+        try:
+            draft = self._generate(*args)
+        except Exception:
+            draft = None
+        with self._lock:
+            if draft and all(slot in draft for slot in SLOTS):
+                self._drafts.set(key, draft.strip())
+                self.generated += 1
+            else:
+                self.rejected += 1
+            self._pending.discard(key)
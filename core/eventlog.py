@@ -0,0 +1,136 @@
+"""Fixed-capacity ring buffer of structured engine events, with an optional JSONL sink.
+
+Usage (replay a morning after a crash):
+    python -m core.eventlog events.jsonl [--job JOB_ID] [--since SEQ]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+
+class EventLog:
+    """Thread-safe ring buffer of events with monotonically increasing sequence ids.
+
+    Each event is a dict: seq, ts (time.monotonic()), time (wall clock ISO),
+    level, job_id, kind, message and any extra keyword fields. Readers fetch
+    incrementally with `since(seq)`; events older than `capacity` are dropped.
+    """
+
+    def __init__(self, capacity=500, sink_path=None):
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self._last_seq = 0
+        self._lock = threading.Lock()
+        self._sink = None
+        if sink_path:
+            self._last_seq = _last_seq_in(sink_path)
+            self._sink = open(sink_path, "a", encoding="utf-8", buffering=1)
+            if self._sink.tell() and not _ends_with_newline(sink_path):
+                self._sink.write("\n")   # terminate a line torn by a crash
+
+    @property
+    def last_seq(self):
+        return self._last_seq
+
+    def append(self, message, level="info", kind="log", job_id=None, **fields):
+        now = datetime.now()
+        event = {
+            "seq": 0,
+            "ts": time.monotonic(),
+            "time": now.isoformat(timespec="seconds"),
+            "level": level,
+            "job_id": job_id,
+            "kind": kind,
+            "message": message,
+        }
+        if fields:
+            event["fields"] = fields
+        with self._lock:
+            self._last_seq += 1
+            event["seq"] = self._last_seq
+            self._ring[self._last_seq % self.capacity] = event
+            if self._sink:
+                self._sink.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+        return event
+
+    def since(self, seq=0, limit=None, job_id=None):
+        """Events with sequence id > seq that are still retained, oldest first."""
+        with self._lock:
+            last = self._last_seq
+            first = max(seq + 1, last - self.capacity + 1, 1)
+            events = [self._ring[i % self.capacity] for i in range(first, last + 1)]
+        if job_id is not None:
+            events = [e for e in events if e["job_id"] in (job_id, None)]
+        if limit is not None:
+            events = events[:limit]
+        return events
+
+    def tail(self, n, job_id=None):
+        start = 0 if job_id is not None else max(0, self._last_seq - n)
+        return self.since(start, job_id=job_id)[-n:]
+
+    def close(self):
+        if self._sink:
+            self._sink.close()
+            self._sink = None
+
+
+def format_event(event):
+    """Legacy one-line rendering: "[HH:MM] message"."""
+    return f"[{event['time'][11:16]}] {event['message']}"
+
+
+def read_events(path, since=0, job_id=None):
+    """Yield events from a JSONL sink file, skipping a torn final line."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event["seq"] <= since:
+                continue
+            if job_id is not None and event.get("job_id") not in (job_id, None):
+                continue
+            yield event
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _last_seq_in(path):
+    """Sequence id of the last complete event in an existing sink, so ids keep increasing."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 65536))
+        for line in reversed(f.read().splitlines()):
+            try:
+                return int(json.loads(line)["seq"])
+            except (ValueError, KeyError):
+                continue
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay events from a Kkokki event sink.")
+    parser.add_argument("path")
+    parser.add_argument("--job", default=None)
+    parser.add_argument("--since", type=int, default=0)
+    args = parser.parse_args()
+    for event in read_events(args.path, args.since, args.job):
+        extra = f" {json.dumps(event['fields'], ensure_ascii=False)}" if event.get("fields") else ""
+        job = f" <{event['job_id']}>" if event.get("job_id") else ""
+        print(f"#{event['seq']} {event['time']} {event['level'].upper()}{job} [{event['kind']}] "
+              f"{event['message']}{extra}")
+
+
+if __name__ == "__main__":
+    main()
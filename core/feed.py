@@ -0,0 +1,44 @@
+"""Monotonic version counter that lets readers block until monitoring state changes."""
+import threading
+
+
+class VersionFeed:
+    """Bumped on every state transition, new result or log line.
+
+    Readers remember the last version they saw and call `wait(since)` to
+    sleep until something newer exists, instead of polling. Bumps carry the
+    job they concern, so `version_of(job_id)` / `wait(since, key=job_id)`
+    only move when that job (or something shown for every job, key=None)
+    changed.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._shared = 0          # last bump that concerns every key
+        self._keys = {}           # key -> last bump that concerned it
+        self._cond = threading.Condition()
+
+    @property
+    def version(self):
+        return self._version
+
+    def version_of(self, key):
+        """Version of the last change visible to `key`."""
+        return max(self._keys.get(key, 0), self._shared)
+
+    def bump(self, key=None):
+        with self._cond:
+            self._version += 1
+            if key is None:
+                self._shared = self._version
+            else:
+                self._keys[key] = self._version
+            self._cond.notify_all()
+            return self._version
+
+    def wait(self, since, timeout=None, key=None):
+        """Block until the version (of `key`, if given) is > since, or timeout; returns it."""
+        current = (lambda: self._version) if key is None else (lambda: self.version_of(key))
+        with self._cond:
+            self._cond.wait_for(lambda: current() > since, timeout)
+            return current()
@@ -0,0 +1,181 @@
+"""Geohash-quantized cache for reverse geocoding, with an optional mmap-backed disk tier."""
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from .cache import TTLCache
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat, lon, precision=8):
+    """Standard base32 geohash of (lat, lon)."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    ch = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch = (ch << 1) | 1
+                lon_lo = mid
+            else:
+                ch <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits = 0
+            ch = 0
+    return "".join(chars)
+
+
+class MmapGeoStore:
+    """Fixed-size open-addressing table of geohash -> small JSON value in a memory-mapped file.
+
+    Each slot is RECORD_SIZE bytes: 12-byte geohash, 2-byte payload length,
+    payload. Collisions probe linearly for PROBES slots; when all are taken
+    the home slot is overwritten, so the file never grows.
+    """
+
+    MAGIC = b"KKGH"
+    HEADER = struct.Struct("<4sBBxxI")   # magic, version, precision, capacity
+    RECORD_SIZE = 256
+    KEY_SIZE = 12
+    PROBES = 8
+
+    def __init__(self, path, precision=8, capacity=65536):
+        self.path = path
+        self.precision = precision
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        size = self.HEADER.size + capacity * self.RECORD_SIZE
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Web workers open the same file: one at a time may check and (re)initialise it,
+            # so a second worker never truncates records the first has already written
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            header = os.pread(fd, self.HEADER.size, 0)
+            if len(header) != self.HEADER.size or self.HEADER.unpack(header) != (
+                    self.MAGIC, 1, precision, capacity):
+                # New file, or one written with different settings: start fresh
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, self.HEADER.pack(self.MAGIC, 1, precision, capacity), 0)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)   # the mmap holds a dup of fd, which would keep the lock
+            os.close(fd)
+
+    def get(self, geohash):
+        key = geohash.encode("ascii")
+        with self._lock:
+            for offset in self._probe(key):
+                stored = self._mm[offset:offset + self.KEY_SIZE].rstrip(b"\0")
+                if not stored:
+                    return None
+                if stored == key:
+                    length = struct.unpack_from("<H", self._mm, offset + self.KEY_SIZE)[0]
+                    start = offset + self.KEY_SIZE + 2
+                    try:
+                        return json.loads(self._mm[start:start + length])
+                    except ValueError:
+                        # Torn by a concurrent write from another web worker: treat as a miss
+                        return None
+        return None
+
+    def put(self, geohash, value):
+        key = geohash.encode("ascii")
+        payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(payload) > self.RECORD_SIZE - self.KEY_SIZE - 2:
+            return False
+        with self._lock:
+            target = None
+            for offset in self._probe(key):
+                stored = self._mm[offset:offset + self.KEY_SIZE].rstrip(b"\0")
+                if not stored or stored == key:
+                    target = offset
+                    break
+            if target is None:
+                target = next(self._probe(key))
+            record = key.ljust(self.KEY_SIZE, b"\0") + struct.pack("<H", len(payload)) + payload
+            self._mm[target:target + len(record)] = record
+        return True
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        self._mm.close()
+
+    def _probe(self, key):
+        home = zlib.crc32(key) % self.capacity
+        for i in range(self.PROBES):
+            yield self.HEADER.size + ((home + i) % self.capacity) * self.RECORD_SIZE
+
+
+class GeohashCache:
+    """Reverse-geocode results shared by every point in the same geohash cell.
+
+    Lookups go memory (LRU) -> disk (optional mmap store) -> loader; only the
+    loader counts as an upstream call.
+    """
+
+    def __init__(self, precision=8, maxsize=4096, ttl=7 * 24 * 3600, path=None, disk_capacity=65536):
+        self.precision = precision
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.disk = MmapGeoStore(path, precision, disk_capacity) if path else None
+        self.disk_hits = 0
+        self.upstream_calls = 0
+
+    def key(self, lat, lon):
+        return geohash_encode(float(lat), float(lon), self.precision)
+
+    def get_or_load(self, lat, lon, loader):
+        geohash = self.key(lat, lon)
+
+        def load():
+            if self.disk is not None:
+                value = self.disk.get(geohash)
+                if value is not None:
+                    self.disk_hits += 1
+                    return value
+            self.upstream_calls += 1
+            value = loader()
+            if self.disk is not None:
+                self.disk.put(geohash, value)
+            return value
+
+        return self.memory.get_or_load(geohash, load)
+
+    def stats(self):
+        mem = self.memory.stats()
+        lookups = mem["hits"] + mem["misses"] + mem["coalesced"]
+        avoided = lookups - self.upstream_calls
+        return {
+            "precision": self.precision,
+            "size": mem["size"],
+            "lookups": lookups,
+            "memory_hits": mem["hits"] + mem["coalesced"],
+            "disk_hits": self.disk_hits,
+            "upstream_calls": self.upstream_calls,
+            "avoided": avoided,
+            "avoided_rate": round(avoided / lookups, 3) if lookups else 0.0,
+        }
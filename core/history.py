@@ -0,0 +1,280 @@
+"""Append-only travel-time history with per-weekday / time-of-day predictions.
+
+Samples are fixed-size binary records appended to a file (or an in-memory
+buffer when no path is given) and scanned through a read-only memory map.
+Route keys are interned to integer ids in a sidecar `<path>.keys` file.
+A running mean/variance per (route, mode, weekday, 15-minute slot) is kept
+in memory so predictions are O(1); without a path only about the last
+`memory_records` raw samples are kept, while the aggregates still cover
+all of them. A `readonly` history (web workers next to the monitor process
+that appends) never writes or repairs the files and picks up newly
+appended samples before each prediction.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+RECORD = struct.Struct("<qIfHBx")   # epoch seconds, key id, distance km, minutes, mode id
+MODES = {"car": 0, "walk": 1, "transit": 2}
+MODE_NAMES = {v: k for k, v in MODES.items()}
+SLOT_SECONDS = 900
+SLOTS_PER_DAY = 86400 // SLOT_SECONDS
+
+
+def _slot_of(ts, utc_offset):
+    local = int(ts) + utc_offset
+    weekday = (local // 86400 + 3) % 7   # 1970-01-01 was a Thursday; Monday == 0
+    return weekday, (local % 86400) // SLOT_SECONDS
+
+
+class _Welford:
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class TravelHistory:
+    """Append-only store of (route key, mode, timestamp, minutes, distance) samples."""
+
+    def __init__(self, path=None, min_samples=5, utc_offset=None, readonly=False, memory_records=100_000):
+        self.path = path
+        self.memory_records = memory_records
+        self.readonly = readonly and path is not None
+        self.min_samples = min_samples
+        self.utc_offset = time.localtime().tm_gmtoff if utc_offset is None else utc_offset
+        self._lock = threading.Lock()
+        self._key_ids = {}
+        self._key_names = []
+        self._slots = {}       # (key_id, mode_id, weekday, slot) -> _Welford
+        self._count = 0
+        self._buffer = None
+        self._file = None
+        self._keys_file = None
+
+        self._read_size = 0    # readonly: bytes of records already aggregated
+        self._keys_read = 0    # readonly: bytes of the keys file already interned
+
+        if path is None:
+            self._buffer = bytearray()
+        elif self.readonly:
+            self._catch_up()
+        else:
+            if os.path.exists(path + ".keys"):
+                with open(path + ".keys", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            self._intern(json.loads(line))
+                        except ValueError:
+                            break   # torn final line
+            self._file = open(path, "ab")
+            self._keys_file = open(path + ".keys", "a", encoding="utf-8")
+            # Drop a partially written trailing record
+            size = self._file.tell()
+            if size % RECORD.size:
+                self._file.truncate(size - size % RECORD.size)
+            self._rebuild()
+
+    def __len__(self):
+        return self._count
+
+    # ─── Writes ────────────────────────────────────────────────
+
+    def append(self, route_key, mode, minutes, distance=0.0, ts=None):
+        self.append_many([(route_key, mode, minutes, distance, time.time() if ts is None else ts)])
+
+    def append_many(self, samples):
+        """Append (route_key, mode, minutes, distance, ts) tuples in one write."""
+        if self.readonly:
+            raise ValueError("TravelHistory was opened read-only")
+        with self._lock:
+            out = bytearray()
+            for route_key, mode, minutes, distance, ts in samples:
+                key_id = self._key_ids.get(route_key)
+                if key_id is None:
+                    key_id = self._intern(route_key)
+                    if self._keys_file:
+                        self._keys_file.write(json.dumps(route_key, ensure_ascii=False) + "\n")
+                        self._keys_file.flush()
+                mode_id = MODES.get(mode, 0)
+                minutes = max(0, min(65535, int(round(minutes))))
+                out += RECORD.pack(int(ts), key_id, float(distance or 0.0), minutes, mode_id)
+                self._aggregate(int(ts), key_id, distance, minutes, mode_id)
+            if self._buffer is not None:
+                self._buffer += out
+                # Ring: drop the oldest raw samples in batches of a quarter of the cap
+                excess = len(self._buffer) // RECORD.size - self.memory_records
+                if excess > self.memory_records // 4:
+                    del self._buffer[:excess * RECORD.size]
+            else:
+                self._file.write(out)
+                self._file.flush()
+
+    # ─── Reads ─────────────────────────────────────────────────
+
+    def scan(self, route_key=None, mode=None, start=None, end=None):
+        """Yield raw records (ts, key_id, distance, minutes, mode_id), optionally filtered."""
+        key_id = self._key_ids.get(route_key) if route_key is not None else None
+        if route_key is not None and key_id is None:
+            return
+        mode_id = MODES.get(mode) if mode is not None else None
+        for rec in self._records():
+            if key_id is not None and rec[1] != key_id:
+                continue
+            if mode_id is not None and rec[4] != mode_id:
+                continue
+            if start is not None and rec[0] < start:
+                continue
+            if end is not None and rec[0] >= end:
+                continue
+            yield rec
+
+    def predict(self, route_key, mode, when=None):
+        """Expected minutes for a route at a moment, from the matching weekday/slot history.
+
+        Widens to the neighbouring slots, then to the same slot on any
+        weekday, until `min_samples` samples are pooled. Returns None if the
+        route has no history at all.
+        """
+        if self.readonly:
+            self._catch_up()
+        key_id = self._key_ids.get(route_key)
+        if key_id is None:
+            return None
+        mode_id = MODES.get(mode, 0)
+        weekday, slot = _slot_of(time.time() if when is None else when, self.utc_offset)
+
+        tiers = (
+            ("weekday_slot", [(weekday, slot)]),
+            ("weekday_window", [(weekday, (slot + d) % SLOTS_PER_DAY) for d in (-1, 0, 1)]),
+            ("any_day_slot", [(wd, (slot + d) % SLOTS_PER_DAY) for wd in range(7) for d in (-1, 0, 1)]),
+        )
+        pooled = _Welford()
+        basis = None
+        with self._lock:
+            for basis, cells in tiers:
+                pooled = _Welford()
+                for wd, s in cells:
+                    cell = self._slots.get((key_id, mode_id, wd, s))
+                    if cell:
+                        pooled.merge(cell)
+                if pooled.n >= self.min_samples:
+                    break
+        if pooled.n == 0:
+            return None
+        std = pooled.std
+        return {
+            "minutes": round(pooled.mean, 1),
+            "std": round(std, 2),
+            "samples": pooled.n,
+            "basis": basis,
+            "confident": pooled.n >= self.min_samples and std <= max(2.0, 0.1 * pooled.mean),
+        }
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._keys_file.close()
+            self._file = self._keys_file = None
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    def _intern(self, route_key):
+        key_id = len(self._key_names)
+        self._key_ids[route_key] = key_id
+        self._key_names.append(route_key)
+        return key_id
+
+    def _aggregate(self, ts, key_id, distance, minutes, mode_id):
+        weekday, slot = _slot_of(ts, self.utc_offset)
+        cell = self._slots.get((key_id, mode_id, weekday, slot))
+        if cell is None:
+            cell = self._slots[(key_id, mode_id, weekday, slot)] = _Welford()
+        cell.add(minutes)
+        self._count += 1
+
+    def _rebuild(self):
+        """Recompute slot aggregates from disk (hot loop kept free of method calls)."""
+        slots = self._slots
+        offset = self.utc_offset
+        count = 0
+        for ts, key_id, _, minutes, mode_id in self._records():
+            local = ts + offset
+            key = (key_id, mode_id, (local // 86400 + 3) % 7, (local % 86400) // SLOT_SECONDS)
+            cell = slots.get(key)
+            if cell is None:
+                cell = slots[key] = _Welford()
+            cell.add(minutes)
+            count += 1
+        self._count = count
+
+    def _catch_up(self):
+        """Readonly: intern new complete key lines, then aggregate new complete records.
+
+        The writer flushes a key before any record using it, so records whose
+        key is not known yet are left for the next call.
+        """
+        with self._lock:
+            if os.path.exists(self.path + ".keys"):
+                with open(self.path + ".keys", "rb") as f:
+                    f.seek(self._keys_read)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break   # still being written
+                        self._keys_read += len(line)
+                        self._intern(json.loads(line))
+            if not os.path.exists(self.path):
+                return
+            size = os.path.getsize(self.path)
+            size -= size % RECORD.size
+            if size <= self._read_size:
+                return
+            with open(self.path, "rb") as f:
+                f.seek(self._read_size)
+                data = f.read(size - self._read_size)
+            known = len(self._key_names)
+            for ts, key_id, distance, minutes, mode_id in RECORD.iter_unpack(data):
+                if key_id >= known:
+                    break
+                self._aggregate(ts, key_id, distance, minutes, mode_id)
+                self._read_size += RECORD.size
+
+    def _records(self):
+        if self._buffer is not None:
+            with self._lock:
+                data = bytes(self._buffer)    # bounded by memory_records; appends may continue meanwhile
+            yield from RECORD.iter_unpack(data)
+            return
+        size = os.path.getsize(self.path)
+        size -= size % RECORD.size
+        if size == 0:
+            return
+        chunk = RECORD.size * 4096
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, size, chunk):
+                yield from RECORD.iter_unpack(mm[offset:min(size, offset + chunk)])
@@ -0,0 +1,204 @@
+"""SQLite (WAL) store for monitor jobs, so active commutes survive restarts.
+
+One row per job: its definition, the resolved coordinates (no re-geocoding
+after a restart), the last result and the alert-sent flag. New jobs and
+alert flags are written synchronously; the per-check state is write-behind:
+`save_state` only records the latest snapshot and a writer thread commits
+all dirty jobs in one transaction every `flush_interval` seconds.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+SETTINGS = ("prep_time", "buffer_time", "check_count", "early_warning_enabled",
+            "early_warning_minutes", "urgent_alert_enabled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id          TEXT PRIMARY KEY,
+    definition      TEXT NOT NULL,
+    start_coord     TEXT,
+    end_coord       TEXT,
+    status          TEXT,
+    latest_result   TEXT,
+    slack_sent      INTEGER NOT NULL DEFAULT 0,
+    alarm_dismissed INTEGER NOT NULL DEFAULT 0,
+    updated_at      REAL NOT NULL
+)
+"""
+
+_UPSERT = """
+INSERT INTO jobs (job_id, definition, start_coord, end_coord, status, latest_result,
+                  slack_sent, alarm_dismissed, updated_at)
+VALUES (:job_id, :definition, :start_coord, :end_coord, :status, :latest_result,
+        :slack_sent, :alarm_dismissed, :updated_at)
+ON CONFLICT(job_id) DO UPDATE SET
+    definition = excluded.definition, start_coord = excluded.start_coord,
+    end_coord = excluded.end_coord, status = excluded.status,
+    latest_result = excluded.latest_result, slack_sent = excluded.slack_sent,
+    alarm_dismissed = excluded.alarm_dismissed, updated_at = excluded.updated_at
+"""
+
+
+def _dumps(value):
+    return None if value is None else json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _loads(text):
+    return None if text is None else json.loads(text)
+
+
+def job_row(job):
+    """Serialise a MonitorJob (called on the caller's thread, so the snapshot is consistent)."""
+    return {
+        "job_id": job.job_id,
+        "definition": _dumps({
+            "start": job.start, "end": job.end, "arrival_time": job.arrival_time,
+            "transport_mode": job.transport_mode,
+            "settings": {name: getattr(job, name) for name in SETTINGS},
+        }),
+        "start_coord": _dumps(job.start_coord),
+        "end_coord": _dumps(job.end_coord),
+        "status": job.status,
+        "latest_result": _dumps(job.latest_result),
+        "slack_sent": int(bool(job.slack_sent)),
+        "alarm_dismissed": int(bool(job.alarm_dismissed)),
+        "updated_at": time.time(),
+    }
+
+
+class JobStore:
+    """Durable job rows; see the module docstring for the write policy."""
+
+    def __init__(self, path, flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(_SCHEMA)
+        self._db_lock = threading.Lock()     # serialises all statements on the one connection
+        self._dirty = {}                     # job_id -> row awaiting the writer
+        self._owners = {}                    # job_id -> the MonitorJob allowed to write that row
+        self._dirty_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.counters = {"writes": 0, "flushes": 0}
+        self._writer = threading.Thread(target=self._write_loop, name="kkokki-jobstore", daemon=True)
+        self._writer.start()
+
+    def put(self, job):
+        """Insert or replace a job now (new jobs and alert flags must not be lost).
+
+        The job becomes the row's owner: state from a replaced or deleted job
+        object with the same id (e.g. a check still in flight) is ignored.
+        """
+        row = job_row(job)
+        with self._db_lock:
+            with self._dirty_lock:
+                self._owners[job.job_id] = job
+                self._dirty.pop(job.job_id, None)
+            self._execute_many([row])
+
+    def adopt(self, job):
+        """Make a job recovered from load() the owner of its row, without writing."""
+        with self._dirty_lock:
+            self._owners[job.job_id] = job
+
+    def save_state(self, job, sync=False):
+        """Queue the job's current state for the next write-behind flush,
+        or with `sync` commit it before returning (alert-sent flags)."""
+        row = job_row(job)
+        if not sync:
+            with self._dirty_lock:
+                if self._owners.get(job.job_id) is job:
+                    self._dirty[job.job_id] = row
+            return
+        with self._db_lock:
+            with self._dirty_lock:
+                if self._owners.get(job.job_id) is not job:
+                    return
+                self._dirty.pop(job.job_id, None)
+            self._execute_many([row])
+
+    def delete(self, job, job_id=None):
+        """Remove a job's row, if `job` still owns it (pass job=None with job_id to force)."""
+        job_id = job_id or job.job_id
+        with self._db_lock:
+            with self._dirty_lock:
+                if job is not None and self._owners.get(job_id) is not job:
+                    return
+                self._owners.pop(job_id, None)
+                self._dirty.pop(job_id, None)
+            self._db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def load(self):
+        """All stored jobs as dicts with decoded JSON fields, oldest first."""
+        self.flush()
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT job_id, definition, start_coord, end_coord, status, latest_result,"
+                " slack_sent, alarm_dismissed FROM jobs ORDER BY updated_at").fetchall()
+        return [{
+            "job_id": job_id, "definition": _loads(definition),
+            "start_coord": _loads(start_coord), "end_coord": _loads(end_coord),
+            "status": status, "latest_result": _loads(latest_result),
+            "slack_sent": bool(slack_sent), "alarm_dismissed": bool(alarm_dismissed),
+        } for job_id, definition, start_coord, end_coord, status, latest_result, slack_sent, alarm_dismissed
+            in rows]
+
+    def flush(self):
+        """Commit every queued state snapshot in one transaction."""
+        with self._db_lock:
+            with self._dirty_lock:
+                rows, self._dirty = self._dirty, {}
+            if not rows:
+                return
+            try:
+                self._execute_many(list(rows.values()))
+            except sqlite3.Error:
+                with self._dirty_lock:
+                    for job_id, row in rows.items():
+                        self._dirty.setdefault(job_id, row)   # keep unless superseded meanwhile
+                raise
+            self.counters["flushes"] += 1
+
+    def count(self):
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def stats(self):
+        with self._dirty_lock:
+            return dict(self.counters, pending=len(self._dirty))
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    def _execute_many(self, rows):
+        """Caller holds _db_lock."""
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany(_UPSERT, rows)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        self.counters["writes"] += len(rows)
+
+    def _write_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            if self._closed:
+                return
+            try:
+                self.flush()
+            except sqlite3.Error:
+                time.sleep(self.flush_interval)   # e.g. database locked; the rows stay queued
@@ -0,0 +1,254 @@
+"""Minimal Prometheus-style metrics (counters, gauges, histograms) with text exposition.
+
+Label children are cached, so the hot path is one dict lookup plus a locked
+add. Everything registers on the process-wide REGISTRY, rendered by /metrics.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}     # label values as strings -> child (what gets rendered)
+        self._lookup = {}       # label values as passed -> child (hot-path cache)
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._lookup[()] = self._new_child()
+
+    def labels(self, *values, **kwvalues):
+        if kwvalues:
+            values = tuple(kwvalues[n] for n in self.labelnames)
+        child = self._lookup.get(values)
+        if child is None:
+            key = tuple(str(v) for v in values)
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+                self._lookup[values] = child
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    # Unlabelled metrics proxy straight to their only child
+    def __getattr__(self, attr):
+        if attr.startswith("_") or self.__dict__.get("labelnames", True):
+            raise AttributeError(attr)
+        return getattr(self._children[()], attr)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def _render_child(self, key, child):
+        yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Gauge(_Metric):
+    """Gauge; with `callback` its samples are computed at scrape time.
+
+    The callback returns a number (unlabelled) or a dict of label tuple -> value.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def _new_child(self):
+        return _Value()
+
+    def render(self):
+        if self.callback is not None:
+            samples = self.callback()
+            if not isinstance(samples, dict):
+                samples = {(): samples}
+            for key, value in samples.items():
+                self.labels(*(key if isinstance(key, tuple) else (key,))).set(value)
+        return super().render()
+
+    def _render_child(self, key, child):
+        yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def _render_child(self, key, child):
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+        labels = _format_labels(self.labelnames, key)
+        yield f"{self.name}_sum{labels} {_format_value(total)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        gauge = self._register(Gauge(name, documentation, labelnames, callback))
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = Registry()
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "kkokki_upstream_request_seconds", "Latency of calls to TMAP, Gemini and Slack.", ("upstream", "method"))
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "kkokki_upstream_errors_total", "Failed calls to TMAP, Gemini and Slack.", ("upstream", "method"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "kkokki_http_request_seconds", "Flask request latency (time to response headers).", ("endpoint", "method"))
+HTTP_REQUESTS = REGISTRY.counter(
+    "kkokki_http_requests_total", "Flask requests by endpoint and status.", ("endpoint", "method", "status"))
+ROUTE_CHECKS = REGISTRY.counter(
+    "kkokki_route_checks_total", "Monitor checks by transport mode and sample source.", ("mode", "source"))
+MONITOR_ERRORS = REGISTRY.counter(
+    "kkokki_monitor_errors_total", "Monitor errors (check: retried, fatal: job stopped).", ("kind",))
+CHECKS_PER_JOB = REGISTRY.histogram(
+    "kkokki_upstream_calls_per_job", "Route API calls a commute cost by the time polling stopped.",
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55))
+ALERTS_SENT = REGISTRY.counter(
+    "kkokki_alerts_sent_total", "Alerts delivered, by channel.", ("channel",))
+ALERTS_DROPPED = REGISTRY.counter(
+    "kkokki_alerts_dropped_total", "Alerts given up on, by channel.", ("channel",))
+
+
+@contextmanager
+def track_upstream(upstream, method):
+    """Time an upstream call; an exception counts as an error and is re-raised."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        UPSTREAM_ERRORS.labels(upstream, method).inc()
+        raise
+    finally:
+        UPSTREAM_LATENCY.labels(upstream, method).observe(time.perf_counter() - t0)
+
+
+def upstream_call(upstream, method):
+    """Decorator form of track_upstream."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track_upstream(upstream, method):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
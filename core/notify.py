@@ -0,0 +1,350 @@
+"""Background delivery of webhook notifications (Slack) with a persisted outbox.
+
+- Callers `enqueue` and return immediately; a dispatcher thread hands due
+  batches to a small worker pool, one in-flight request per webhook.
+- Per webhook: at most one post every `min_interval` seconds, a 429 pauses
+  the webhook for its Retry-After, and failures back off exponentially.
+- Alerts carrying the same idempotency key are only ever delivered once.
+- Alerts for one webhook queued within `coalesce_window` go out as one post.
+- With `outbox_path`, queued alerts are journaled (JSONL) and re-queued on
+  restart to the `webhooks` they were for (the journal holds only an alias).
+- Delivered and dropped keys are remembered for `remember` seconds.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import ALERTS_DROPPED, ALERTS_SENT, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+
+def webhook_alias(url):
+    """Stable non-secret name for a webhook URL, stored in the outbox instead of the URL."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+class Outbox:
+    """JSONL journal of {"op": "put", "item": ...} and {"op": "done", "key": ..., "ts": ...} lines.
+
+    Items are journaled with their webhook alias, never the URL itself, in a
+    file readable only by its owner. Opening replays the journal and rewrites
+    it with only the pending items and the recently delivered keys; so does
+    `compact`, which runs by itself every COMPACT_MIN_LINES appended lines
+    or so, dropping delivered keys older than `remember`.
+    """
+
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(self, path, remember=86400):
+        self.path = path
+        self.remember = remember
+        self.items = {}      # key -> pending item
+        self.done = {}       # key -> delivery time, within `remember`
+        if os.path.exists(path):
+            self._replay()
+        self._file = None
+        self.compact()
+
+    @property
+    def pending(self):
+        return list(self.items.values())
+
+    def put(self, item):
+        self.items[item["key"]] = item
+        record = {k: v for k, v in item.items() if k != "url"}
+        record["webhook"] = webhook_alias(item["url"])
+        self._write({"op": "put", "item": record})
+
+    def mark_done(self, key):
+        self.items.pop(key, None)
+        self.done[key] = time.time()
+        self._write({"op": "done", "key": key, "ts": self.done[key]})
+
+    def compact(self):
+        """Rewrite the journal with the pending items and the keys delivered within `remember`."""
+        cutoff = time.time() - self.remember
+        self.done = {key: ts for key, ts in self.done.items() if ts >= cutoff}
+        if self._file:
+            self._file.close()
+        tmp = self.path + ".tmp"
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as f:
+            for key, ts in self.done.items():
+                f.write(json.dumps({"op": "done", "key": key, "ts": ts}) + "\n")
+            for item in self.items.values():
+                record = {k: v for k, v in item.items() if k != "url"}
+                record["webhook"] = item.get("webhook") or webhook_alias(item["url"])
+                f.write(json.dumps({"op": "put", "item": record}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+        self._lines = self._compacted_lines = len(self.done) + len(self.items)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+
+    def close(self):
+        self._file.close()
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._lines += 1
+        # Done lines soon outnumber pending ones: rewrite every COMPACT_MIN_LINES or so
+        if self._lines > self._compacted_lines + self.COMPACT_MIN_LINES + 4 * len(self.items):
+            self.compact()
+
+    def _replay(self):
+        cutoff = time.time() - self.remember
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue   # torn final line
+                if record["op"] == "put":
+                    self.items[record["item"]["key"]] = record["item"]
+                elif record["op"] == "done":
+                    self.items.pop(record["key"], None)
+                    if record["ts"] >= cutoff:
+                        self.done[record["key"]] = record["ts"]
+
+
+class _Webhook:
+    __slots__ = ("queue", "ready_at", "busy", "failures")
+
+    def __init__(self):
+        self.queue = []        # (enqueued monotonic, item)
+        self.ready_at = 0.0    # monotonic; rate limit, Retry-After or backoff
+        self.busy = False
+        self.failures = 0
+
+
+def merge_payloads(payloads):
+    """One Slack payload carrying the attachments of several."""
+    if len(payloads) == 1:
+        return payloads[0]
+    merged = dict(payloads[0])
+    merged["text"] = f"{payloads[0].get('text', '')} ({len(payloads)})"
+    merged["attachments"] = [a for p in payloads for a in (p.get("attachments") or [{"text": p.get("text", "")}])]
+    return merged
+
+
+class NotificationDispatcher:
+    """Non-blocking notification queue; see the module docstring for delivery rules."""
+
+    def __init__(self, http, outbox_path=None, coalesce_window=2.0, min_interval=1.0,
+                 max_attempts=8, backoff_base=1.0, backoff_cap=300.0, max_batch=10,
+                 timeout=(3.05, 10.0), workers=2, remember=86400, channel="slack", on_event=None,
+                 webhooks=()):
+        self.http = http
+        self.remember = remember
+        self.channel = channel
+        self.coalesce_window = coalesce_window
+        self.min_interval = min_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._on_event = on_event
+        self._workers = workers
+        self._webhooks = {}
+        self._keys = {}    # idempotency key -> "pending", "dropped" or delivery time
+        self._finished = deque()   # (finish time, key), oldest first, for forgetting keys
+        self._aliases = {webhook_alias(url): url for url in webhooks if url}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pool = None
+        self._closed = False
+        self.counters = {"queued": 0, "sent": 0, "posts": 0, "deduplicated": 0,
+                         "rate_limited": 0, "retries": 0, "dropped": 0}
+
+        self._outbox = Outbox(outbox_path, remember) if outbox_path else None
+        if self._outbox:
+            self._keys.update(self._outbox.done)
+            self._finished.extend(sorted((ts, key) for key, ts in self._outbox.done.items()))
+            unknown = []
+            for item in self._outbox.pending:
+                item["url"] = item.get("url") or self._aliases.get(item.get("webhook"))
+                if item["url"] is None:
+                    unknown.append(item["key"])   # its webhook is no longer configured
+                else:
+                    self._queue(item)
+            for key in unknown:
+                self._outbox.mark_done(key)
+            self.counters["dropped"] += len(unknown)
+            if self.pending():
+                self._ensure_started()
+
+    def enqueue(self, url, payload, key=None):
+        """Queue a post. Returns False if `key` was already queued or delivered."""
+        with self._cond:
+            if key is not None and key in self._keys:
+                self.counters["deduplicated"] += 1
+                return False
+            self._aliases.setdefault(webhook_alias(url), url)
+            item = {"key": key or f"anon-{time.time_ns()}", "url": url, "payload": payload,
+                    "created": time.time(), "attempts": 0}
+            if self._outbox:
+                self._outbox.put(item)
+            self._queue(item)
+            self.counters["queued"] += 1
+            self._ensure_started()
+            self._cond.notify()
+        return True
+
+    def pending(self):
+        with self._cond:
+            return sum(len(w.queue) for w in self._webhooks.values())
+
+    def flush(self, timeout=None):
+        """Wait until nothing is queued or in flight. Returns True if drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(w.queue or w.busy for w in self._webhooks.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self):
+        with self._cond:
+            return dict(self.counters, pending=sum(len(w.queue) for w in self._webhooks.values()))
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._pool:
+            self._pool.shutdown(wait=True)
+        if self._outbox:
+            self._outbox.close()
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    def _queue(self, item):
+        """Caller holds the lock (or is the constructor)."""
+        self._keys[item["key"]] = "pending"
+        webhook = self._webhooks.get(item["url"])
+        if webhook is None:
+            webhook = self._webhooks[item["url"]] = _Webhook()
+        webhook.queue.append((time.monotonic(), item))
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="kkokki-notify")
+            self._thread = threading.Thread(target=self._loop, name="kkokki-notifier", daemon=True)
+            self._thread.start()
+
+    def _due_at(self, webhook):
+        return max(webhook.ready_at, webhook.queue[0][0] + self.coalesce_window)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    now = time.monotonic()
+                    waiting = [(self._due_at(w), url) for url, w in self._webhooks.items()
+                               if w.queue and not w.busy]
+                    due = [url for at, url in waiting if at <= now]
+                    if due:
+                        break
+                    self._cond.wait(min(at for at, _ in waiting) - now if waiting else None)
+                if self._closed:
+                    return
+                batches = []
+                for url in due:
+                    webhook = self._webhooks[url]
+                    webhook.busy = True
+                    batches.append((url, [item for _, item in webhook.queue[:self.max_batch]]))
+            for url, batch in batches:
+                self._pool.submit(self._deliver, url, batch)
+
+    def _deliver(self, url, batch):
+        status, retry_after, error = None, None, None
+        t0 = time.perf_counter()
+        try:
+            response = self.http.post(url, json=merge_payloads([i["payload"] for i in batch]),
+                                      timeout=self.timeout, retries=0)
+            status = response.status_code
+            retry_after = response.headers.get("Retry-After")
+        except Exception as e:
+            error = str(e)
+        UPSTREAM_LATENCY.labels(self.channel, "webhook").observe(time.perf_counter() - t0)
+        if status is None or status >= 300:
+            UPSTREAM_ERRORS.labels(self.channel, "webhook").inc()
+
+        events = []
+        with self._cond:
+            webhook = self._webhooks[url]
+            webhook.busy = False
+            now = time.monotonic()
+            self.counters["posts"] += 1
+            if status is not None and 200 <= status < 300:
+                self._finish(webhook, batch, time.time())
+                webhook.failures = 0
+                webhook.ready_at = now + self.min_interval
+                self.counters["sent"] += len(batch)
+                ALERTS_SENT.labels(self.channel).inc(len(batch))
+                events.append(("Slack: Message sent!", "info", {"count": len(batch)}))
+            elif status == 429:
+                # Rate limited: wait as told, without spending an attempt
+                self.counters["rate_limited"] += 1
+                webhook.ready_at = now + self._retry_after(retry_after, webhook.failures)
+                events.append((f"Slack rate limited; retrying in {webhook.ready_at - now:.0f}s",
+                               "warning", {"status_code": 429}))
+            elif status is None or status >= 500:
+                webhook.failures += 1
+                delay = self._backoff(webhook.failures)
+                webhook.ready_at = now + delay
+                expired = []
+                for item in batch:
+                    item["attempts"] += 1
+                    if item["attempts"] >= self.max_attempts:
+                        expired.append(item)
+                if expired:
+                    self._finish(webhook, expired, "dropped")
+                    self.counters["dropped"] += len(expired)
+                    ALERTS_DROPPED.labels(self.channel).inc(len(expired))
+                    events.append((f"Slack alert dropped after {self.max_attempts} attempts",
+                                   "error", {"count": len(expired)}))
+                self.counters["retries"] += len(batch) - len(expired)
+                events.append((f"Slack send failed: {error or status}; retrying in {delay:.0f}s",
+                               "error", {"status_code": status}))
+            else:
+                # Other 4xx: the payload or webhook is wrong, retrying will not help
+                self._finish(webhook, batch, "dropped")
+                self.counters["dropped"] += len(batch)
+                ALERTS_DROPPED.labels(self.channel).inc(len(batch))
+                webhook.ready_at = now + self.min_interval
+                events.append((f"Slack send failed: {status}", "error", {"status_code": status}))
+            self._cond.notify_all()
+
+        for message, level, fields in events:
+            if self._on_event:
+                self._on_event(message, level, **fields)
+
+    def _finish(self, webhook, items, outcome):
+        """Remove delivered/dropped items and remember their keys. Caller holds the lock."""
+        keys = {item["key"] for item in items}
+        webhook.queue = [(t, item) for t, item in webhook.queue if item["key"] not in keys]
+        now = time.time()
+        for key in keys:
+            self._keys[key] = outcome
+            self._finished.append((now, key))
+            if self._outbox:
+                self._outbox.mark_done(key)
+        # Forget keys finished more than `remember` ago, as the outbox does on replay
+        while self._finished and self._finished[0][0] < now - self.remember:
+            _, key = self._finished.popleft()
+            if self._keys.get(key) != "pending":
+                self._keys.pop(key, None)
+
+    def _backoff(self, failures):
+        return min(self.backoff_cap, self.backoff_base * 2 ** (failures - 1)) * random.uniform(0.5, 1.0)
+
+    def _retry_after(self, header, failures):
+        try:
+            return max(0.0, float(header))
+        except (TypeError, ValueError):
+            return self._backoff(failures + 1)
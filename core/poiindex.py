@@ -0,0 +1,355 @@
+"""Local autocomplete index over POIs already returned by TMAP, Hangul-aware.
+
+Names are indexed from every word start, decomposed into jamo (compound
+vowels and final consonants split, so "강나" already matches "강남") and as
+초성 strings ("ㄱㄴㅇ" matches "강남역"). Keys live in sorted lists searched
+with bisect; fuzzy search walks the same lists as an implicit trie,
+pruning with a Levenshtein row, so a one-jamo typo still matches.
+
+Snapshots are one binary file: a header, then a zlib-compressed body with
+per POI its lat, lon, hits and UTF-8 name and address, followed by both
+sorted key lists as a NUL-joined blob plus a packed array of entry
+references, so loading needs no decomposition or sorting.
+"""
+import atexit
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+         "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+_JONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+         "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# Standalone compound jamo a user may type mid-syllable
+_COMPOUNDS = {"ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+              "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ",
+              "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ"}
+
+_JAMO = {ord(c): v for c, v in _COMPOUNDS.items()}
+_CHOSUNG = {}
+for _i in range(19 * 21 * 28):
+    _cho, _rest = divmod(_i, 21 * 28)
+    _JAMO[0xAC00 + _i] = _CHO[_cho] + _JUNG[_rest // 28] + _JONG[_rest % 28]
+    _CHOSUNG[0xAC00 + _i] = _CHO[_cho]
+_CONSONANTS = set(_CHO) | set("ㄳㄵㄶㄺㄻㄼㄽㄾㄿㅀㅄ")
+_SEPARATORS = re.compile(r"[\s()\[\]{}·,./_-]+")
+
+HEADER = struct.Struct("<4sBxxxI")    # magic, version, count
+RECORD = struct.Struct("<ddIHH")      # lat, lon, hits, name bytes, address bytes
+SECTION = struct.Struct("<II")        # key count, key blob bytes (then count uint32 refs)
+MAGIC = b"KKPI"
+FUZZY_BELOW = 3     # typo-tolerant search only when exact matching found fewer POIs
+MERGE_RATIO = 32    # re-sort a key list instead of inserting once a batch is 1/32 of its size
+
+
+def to_jamo(text):
+    """Lower-cased text with Hangul syllables decomposed into single jamo."""
+    return text.casefold().translate(_JAMO)
+
+
+def to_chosung(text):
+    """Lower-cased text with each Hangul syllable replaced by its initial consonant."""
+    return text.casefold().translate(_CHOSUNG)
+
+
+def _words(text):
+    return [w for w in _SEPARATORS.split(text.casefold()) if w]
+
+
+def _is_chosung_query(text):
+    return any(c in _CONSONANTS for c in text) and all(c in _CONSONANTS or c.isdigit() for c in text)
+
+
+def _merge(keys, refs, pairs):
+    """Sorted keys/refs with the (key, ref) pairs added. A small batch is
+    bisect-inserted in place; a large one is merged with a single sort."""
+    if len(pairs) * MERGE_RATIO < len(keys):
+        for key, ref in pairs:
+            position = bisect_right(keys, key)
+            keys.insert(position, key)
+            refs.insert(position, ref)
+        return keys, refs
+    if pairs:
+        merged = sorted(list(zip(keys, refs)) + pairs)
+        keys = [key for key, _ in merged]
+        refs = [ref for _, ref in merged]
+    return keys, refs
+
+
+class PoiIndex:
+    """Prefix / 초성 / typo-tolerant lookup over POI dicts (name, lat, lon, address).
+
+    `add_many` is called with every upstream search result; `search` answers
+    autocomplete queries. With a `path`, the index loads the snapshot on
+    start and rewrites it at most every `save_interval` seconds after
+    changes (and at exit), unless `readonly`: then the snapshot is only
+    loaded and new entries stay in memory. Entries beyond `maxsize` are
+    not indexed.
+    """
+
+    def __init__(self, path=None, save_interval=60.0, maxsize=100_000, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self.save_interval = save_interval
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = []          # POI dicts
+        self._hits = []             # times each POI came back from upstream
+        self._ids = {}              # (name, lat, lon) rounded -> entry index
+        # Sorted keys, with entry << 8 | word index (where in the name the key starts) per key
+        self._jamo_keys, self._jamo_refs = [], []
+        self._chosung_keys, self._chosung_refs = [], []
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.lookups = 0
+        self.answered = 0
+        self.fuzzy = 0
+        if path:
+            if os.path.exists(path):
+                self._load(path)
+            if not readonly:
+                atexit.register(self.close)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add_many(self, pois):
+        """Index POIs (dicts with name, lat, lon, address); returns how many were new."""
+        added = 0
+        jamo, chosung = [], []      # new (key, ref) pairs, merged into the sorted lists once
+        with self._lock:
+            for poi in pois:
+                ident = (poi["name"], round(float(poi["lat"]), 5), round(float(poi["lon"]), 5))
+                index = self._ids.get(ident)
+                if index is not None:
+                    self._hits[index] += 1
+                    continue
+                if len(self._entries) >= self.maxsize:
+                    continue
+                index = self._ids[ident] = len(self._entries)
+                self._entries.append({"name": poi["name"], "lat": float(poi["lat"]), "lon": float(poi["lon"]),
+                                      "address": poi.get("address", "")})
+                self._hits.append(1)
+                for ref, jamo_key, chosung_key in self._keys_for(index, poi["name"]):
+                    jamo.append((jamo_key, ref))
+                    chosung.append((chosung_key, ref))
+                added += 1
+            self._jamo_keys, self._jamo_refs = _merge(self._jamo_keys, self._jamo_refs, jamo)
+            self._chosung_keys, self._chosung_refs = _merge(self._chosung_keys, self._chosung_refs, chosung)
+            self._dirty = self._dirty or bool(pois)
+            due = self.path and not self.readonly and self._dirty and time.monotonic() - self._saved_at >= self.save_interval
+        if due:
+            self.save()
+        return added
+
+    def search(self, query, limit=10, fuzzy=True):
+        """Up to `limit` POIs for a partial name, best first: prefix of the full
+        name, prefix of a later word, then 초성 matches, then (if `fuzzy`)
+        names one jamo edit away."""
+        compact = "".join(_words(query))
+        self.lookups += 1
+        if not compact:
+            return []
+        cap = max(limit * 20, 200)
+        found = {}       # entry -> rank tuple
+        with self._lock:
+            if _is_chosung_query(compact):
+                self._collect(self._chosung_keys, self._chosung_refs, compact, 2, 0, cap, found)
+            else:
+                jamo = to_jamo(compact)
+                self._collect(self._jamo_keys, self._jamo_refs, jamo, 0, 0, cap, found)
+                if fuzzy and len(found) < FUZZY_BELOW and len(jamo) >= 4:
+                    self.fuzzy += 1
+                    self._fuzzy(jamo, 1, cap, found)
+            ranked = sorted(found, key=lambda i: found[i] + (-self._hits[i], len(self._entries[i]["name"])))
+            results = [dict(self._entries[i]) for i in ranked[:limit]]
+        if results:
+            self.answered += 1
+        return results
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "keys": len(self._jamo_keys),
+            "lookups": self.lookups,
+            "answered": self.answered,
+            "fuzzy_lookups": self.fuzzy,
+        }
+
+    def save(self, path=None):
+        """Write the snapshot atomically (temp file, then rename)."""
+        path = path or self.path
+        with self._lock:
+            header = HEADER.pack(MAGIC, 1, len(self._entries))
+            parts = []
+            for entry, hits in zip(self._entries, self._hits):
+                name = entry["name"].encode("utf-8")[:0xFFFF]
+                address = (entry["address"] or "").encode("utf-8")[:0xFFFF]
+                parts.append(RECORD.pack(entry["lat"], entry["lon"], min(hits, 0xFFFFFFFF), len(name), len(address)))
+                parts.append(name)
+                parts.append(address)
+            for keys, refs in ((self._jamo_keys, self._jamo_refs), (self._chosung_keys, self._chosung_refs)):
+                blob = "\0".join(keys).encode("utf-8")
+                parts.append(SECTION.pack(len(keys), len(blob)))
+                parts.append(blob)
+                parts.append(array("I", refs).tobytes())
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(zlib.compress(b"".join(parts), 1))
+        os.replace(tmp, path)
+
+    def close(self):
+        if self.path and self._dirty and not self.readonly:
+            self.save()
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    @staticmethod
+    def _keys_for(index, name):
+        """(ref, jamo key, 초성 key) for each word start in the name."""
+        words = _words(name)
+        for i in range(min(len(words), 256)):
+            tail = "".join(words[i:])
+            yield index << 8 | i, tail.translate(_JAMO), tail.translate(_CHOSUNG)
+
+    def _collect(self, keys, refs, prefix, tier, distance, cap, found):
+        """Add entries whose key starts with `prefix`; rank (tier + later-word, distance)."""
+        position = bisect_left(keys, prefix)
+        end = min(len(keys), position + cap)
+        while position < end and keys[position].startswith(prefix):
+            self._rank(found, refs[position], tier, distance)
+            position += 1
+
+    def _collect_range(self, keys, refs, prefix, lo, hi, distance, cap, found):
+        position = bisect_left(keys, prefix, lo, hi)
+        start = position
+        end = min(hi, position + cap)
+        while position < end and keys[position].startswith(prefix):
+            self._rank(found, refs[position], 3, distance)
+            position += 1
+        return position - start
+
+    @staticmethod
+    def _rank(found, ref, tier, distance):
+        entry, word = ref >> 8, ref & 0xFF
+        rank = (tier + (1 if word and tier == 0 else 0), distance)
+        if rank < found.get(entry, (9,)):
+            found[entry] = rank
+
+    def _fuzzy(self, query, max_edits, cap, found):
+        """Entries with a key prefix within `max_edits` jamo edits of `query`.
+
+        Depth-first over the sorted keys as an implicit trie: the children of
+        the node for `prefix` are the runs of keys sharing prefix + next char.
+        The first jamo must match (as in most autocompletes), and only the
+        diagonal band of the edit-distance row that can stay within
+        `max_edits` is computed, which keeps a lookup well under a millisecond.
+        """
+        keys, refs = self._jamo_keys, self._jamo_refs
+        n = len(query)
+        over = max_edits + 1
+        lo = bisect_left(keys, query[0])
+        hi = bisect_left(keys, chr(ord(query[0]) + 1), lo)
+        stack = [(lo, hi, 1, [1] + [min(i - 1, over) for i in range(1, n + 1)])]
+        collected = 0
+        while stack and collected < cap:
+            lo, hi, depth, row = stack.pop()
+            while lo < hi and len(keys[lo]) == depth:
+                lo += 1      # keys that end here sort first and have no child
+            if lo == hi:
+                continue
+            prefix = keys[lo][:depth]
+            length = depth + 1
+            first, last = max(1, length - max_edits), min(n, length + max_edits)
+            head = min(length, over)
+            while lo < hi:
+                char = keys[lo][depth]
+                end = bisect_left(keys, prefix + chr(ord(char) + 1), lo, hi)
+                new = row[:]
+                new[0] = best = left = head
+                if first > 1:
+                    new[first - 1] = left = over    # left the band
+                for i in range(first, last + 1):
+                    value = row[i - 1] + (query[i - 1] != char)
+                    if row[i] < value:
+                        value = row[i] + 1
+                    if left < value:
+                        value = left + 1
+                    new[i] = left = value
+                    if value < best:
+                        best = value
+                if new[n] <= max_edits:
+                    for position in range(lo, min(end, lo + cap)):
+                        self._rank(found, refs[position], 3, new[n])
+                    collected += end - lo
+                elif best == max_edits:
+                    # Every edit is spent: the rest of the query must follow exactly
+                    for i in range(first, last + 1):
+                        if new[i] == max_edits:
+                            collected += self._collect_range(
+                                keys, refs, prefix + char + query[i:], lo, end, max_edits, cap, found)
+                elif best < max_edits:
+                    stack.append((lo, end, length, new))
+                lo = end
+
+    def _load(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            return
+        magic, version, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != 1:
+            return
+        try:
+            data = zlib.decompress(data[HEADER.size:])
+        except zlib.error:
+            return
+        offset = 0
+        try:
+            for index in range(count):
+                lat, lon, hits, name_len, address_len = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                name = data[offset:offset + name_len].decode("utf-8")
+                offset += name_len
+                address = data[offset:offset + address_len].decode("utf-8")
+                offset += address_len
+                self._ids[(name, round(lat, 5), round(lon, 5))] = index
+                self._entries.append({"name": name, "lat": lat, "lon": lon, "address": address})
+                self._hits.append(hits)
+            sections = []
+            for _ in range(2):
+                keys, blob_len = SECTION.unpack_from(data, offset)
+                offset += SECTION.size
+                blob = data[offset:offset + blob_len].decode("utf-8")
+                offset += blob_len
+                refs = array("I")
+                refs.frombytes(data[offset:offset + 4 * keys])
+                offset += 4 * keys
+                sections.append((blob.split("\0") if keys else [], refs.tolist()))
+            if any(len(keys) != len(refs) for keys, refs in sections):
+                raise ValueError("key section does not match its refs")
+            (self._jamo_keys, self._jamo_refs), (self._chosung_keys, self._chosung_refs) = sections
+        except (struct.error, ValueError):
+            self._rebuild()     # truncated snapshot: re-derive the keys from the POIs read
+
+    def _rebuild(self):
+        jamo, chosung = [], []
+        for index, entry in enumerate(self._entries):
+            for ref, jamo_key, chosung_key in self._keys_for(index, entry["name"]):
+                jamo.append((jamo_key, ref))
+                chosung.append((chosung_key, ref))
+        jamo.sort()
+        chosung.sort()
+        self._jamo_keys = [key for key, _ in jamo]
+        self._jamo_refs = [ref for _, ref in jamo]
+        self._chosung_keys = [key for key, _ in chosung]
+        self._chosung_refs = [ref for _, ref in chosung]
@@ -0,0 +1,112 @@
+"""Compact route geometry: encoded polylines and zoom-aware Douglas-Peucker simplification."""
+import math
+
+
+def encode_polyline(coords, precision=5):
+    """Encode [[lon, lat], ...] as a Google encoded polyline (lat/lon order, delta + zigzag varint)."""
+    factor = 10 ** precision
+    out = []
+    prev_lat = prev_lon = 0
+    for lon, lat in coords:
+        lat_i = int(round(float(lat) * factor))
+        lon_i = int(round(float(lon) * factor))
+        for delta in (lat_i - prev_lat, lon_i - prev_lon):
+            value = ~(delta << 1) if delta < 0 else (delta << 1)
+            while value >= 0x20:
+                out.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            out.append(chr(value + 63))
+        prev_lat, prev_lon = lat_i, lon_i
+    return "".join(out)
+
+
+def decode_polyline(encoded, precision=5):
+    """Inverse of encode_polyline; returns [[lon, lat], ...]."""
+    factor = 10 ** precision
+    coords = []
+    index = lat = lon = 0
+    length = len(encoded)
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                b = ord(encoded[index]) - 63
+                index += 1
+                result |= (b & 0x1f) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coords.append([lon / factor, lat / factor])
+    return coords
+
+
+def tolerance_for_zoom(zoom, pixels=1.0):
+    """Degrees covered by `pixels` screen pixels at a web-mercator zoom level."""
+    return pixels * 360.0 / (256 * 2 ** max(0.0, float(zoom)))
+
+
+def simplify(coords, tolerance):
+    """Douglas-Peucker simplification (iterative) with a tolerance in degrees."""
+    n = len(coords)
+    if n < 3 or tolerance <= 0:
+        return list(coords)
+
+    # Scale longitude so distances are roughly isotropic at this latitude
+    kx = math.cos(math.radians(float(coords[0][1])))
+    xs = [float(c[0]) * kx for c in coords]
+    ys = [float(c[1]) for c in coords]
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tol_sq = tolerance * tolerance
+    stack = [(0, n - 1)]
+
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        seg_sq = dx * dx + dy * dy
+        max_d = -1.0
+        index = first
+        if seg_sq == 0:
+            # Closed loop: distance from the shared endpoint
+            for i in range(first + 1, last):
+                d = (xs[i] - ax) ** 2 + (ys[i] - ay) ** 2
+                if d > max_d:
+                    max_d, index = d, i
+            limit = tol_sq
+        else:
+            # Perpendicular distance to the chord, compared without dividing
+            for i in range(first + 1, last):
+                d = abs((xs[i] - ax) * dy - (ys[i] - ay) * dx)
+                if d > max_d:
+                    max_d, index = d, i
+            max_d *= max_d
+            limit = tol_sq * seg_sq
+        if max_d > limit:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+
+    return [coords[i] for i in range(n) if keep[i]]
+
+
+def compact_route(route, zoom=None, precision=5):
+    """Copy of a route dict with `coordinates` replaced by an encoded `polyline`.
+
+    When `zoom` is given the geometry is first simplified to about one screen
+    pixel at that zoom level.
+    """
+    coords = route.get("coordinates") or []
+    if zoom is not None:
+        coords = simplify(coords, tolerance_for_zoom(zoom))
+    compact = {k: v for k, v in route.items() if k != "coordinates"}
+    compact["polyline"] = encode_polyline(coords, precision)
+    compact["precision"] = precision
+    compact["point_count"] = len(coords)
+    return compact
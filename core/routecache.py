@@ -0,0 +1,93 @@
+"""Route result cache keyed on quantized endpoints, mode and a traffic time bucket."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import TTLCache
+from .geocache import geohash_encode
+
+
+class RouteCache:
+    """Serves routes from the current time bucket, or stale ones while refreshing.
+
+    A result computed during bucket `b` is fresh until the bucket ends. During
+    bucket `b + 1` it is still returned immediately as "stale" while a single
+    background refresh fills bucket `b + 1`. Anything older is a miss and is
+    loaded synchronously (coalesced across concurrent callers).
+    """
+
+    def __init__(self, bucket_seconds=300, precision=8, maxsize=2048, refresh_workers=2):
+        self.bucket_seconds = bucket_seconds
+        self.precision = precision
+        self._entries = TTLCache(maxsize=maxsize, ttl=2 * bucket_seconds)
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers,
+                                             thread_name_prefix="kkokki-route-refresh")
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def base_key(self, start, end, mode):
+        return (
+            geohash_encode(float(start["lat"]), float(start["lon"]), self.precision),
+            geohash_encode(float(end["lat"]), float(end["lon"]), self.precision),
+            mode,
+        )
+
+    def bucket(self, at=None):
+        return int((time.time() if at is None else at) // self.bucket_seconds)
+
+    def get_or_load(self, start, end, mode, loader):
+        """Returns (route, status) with status "fresh", "stale" or "miss"."""
+        base = self.base_key(start, end, mode)
+        bucket = self.bucket()
+        current = base + (bucket,)
+
+        route = self._entries.get(current)
+        if route is not None:
+            self.fresh_hits += 1
+            return route, "fresh"
+
+        route = self._entries.get(base + (bucket - 1,))
+        if route is not None:
+            self.stale_hits += 1
+            self._refresh(current, loader)
+            return route, "stale"
+
+        self.misses += 1
+        return self._entries.get_or_load(current, loader), "miss"
+
+    def put(self, start, end, mode, route):
+        """Store a route computed elsewhere (e.g. by the monitor loop) in the current bucket."""
+        self._entries.set(self.base_key(start, end, mode) + (self.bucket(),), route)
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+    def _refresh(self, key, loader):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.refreshes += 1
+
+        def run():
+            try:
+                self._entries.get_or_load(key, loader)
+            except Exception:
+                self.refresh_errors += 1
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(run)
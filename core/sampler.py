@@ -0,0 +1,94 @@
+"""Volatility-aware polling policy for route checks."""
+import time
+from collections import deque
+
+
+def legacy_interval(seconds_until_wake, check_count):
+    """The original "smart sleep": remaining time split by check_count, 60 s once late."""
+    remaining = max(0, int(seconds_until_wake))
+    if remaining > 0 and check_count > 0:
+        return max(60, remaining // check_count)
+    return 60
+
+
+class AdaptiveSampler:
+    """Decides when a job should query TMAP next.
+
+    - Stable recent samples stretch the interval, changing ones shrink it.
+    - The interval never exceeds half the projected time until the wake
+      deadline is crossed (the deadline moves earlier as travel time rises).
+    - Polling stops once an alert has fired, departure time has passed or
+      the per-job call budget is spent; `stop_reason` says which.
+    """
+
+    def __init__(self, check_count=5, max_calls=40, min_interval=60, max_interval=1800,
+                 window=4, volatile_minutes=3, stable_minutes=1):
+        self.check_count = max(1, check_count)
+        self.max_calls = max_calls
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.volatile_minutes = volatile_minutes
+        self.stable_minutes = stable_minutes
+        self.samples = deque(maxlen=window)   # (monotonic seconds, travel minutes)
+        self.calls = 0
+        self.stop_reason = None
+
+    @property
+    def calls_left(self):
+        return max(0, self.max_calls - self.calls)
+
+    def record(self, travel_minutes, at=None, calls=1):
+        """Record a sample that cost `calls` upstream requests (0 when served from cache)."""
+        self.calls += calls
+        self.samples.append((time.monotonic() if at is None else at, travel_minutes))
+
+    def record_failure(self):
+        self.calls += 1
+
+    def volatility(self):
+        """Spread (minutes) of travel time over the recent window."""
+        if len(self.samples) < 2:
+            return None
+        minutes = [m for _, m in self.samples]
+        return max(minutes) - min(minutes)
+
+    def trend(self):
+        """Travel-time growth in minutes per second over the window (>= 0)."""
+        if len(self.samples) < 2:
+            return 0.0
+        (t0, m0), (t1, m1) = self.samples[0], self.samples[-1]
+        if t1 <= t0:
+            return 0.0
+        return max(0.0, (m1 - m0) / (t1 - t0))
+
+    def next_interval(self, seconds_until_wake, seconds_until_departure, alert_fired=False):
+        """Seconds until the next check, or None when polling should stop."""
+        if alert_fired:
+            self.stop_reason = "alert_sent"
+        elif seconds_until_departure <= 0:
+            self.stop_reason = "departed"
+        elif self.calls_left == 0:
+            self.stop_reason = "budget_exhausted"
+        else:
+            self.stop_reason = None
+        if self.stop_reason:
+            return None
+
+        volatility = self.volatility()
+        if seconds_until_wake > 0:
+            interval = seconds_until_wake / self.check_count
+            if volatility is not None:
+                if volatility >= self.volatile_minutes:
+                    interval /= 2
+                elif volatility <= self.stable_minutes and len(self.samples) == self.samples.maxlen:
+                    interval *= 1.5
+            # Re-check before rising travel time can eat the remaining slack
+            time_to_late = seconds_until_wake / (1 + self.trend() * 60)
+            interval = min(interval, time_to_late / 2)
+            # Spread what's left of the budget until departure
+            interval = max(interval, seconds_until_departure / (self.calls_left + 1))
+        else:
+            # Already late without an alert: track closely, but only while it moves
+            interval = self.min_interval if volatility is None or volatility > 0 else 2 * self.min_interval
+
+        return int(min(self.max_interval, max(self.min_interval, interval)))
@@ -0,0 +1,234 @@
+"""Timer-heap scheduler that runs route checks for many commutes on a bounded worker pool."""
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_JOB_ID = "default"
+
+# Returned by a check to keep the job active without scheduling another check
+IDLE = float("inf")
+
+
+class MonitorJob:
+    """One commute being watched, with its own settings and state."""
+
+    def __init__(self, start, end, arrival_time, transport_mode='car', job_id=DEFAULT_JOB_ID,
+                 prep_time=30, buffer_time=10, check_count=5,
+                 early_warning_enabled=False, early_warning_minutes=5,
+                 urgent_alert_enabled=True, on_change=None):
+        self.job_id = job_id
+        self.on_change = on_change
+        self.start = start
+        self.end = end
+        self.arrival_time = arrival_time
+        self.transport_mode = transport_mode
+
+        # Per-job settings (previously engine-wide attributes)
+        self.prep_time = prep_time
+        self.buffer_time = buffer_time
+        self.check_count = check_count
+        self.early_warning_enabled = early_warning_enabled
+        self.early_warning_minutes = early_warning_minutes
+        self.urgent_alert_enabled = urgent_alert_enabled
+
+        # Runtime state (status/latest_result notify on_change when they change)
+        self._status = "INITIALIZING"
+        self._latest_result = None
+        self.slack_sent = False
+        self.alarm_dismissed = False
+        self.start_coord = None
+        self.end_coord = None
+        self.check_runs = 0
+        self._cancelled = threading.Event()
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        if value != self._status:
+            self._status = value
+            self._changed()
+
+    @property
+    def latest_result(self):
+        return self._latest_result
+
+    @latest_result.setter
+    def latest_result(self, value):
+        self._latest_result = value
+        self._changed()
+
+    @property
+    def is_running(self):
+        return not self._cancelled.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        if not self._cancelled.is_set():
+            self._cancelled.set()
+            self._changed()
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+
+class MonitorScheduler:
+    """Runs due checks from a single timer heap on a bounded worker pool.
+
+    `check(job)` performs one route check and returns the number of seconds
+    until the next one, IDLE to stay active without further checks, or None
+    when the job is finished. Jobs are never run
+    concurrently with themselves: a job is re-queued only after its check returns.
+
+    Cancelled, finished and failed jobs leave the registry; the last
+    `keep_finished` of them stay visible through `get` so their final
+    status can still be shown.
+    """
+
+    def __init__(self, check, max_workers=4, on_error=None, keep_finished=256):
+        self._check = check
+        self._on_error = on_error
+        self._max_workers = max_workers
+        self._heap = []
+        self._seq = itertools.count()
+        self._jobs = {}
+        self._finished = OrderedDict()     # job_id -> job, oldest first
+        self.keep_finished = keep_finished
+        self._cond = threading.Condition()
+        self._pool = None
+        self._timer_thread = None
+        self._shutdown = False
+
+    # ─── Job registry ──────────────────────────────────────────
+
+    def submit(self, job, delay=0):
+        """Register a job (replacing any job with the same id) and schedule its first check."""
+        with self._cond:
+            previous = self._jobs.get(job.job_id)
+            if previous is not None and previous is not job:
+                previous.cancel()
+            self._jobs[job.job_id] = job
+            self._finished.pop(job.job_id, None)
+            self._ensure_started()
+            self._push(job, delay)
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a job. Returns immediately; an in-flight check finishes on its own."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.cancelled:
+                return None
+            job.cancel()
+            self._retire(job)
+            self._cond.notify()
+        return job
+
+    def get(self, job_id):
+        """The registered job, or a recently finished one, or None."""
+        job = self._jobs.get(job_id)
+        return job if job is not None else self._finished.get(job_id)
+
+    def jobs(self):
+        """Registered (not yet finished) jobs."""
+        return list(self._jobs.values())
+
+    def finished(self):
+        """Recently cancelled, finished or failed jobs, oldest first."""
+        return list(self._finished.values())
+
+    def active_count(self):
+        return sum(1 for job in self._jobs.values() if job.is_running)
+
+    def shutdown(self, wait=False):
+        with self._cond:
+            self._shutdown = True
+            for job in self._jobs.values():
+                job.cancel()
+            self._heap.clear()
+            self._cond.notify_all()
+        if self._pool:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    def _ensure_started(self):
+        if self._timer_thread is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers,
+                                            thread_name_prefix="kkokki-check")
+            self._timer_thread = threading.Thread(target=self._timer_loop,
+                                                  name="kkokki-timer", daemon=True)
+            self._timer_thread.start()
+
+    def _retire(self, job):
+        """Move a job that is done from the registry to the finished map (caller holds _cond)."""
+        if self._jobs.get(job.job_id) is not job:
+            return      # already retired, or replaced by a newer job with the same id
+        del self._jobs[job.job_id]
+        self._finished[job.job_id] = job
+        while len(self._finished) > self.keep_finished:
+            self._finished.popitem(last=False)
+
+    def _push(self, job, delay):
+        due = time.monotonic() + max(0.0, delay)
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+        # Wake the timer only if this entry is now the earliest
+        if self._heap[0][2] is job:
+            self._cond.notify()
+
+    def _timer_loop(self):
+        while True:
+            with self._cond:
+                while not self._shutdown:
+                    # Drop cancelled entries lazily
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait_for = self._heap[0][0] - time.monotonic()
+                    if wait_for <= 0:
+                        break
+                    self._cond.wait(wait_for)
+                if self._shutdown:
+                    return
+                due_jobs = []
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, job = heapq.heappop(self._heap)
+                    if not job.cancelled:
+                        due_jobs.append(job)
+            for job in due_jobs:
+                self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            job.check_runs += 1
+            next_delay = self._check(job)
+        except Exception as e:
+            job.status = "ERROR"
+            job.cancel()
+            with self._cond:
+                self._retire(job)
+            if self._on_error:
+                self._on_error(job, e)
+            return
+        if next_delay is None:
+            job.cancel()
+            with self._cond:
+                self._retire(job)
+            return
+        if next_delay == IDLE:
+            return
+        with self._cond:
+            if not job.cancelled and not self._shutdown and self._jobs.get(job.job_id) is job:
+                self._push(job, next_delay)
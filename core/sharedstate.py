@@ -0,0 +1,345 @@
+"""Monitor state shared between one scheduler process and many web workers.
+
+The scheduler process (monitor_service.py) owns the MonitorScheduler. A
+StatePublisher there copies job status and new events into a local SQLite
+file (WAL, so readers never block the writer), then bumps a version counter
+kept in a small memory-mapped file next to it. Web workers read through
+SharedState: the version is a plain memory read, status lookups are cached
+per version (a bounded LRU), and `/api/start` / `/api/stop` become rows in a command table
+that the publisher applies.
+
+    scheduler:  StatePublisher(engine, path).start()
+    web worker: state = SharedState(path); state.get_status(job_id)
+"""
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+_VERSION = struct.Struct("<Q")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id        TEXT PRIMARY KEY,
+    is_running    INTEGER NOT NULL,
+    status        TEXT NOT NULL,
+    latest_result TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq    INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT,
+    data   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_job ON events (job_id, seq);
+CREATE TABLE IF NOT EXISTS job_versions (
+    job_id  TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS commands (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    op      TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _connect(path):
+    db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(_SCHEMA)
+    return db
+
+
+def _open_version(path):
+    """Map the 8-byte version file, creating it if needed."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size < _VERSION.size:
+            os.ftruncate(fd, _VERSION.size)
+        return mmap.mmap(fd, _VERSION.size)
+    finally:
+        os.close(fd)
+
+
+class StatePublisher:
+    """Scheduler side: applies queued commands and publishes changes every `interval` seconds."""
+
+    def __init__(self, engine, path, interval=0.1, event_capacity=5000):
+        self.engine = engine
+        self.path = path
+        self.interval = interval
+        self.event_capacity = event_capacity
+        self._db = _connect(path)
+        self._version_map = _open_version(path + "-version")
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        self.version = row[0] if row else 0
+        self._event_seq = engine.events.last_seq   # engine-side seq already published
+        self._fingerprints = {}                    # job_id -> (job, status, is_running, result id)
+        self._resync = True                        # rows may exist for jobs we never fingerprinted
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="kkokki-publisher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.publish()
+        self._db.close()
+
+    def run(self):
+        # Fixed cadence rather than a write per feed bump: bursts of changes coalesce into one commit
+        while not self._stop.is_set():
+            try:
+                self.apply_commands()
+                self.publish()
+            except sqlite3.Error as e:
+                self.engine.log(f"State publish failed: {e}", level="error")
+            self._stop.wait(self.interval)
+
+    def apply_commands(self):
+        """Run start/stop requests queued by web workers, oldest first."""
+        rows = self._db.execute("SELECT id, op, payload FROM commands ORDER BY id").fetchall()
+        for command_id, op, payload in rows:
+            args = json.loads(payload)
+            try:
+                if op == "start":
+                    self.engine.start_monitoring(**args)
+                elif op == "stop":
+                    self.engine.stop_monitoring(**args)
+            except Exception as e:
+                self.engine.log(f"Command {op} failed: {e}", level="error", kind="job",
+                                job_id=args.get("job_id"))
+            self._db.execute("DELETE FROM commands WHERE id = ?", (command_id,))
+        return len(rows)
+
+    def publish(self):
+        """Write changed jobs and new events in one transaction. Returns True if anything changed.
+
+        Jobs that left the scheduler (stopped, finished or failed) are deleted,
+        so readers see them as STANDBY again.
+        """
+        jobs = []
+        live = self.engine.scheduler.jobs()
+        live_ids = {job.job_id for job in live}
+        known = self._fingerprints.keys()
+        if self._resync:
+            known = [row[0] for row in self._db.execute("SELECT job_id FROM jobs")]
+        gone = [job_id for job_id in known if job_id not in live_ids]
+        for job in live:
+            fingerprint = (job, job.status, job.is_running, id(job.latest_result))
+            if self._fingerprints.get(job.job_id) != fingerprint:
+                self._fingerprints[job.job_id] = fingerprint
+                jobs.append((job.job_id, int(job.is_running), job.status,
+                             json.dumps(job.latest_result, ensure_ascii=False, default=str)
+                             if job.latest_result is not None else None))
+        events = self.engine.events.since(self._event_seq)
+        if not jobs and not events and not gone:
+            self._resync = False
+            return False
+
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany(
+                "INSERT INTO jobs (job_id, is_running, status, latest_result) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(job_id) DO UPDATE SET is_running = excluded.is_running,"
+                " status = excluded.status, latest_result = excluded.latest_result", jobs)
+            if gone:
+                self._db.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in gone])
+                self._db.executemany("DELETE FROM job_versions WHERE job_id = ?", [(job_id,) for job_id in gone])
+            if events:
+                self._db.executemany(
+                    "INSERT INTO events (job_id, data) VALUES (?, ?)",
+                    [(e["job_id"], json.dumps(e, ensure_ascii=False, default=str)) for e in events])
+                self._db.execute(
+                    "DELETE FROM events WHERE seq <= (SELECT MAX(seq) FROM events) - ?", (self.event_capacity,))
+            self.version += 1
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,))
+            # Per-job versions, so a reader of one job ignores the others' changes
+            touched = {job[0] for job in jobs} | {e["job_id"] for e in events}
+            if gone:
+                # Their readers fall back to the shared version, which must move past what they saw
+                touched.add(None)
+            if None in touched:
+                touched.discard(None)
+                self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('shared_version', ?)",
+                                 (self.version,))
+            self._db.executemany("INSERT OR REPLACE INTO job_versions (job_id, version) VALUES (?, ?)",
+                                 [(job_id, self.version) for job_id in touched])
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            self._fingerprints.clear()   # republish every job next time
+            self._resync = True
+            raise
+        self._db.execute("COMMIT")
+        for job_id in gone:
+            self._fingerprints.pop(job_id, None)
+        self._resync = False
+        if events:
+            self._event_seq = events[-1]["seq"]
+        # Only after the commit, so a reader that sees the new version also sees the data
+        _VERSION.pack_into(self._version_map, 0, self.version)
+        return True
+
+
+class _SharedFeed:
+    """VersionFeed look-alike backed by the shared version counter."""
+
+    def __init__(self, state, poll_interval):
+        self._state = state
+        self.poll_interval = poll_interval
+
+    @property
+    def version(self):
+        return self._state.version
+
+    def version_of(self, key):
+        return self._state.job_version(key)
+
+    def wait(self, since, timeout=None, key=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            version = self._state.version if key is None else self._state.job_version(key)
+            if version > since:
+                return version
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return version
+            time.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+
+
+class _SharedEvents:
+    """EventLog look-alike (since / last_seq / tail) reading the published events."""
+
+    def __init__(self, state):
+        self._state = state
+
+    @property
+    def last_seq(self):
+        return self._state._cached("last_seq", lambda db: db.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0])
+
+    def since(self, seq=0, limit=None, job_id=None):
+        sql = "SELECT seq, data FROM events WHERE seq > ?"
+        params = [seq]
+        if job_id is not None:
+            sql += " AND (job_id = ? OR job_id IS NULL)"
+            params.append(job_id)
+        sql += " ORDER BY seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(json.loads(data), seq=s) for s, data in self._state._db().execute(sql, params)]
+
+    def tail(self, n, job_id=None):
+        sql = "SELECT seq, data FROM events"
+        params = []
+        if job_id is not None:
+            sql += " WHERE job_id = ? OR job_id IS NULL"
+            params.append(job_id)
+        rows = self._state._db().execute(sql + " ORDER BY seq DESC LIMIT ?", params + [n]).fetchall()
+        return [dict(json.loads(data), seq=s) for s, data in reversed(rows)]
+
+
+class SharedState:
+    """Web-worker side: read-only view of the published monitor state, plus a command queue.
+
+    Exposes `feed`, `events` and `get_status` like KkokkiEngine, so request
+    handlers work unchanged against either.
+    """
+
+    def __init__(self, path, poll_interval=0.05, cache_size=1024):
+        self.path = path
+        self.cache_size = cache_size
+        _connect(path).close()                 # make sure the schema exists
+        self._version_map = _open_version(path + "-version")
+        self._local = threading.local()
+        self._cache = OrderedDict()            # key -> (version, value), least recently used first
+        self._cache_lock = threading.Lock()
+        self.feed = _SharedFeed(self, poll_interval)
+        self.events = _SharedEvents(self)
+
+    @property
+    def version(self):
+        return _VERSION.unpack_from(self._version_map, 0)[0]
+
+    def get_status(self, job_id):
+        """Same shape as KkokkiEngine.get_status (logs are the last 10 events)."""
+        from .eventlog import format_event
+
+        def load(db):
+            row = db.execute("SELECT is_running, status, latest_result FROM jobs WHERE job_id = ?",
+                             (job_id,)).fetchone()
+            logs = [format_event(e) for e in self.events.tail(10, job_id)]
+            if row is None:
+                return {"is_running": False, "status": "STANDBY", "logs": logs, "latest_result": None}
+            is_running, status, latest_result = row
+            return {"is_running": bool(is_running), "status": status, "logs": logs,
+                    "latest_result": json.loads(latest_result) if latest_result else None}
+
+        version = self.job_version(job_id)        # before the data: data may only be newer
+        return dict(self._cached(("status", job_id), load), version=version)
+
+    def job_version(self, job_id):
+        """Published version of the last change visible to `job_id` (see VersionFeed.version_of)."""
+        def load(db):
+            row = db.execute("SELECT version FROM job_versions WHERE job_id = ?", (job_id,)).fetchone()
+            shared = db.execute("SELECT value FROM meta WHERE key = 'shared_version'").fetchone()
+            return max(row[0] if row else 0, shared[0] if shared else 0)
+
+        # The rows commit before the counter moves; never report past the counter
+        version, job_version = self._cached_with_version(("version", job_id), load)
+        return min(job_version, version)
+
+    def job_statuses(self):
+        """(status, is_running) of every published job, for the /metrics gauges."""
+        return self._cached("jobs", lambda db: db.execute("SELECT status, is_running FROM jobs").fetchall())
+
+    def active_count(self):
+        return sum(1 for _, running in self.job_statuses() if running)
+
+    def submit(self, op, **args):
+        """Queue a start/stop for the scheduler process (applied within its publish interval)."""
+        self._db().execute("INSERT INTO commands (op, payload) VALUES (?, ?)",
+                           (op, json.dumps(args, ensure_ascii=False)))
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, check_same_thread=False,
+                                                  isolation_level=None, timeout=5)
+        return db
+
+    def _cached(self, key, load):
+        return self._cached_with_version(key, load)[1]
+
+    def _cached_with_version(self, key, load):
+        # Read the version before the data: a concurrent publish can only make the value newer
+        version = self.version
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] == version:
+                self._cache.move_to_end(key)
+                return hit
+        entry = (version, load(self._db()))
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
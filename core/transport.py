@@ -0,0 +1,235 @@
+"""Shared HTTP transport: keep-alive pooling, per-host caps, timeouts, jittered retries.
+
+Every upstream call (TMAP, Slack) goes through one `HttpTransport` so that
+connections are reused across calls and a hung server can't block a caller
+forever. Each request is split into DNS / TCP connect / TLS / server time,
+accumulated per host and exposed via `stats()`.
+"""
+import random
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family, create_connection
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_phase = threading.local()
+
+
+def _record(phase, seconds):
+    timings = getattr(_phase, "timings", None)
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+# ─── Timed connections ─────────────────────────────────────
+
+class _TimedConnectionMixin:
+    """Times name resolution and TCP connect separately for each new socket."""
+
+    def _new_conn(self):
+        t0 = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        t1 = time.perf_counter()
+        _record("dns", t1 - t0)
+
+        # Try each resolved address in turn (IPv6 -> IPv4, several A records),
+        # as urllib3 would; TLS still verifies against self.host
+        for i, info in enumerate(infos):
+            try:
+                sock = create_connection(
+                    info[4][:2], self.timeout,
+                    source_address=self.source_address, socket_options=self.socket_options)
+                break
+            except OSError as e:
+                if i < len(infos) - 1:
+                    continue
+                if isinstance(e, socket.timeout):
+                    raise ConnectTimeoutError(
+                        self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})") from e
+                raise NewConnectionError(self, f"Failed to establish a new connection: {e}") from e
+        self._tcp_seconds = time.perf_counter() - t1
+        _record("connect", self._tcp_seconds)
+        _record("new_connections", 1)
+        self._dns_seconds = t1 - t0
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        self._dns_seconds = self._tcp_seconds = 0.0
+        super().connect()
+        _record("tls", time.perf_counter() - t0 - self._dns_seconds - self._tcp_seconds)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+# ─── Transport ─────────────────────────────────────────────
+
+class HttpTransport:
+    """Pooled requests.Session with per-host concurrency caps and retry policy.
+
+    `get`/`post` accept the usual requests keyword arguments and return the
+    final `requests.Response`. Responses with a status in RETRY_STATUSES are
+    retried with full-jitter backoff (honouring Retry-After); when retries run
+    out the last response is returned so callers keep their status checks.
+    Connection failures are always retried; read timeouts only for GET.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10.0, max_retries=2,
+                 backoff_base=0.3, backoff_cap=5.0, pool_maxsize=16, max_per_host=8):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_per_host = max_per_host
+
+        self.session = requests.Session()
+        adapter = _TimedAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._stats = {}
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, retries=None, **kwargs):
+        host = urlsplit(url).netloc
+        kwargs.setdefault("timeout", self.timeout)
+        retries = self.max_retries if retries is None else retries
+
+        attempt = 0
+        while True:
+            try:
+                response = self._send(host, method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                retryable = method == "GET" or not isinstance(e, requests.ReadTimeout)
+                if not retryable or attempt >= retries:
+                    self._count(host, "errors")
+                    raise
+                self._count(host, "retries")
+                self._sleep_backoff(attempt)
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                self._count(host, "retries")
+                self._sleep_backoff(attempt, response.headers.get("Retry-After"))
+                response.close()
+                attempt += 1
+                continue
+            if response.status_code >= 400:
+                self._count(host, "errors")
+            return response
+
+    def stats(self):
+        """Per-host counters and cumulative phase times in milliseconds."""
+        with self._lock:
+            return {
+                host: {(k[:-2] + "_ms" if k.endswith("_s") else k): (round(v * 1000, 1) if k.endswith("_s") else v)
+                       for k, v in s.items()}
+                for host, s in self._stats.items()
+            }
+
+    # ─── Internals ─────────────────────────────────────────────
+
+    def _slot(self, host):
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def _send(self, host, method, url, **kwargs):
+        _phase.timings = {}
+        t0 = time.perf_counter()
+        try:
+            with self._slot(host):
+                queued = time.perf_counter() - t0
+                response = self.session.request(method, url, **kwargs)
+        finally:
+            timings, _phase.timings = _phase.timings, None
+        elapsed = time.perf_counter() - t0
+        setup = timings.get("dns", 0.0) + timings.get("connect", 0.0) + timings.get("tls", 0.0)
+
+        with self._lock:
+            s = self._host_stats(host)
+            s["requests"] += 1
+            s["new_connections"] += int(timings.get("new_connections", 0))
+            s["queue_s"] += queued
+            s["dns_s"] += timings.get("dns", 0.0)
+            s["connect_s"] += timings.get("connect", 0.0)
+            s["tls_s"] += timings.get("tls", 0.0)
+            s["server_s"] += max(0.0, elapsed - queued - setup)
+        return response
+
+    def _host_stats(self, host):
+        s = self._stats.get(host)
+        if s is None:
+            s = self._stats[host] = {
+                "requests": 0, "new_connections": 0, "retries": 0, "errors": 0,
+                "queue_s": 0.0, "dns_s": 0.0, "connect_s": 0.0, "tls_s": 0.0, "server_s": 0.0,
+            }
+        return s
+
+    def _count(self, host, key):
+        with self._lock:
+            self._host_stats(host)[key] += 1
+
+    def _sleep_backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_cap))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_transport():
+    """Process-wide transport shared by every engine instance."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpTransport()
+        return _shared
@@ -1,82 +1,208 @@
-import requests
+import functools
+import math
 import os
-import json
-import time
 import threading
+import time
 import urllib3
-import google.generativeai as genai
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from core.scheduler import MonitorScheduler, MonitorJob, DEFAULT_JOB_ID, IDLE
+from core.sampler import AdaptiveSampler
+from core.transport import get_transport
+from core.cache import TTLCache, normalize_keyword
+from core.geocache import GeohashCache
+from core.routecache import RouteCache
+from core.feed import VersionFeed
+from core.history import TravelHistory
+from core.departure import solve_departure
+from core.drafts import DraftCache
+from core.notify import NotificationDispatcher
+from core.eventlog import EventLog, format_event
+from core.jobstore import JobStore
+from core.poiindex import PoiIndex
+from core.metrics import (ROUTE_CHECKS, MONITOR_ERRORS, CHECKS_PER_JOB,
+                          track_upstream, upstream_call)
+
 # Disable SSL warnings for corporate proxy environments
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Load environment variables
 load_dotenv()
 
+# TMAP car searchOption codes offered in route comparison
+CAR_SEARCH_OPTIONS = {"recommended": "0", "free": "1", "fastest": "2", "shortest": "10"}
+COMPARE_OPTIONS = ["car", "car:fastest", "car:free", "car:shortest", "walk", "transit"]
+# Seconds each mode may take before the comparison reports it as timed out
+COMPARE_DEADLINES = {"car": 5.0, "walk": 5.0, "transit": 8.0}
+COMPARE_DEADLINE_RANGE = (0.1, 30.0)   # seconds a caller may ask for per mode
+
+GEMINI_MODEL = 'gemini-2.5-flash-preview-09-2025'
+
+# Late alerts: drafted by the LLM once the wake deadline is this close,
+# otherwise (or until the draft is ready) sent from the template
+DRAFT_LEAD_SECONDS = 30 * 60
+LATE_TEMPLATE = "현재 교통 체증으로 인해 약 {delay}분 정도 늦을 것 같습니다. 죄송합니다. (도착 예상 {eta})"
+
+# /api/search skips TMAP when the local autocomplete index has at least this many matches
+LOCAL_SEARCH_MIN_RESULTS = 5
+
+# Skip a TMAP check in favour of history only while the wake deadline is this far away
+HISTORY_SKIP_MARGIN = 30 * 60
+
 
 class KkokkiEngine:
-    def __init__(self):
+    def __init__(self, monitor=True):
+        # monitor=False: a web worker next to a separate monitor process (see core/sharedstate.py).
+        # It serves lookups only, so it leaves the job store, outbox and event-log files to that process,
+        # and only reads the travel history and POI index snapshot (never repairs or rewrites them).
+        self.monitor = monitor
         self.sk_api_key = os.getenv("SK_API_KEY")
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.slack_webhook_url = os.getenv("SLACK_WEBHOOK_URL")
-        self.base_url = "https://apis.openapi.sk.com/tmap"
-
-        # Configurable settings (can be updated at runtime via /api/start)
+        # Overridable to point at a local stand-in (benchmarks/stub_server.py)
+        self.tmap_url = os.getenv("KKOKKI_TMAP_URL", "https://apis.openapi.sk.com").rstrip("/")
+        self.gemini_url = os.getenv("KKOKKI_GEMINI_URL") or None
+        self.base_url = f"{self.tmap_url}/tmap"
+        self.http = get_transport()
+        self.poi_cache = TTLCache(maxsize=1024, ttl=6 * 3600, empty_ttl=60)   # no match: retry soon
+        self.poi_index = PoiIndex(path=os.getenv("KKOKKI_POI_INDEX_PATH") or None, readonly=not monitor)
+        self.geo_cache = GeohashCache(
+            precision=int(os.getenv("KKOKKI_GEOHASH_PRECISION", "8")),
+            path=os.getenv("KKOKKI_GEOCACHE_PATH") or None,
+        )
+        self.route_cache = RouteCache(
+            bucket_seconds=int(os.getenv("KKOKKI_ROUTE_BUCKET_SECONDS", "300")))
+        self.history = TravelHistory(path=os.getenv("KKOKKI_HISTORY_PATH") or None, readonly=not monitor)
+        self.compare_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="kkokki-compare")
+        # Departure-solver probes: (origin, destination, mode, departure minute) -> route
+        self.probe_cache = TTLCache(maxsize=2048, ttl=600)
+        self.drafts = DraftCache(self._write_late_draft, ttl=3600)
+        self.notifier = NotificationDispatcher(
+            self.http, outbox_path=(monitor and os.getenv("KKOKKI_OUTBOX_PATH")) or None,
+            webhooks=[self.slack_webhook_url], on_event=self._on_notify_event)
+
+        # Default settings for new jobs (overridable per job via /api/start)
         self.prep_time = 30       # minutes to get ready
         self.buffer_time = 10     # extra buffer minutes
         self.check_count = 5      # number of route checks during monitoring
+        self.max_checks_per_job = int(os.getenv("KKOKKI_MAX_CHECKS_PER_JOB", "40"))
         self.early_warning_enabled = False
         self.early_warning_minutes = 5
         self.urgent_alert_enabled = True
 
         # Internal State
-        self.is_running = False
-        self.logs = []
-        self.status = "STANDBY"
-        self.latest_result = None
-        self.monitor_thread = None
-        self.slack_sent = False
-        self.alarm_dismissed = False
-
-        # API Setup
-        if self.google_api_key:
-            genai.configure(api_key=self.google_api_key)
-            self.model = genai.GenerativeModel('gemini-2.5-flash-preview-09-2025')
-        else:
-            self.log("WARNING: GOOGLE_API_KEY is not set.")
+        self.events = EventLog(
+            capacity=int(os.getenv("KKOKKI_LOG_CAPACITY", "500")),
+            sink_path=(monitor and os.getenv("KKOKKI_EVENT_LOG_PATH")) or None,
+        )
+        self.feed = VersionFeed()   # bumped per job on any status/result/log change
+        self.scheduler = MonitorScheduler(
+            self._monitor_step,
+            max_workers=int(os.getenv("KKOKKI_CHECK_WORKERS", "4")),
+            on_error=self._on_check_error,
+        )
+
+        # API Setup (the Gemini SDK is imported on first use, see `model`)
+        self._model = None
+        self._model_lock = threading.Lock()
+        if not self.google_api_key:
+            self.log("WARNING: GOOGLE_API_KEY is not set.", level="warning")
+
+        # Durable jobs: reschedule whatever was being watched before a restart
+        jobstore_path = monitor and os.getenv("KKOKKI_JOBSTORE_PATH")
+        self.jobstore = JobStore(jobstore_path) if jobstore_path else None
+        self.recovery_spread = float(os.getenv("KKOKKI_RECOVERY_SPREAD", "30"))
+        self.recovery = self.recover_jobs() if self.jobstore else None
+
+    @property
+    def has_model(self):
+        """Whether Gemini is available, without importing the SDK."""
+        return self._model is not None or bool(self.google_api_key)
+
+    @property
+    def model(self):
+        """Gemini model, created on first use (None without GOOGLE_API_KEY)."""
+        if self._model is None and self.google_api_key:
+            with self._model_lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    if self.gemini_url:
+                        genai.configure(api_key=self.google_api_key, transport="rest",
+                                        client_options={"api_endpoint": self.gemini_url})
+                    else:
+                        genai.configure(api_key=self.google_api_key)
+                    self._model = genai.GenerativeModel(GEMINI_MODEL)
+        return self._model
 
-    def log(self, message):
-        timestamp = datetime.now().strftime("%H:%M")
-        formatted_message = f"[{timestamp}] {message}"
-        print(formatted_message)
-        self.logs.append(formatted_message)
-        if len(self.logs) > 50:
-            self.logs.pop(0)
+    @model.setter
+    def model(self, value):
+        self._model = value
+
+    def log(self, message, level="info", kind="log", job_id=None, **fields):
+        event = self.events.append(message, level=level, kind=kind, job_id=job_id, **fields)
+        print(format_event(event))
+        self.feed.bump(job_id)
 
     # ─── POI / Geocoding ───────────────────────────────────────
 
-    def get_coordinates(self, keyword):
-        """Convert location name to coordinates (POI)"""
+    @upstream_call("tmap", "pois")
+    def _fetch_pois(self, keyword):
+        """Fetch up to 10 POI candidates from TMAP (uncached)"""
         url = f"{self.base_url}/pois"
         headers = {"appKey": self.sk_api_key, "Accept": "application/json"}
         params = {
             "version": 1, "format": "json",
             "searchKeyword": keyword,
-            "resCoordType": "WGS84GEO", "count": 1
+            "resCoordType": "WGS84GEO", "reqCoordType": "WGS84GEO",
+            "count": 10
         }
-        response = requests.get(url, headers=headers, params=params, verify=False)
+        response = self.http.get(url, headers=headers, params=params, verify=False)
         if response.status_code != 200:
             raise Exception(f"POI Search Failed: {response.status_code}")
         data = response.json()
         pois = data.get("searchPoiInfo", {}).get("pois", {}).get("poi", [])
+        results = []
+        for poi in pois:
+            addr_parts = [
+                poi.get("upperAddrName", ""),
+                poi.get("middleAddrName", ""),
+                poi.get("lowerAddrName", ""),
+                poi.get("detailAddrName", "")
+            ]
+            results.append({
+                "name": poi["name"],
+                "lat": float(poi["noorLat"]),
+                "lon": float(poi["noorLon"]),
+                "address": " ".join(part for part in addr_parts if part),
+                # Entrance coordinates, used for routing by get_coordinates
+                "front_lat": poi.get("frontLat", poi["noorLat"]),
+                "front_lon": poi.get("frontLon", poi["noorLon"]),
+            })
+        return results
+
+    def _search_pois(self, keyword, fetch=None):
+        """POI candidates for a keyword, served from the POI cache when possible.
+        Every upstream result also feeds the local autocomplete index. `fetch`
+        replaces _fetch_pois for a miss (e.g. to spend a rate budget first)."""
+        def load():
+            pois = (fetch or self._fetch_pois)(keyword)
+            self.poi_index.add_many(pois)
+            return pois
+        return self.poi_cache.get_or_load(normalize_keyword(keyword), load)
+
+    def get_coordinates(self, keyword):
+        """Convert location name to coordinates (POI)"""
+        pois = self._search_pois(keyword)
         if not pois:
             raise Exception(f"Cannot find location: '{keyword}'")
         poi = pois[0]
-        return {"name": poi["name"], "lon": poi["frontLon"], "lat": poi["frontLat"]}
+        return {"name": poi["name"], "lon": poi["front_lon"], "lat": poi["front_lat"]}
 
-    def reverse_geocode(self, lat, lon):
-        """Convert coordinates to address using TMAP reverse geocoding"""
+    @upstream_call("tmap", "reverse_geocode")
+    def _fetch_reverse_geocode(self, lat, lon):
+        """Raw TMAP reverse geocoding (uncached); empty strings when fields are missing"""
         url = f"{self.base_url}/geo/reversegeocoding"
         headers = {"appKey": self.sk_api_key, "Accept": "application/json"}
         params = {
@@ -84,57 +210,49 @@ class KkokkiEngine:
             "coordType": "WGS84GEO", "addressType": "A10",
             "lon": lon, "lat": lat
         }
+        response = self.http.get(url, headers=headers, params=params, verify=False)
+        if response.status_code != 200:
+            raise Exception(f"Reverse geocode failed: {response.status_code}")
+        addr_info = response.json().get("addressInfo", {})
+        return {
+            "name": addr_info.get("buildingName", ""),
+            "address": addr_info.get("fullAddress", ""),
+        }
+
+    def reverse_geocode(self, lat, lon):
+        """Convert coordinates to address using TMAP reverse geocoding.
+        Nearby taps (same geohash cell) share one cached lookup."""
+        fallback = {"name": "Selected Location", "address": f"{lat:.6f}, {lon:.6f}"}
         try:
-            response = requests.get(url, headers=headers, params=params, verify=False)
-            if response.status_code != 200:
-                return {"name": "Selected Location", "address": f"{lat:.6f}, {lon:.6f}"}
-            data = response.json()
-            addr_info = data.get("addressInfo", {})
-            full_addr = addr_info.get("fullAddress", "")
-            building_name = addr_info.get("buildingName", "")
-            name = building_name if building_name else "Selected Location"
-            address = full_addr if full_addr else f"{lat:.6f}, {lon:.6f}"
-            return {"name": name, "address": address}
+            info = self.geo_cache.get_or_load(
+                lat, lon, lambda: self._fetch_reverse_geocode(lat, lon))
         except Exception as e:
-            self.log(f"Reverse geocode error: {e}")
-            return {"name": "Selected Location", "address": f"{lat:.6f}, {lon:.6f}"}
-
-    def search_locations(self, keyword):
-        """Search for locations and return a list of candidates (POI)"""
-        url = f"{self.base_url}/pois"
-        headers = {"appKey": self.sk_api_key, "Accept": "application/json"}
-        params = {
-            "version": 1, "format": "json",
-            "searchKeyword": keyword,
-            "resCoordType": "WGS84GEO", "reqCoordType": "WGS84GEO",
-            "count": 10
+            self.log(f"Reverse geocode error: {e}", level="error", kind="upstream_error")
+            return fallback
+        return {
+            "name": info["name"] or fallback["name"],
+            "address": info["address"] or fallback["address"],
         }
+
+    def search_locations(self, keyword, local_only=False):
+        """Search for locations and return a list of candidates (POI).
+        Answered from the local autocomplete index when it already has enough
+        exact matches; TMAP otherwise. `local_only` never calls TMAP and
+        also returns typo-tolerant matches."""
+        if local_only:
+            return self.poi_index.search(keyword)
+        local = self.poi_index.search(keyword, fuzzy=False)
+        if len(local) >= LOCAL_SEARCH_MIN_RESULTS:
+            return local
         try:
-            response = requests.get(url, headers=headers, params=params, verify=False)
-            if response.status_code != 200:
-                self.log(f"POI Search Failed: {response.status_code}")
-                return []
-            data = response.json()
-            pois = data.get("searchPoiInfo", {}).get("pois", {}).get("poi", [])
-            results = []
-            for poi in pois:
-                addr_parts = [
-                    poi.get("upperAddrName", ""),
-                    poi.get("middleAddrName", ""),
-                    poi.get("lowerAddrName", ""),
-                    poi.get("detailAddrName", "")
-                ]
-                address = " ".join(part for part in addr_parts if part)
-                results.append({
-                    "name": poi["name"],
-                    "lat": float(poi["noorLat"]),
-                    "lon": float(poi["noorLon"]),
-                    "address": address
-                })
-            return results
+            pois = self._search_pois(keyword)
         except Exception as e:
-            self.log(f"Error searching locations: {e}")
-            return []
+            self.log(f"Error searching locations: {e}", level="error", kind="upstream_error")
+            return local
+        return [
+            {"name": poi["name"], "lat": poi["lat"], "lon": poi["lon"], "address": poi["address"]}
+            for poi in pois
+        ]
 
     # ─── Route Calculation ─────────────────────────────────────
 
@@ -149,6 +267,13 @@ class KkokkiEngine:
                 coords.append(geom["coordinates"])
         return coords
 
+    def get_route(self, start, end, transport_mode='car'):
+        """Cached route for previews. Returns (route, cache_status) where
+        cache_status is "fresh", "stale" (refresh running) or "miss"."""
+        return self.route_cache.get_or_load(
+            start, end, transport_mode,
+            lambda: self.calculate_route(start, end, transport_mode))
+
     def calculate_route(self, start, end, transport_mode='car'):
         if transport_mode == 'transit':
             return self.calculate_transit_route(start, end)
@@ -157,16 +282,17 @@ class KkokkiEngine:
         else:
             return self.calculate_car_route(start, end)
 
-    def calculate_car_route(self, start, end):
+    @upstream_call("tmap", "car_route")
+    def calculate_car_route(self, start, end, search_option="0"):
         url = f"{self.base_url}/routes?version=1&format=json"
         headers = {"appKey": self.sk_api_key, "Content-Type": "application/json"}
         payload = {
             "startX": start["lon"], "startY": start["lat"],
             "endX": end["lon"], "endY": end["lat"],
             "reqCoordType": "WGS84GEO", "resCoordType": "WGS84GEO",
-            "searchOption": "0", "trafficInfo": "Y"
+            "searchOption": search_option, "trafficInfo": "Y"
         }
-        response = requests.post(url, headers=headers, json=payload, verify=False)
+        response = self.http.post(url, headers=headers, json=payload, verify=False)
         if response.status_code != 200:
             raise Exception(f"Car route calculation failed: {response.status_code}")
 
@@ -182,6 +308,7 @@ class KkokkiEngine:
             "coordinates": coordinates
         }
 
+    @upstream_call("tmap", "walk_route")
     def calculate_walk_route(self, start, end):
         url = f"{self.base_url}/routes/pedestrian?version=1&format=json"
         headers = {"appKey": self.sk_api_key, "Content-Type": "application/json"}
@@ -193,7 +320,7 @@ class KkokkiEngine:
             "endName": end.get("name", "End")
         }
         try:
-            response = requests.post(url, headers=headers, json=payload, verify=False)
+            response = self.http.post(url, headers=headers, json=payload, verify=False)
             if response.status_code != 200:
                 raise Exception(f"Walk route calculation failed: {response.status_code}")
 
@@ -212,25 +339,26 @@ class KkokkiEngine:
                 "coordinates": coordinates
             }
         except Exception as e:
-            self.log(f"Walk route error: {e}")
+            self.log(f"Walk route error: {e}", level="error", kind="upstream_error")
             raise
 
-    def calculate_transit_route(self, start, end):
-        url = "https://apis.openapi.sk.com/transit/routes/sub/"
+    @upstream_call("tmap", "transit_route")
+    def calculate_transit_route(self, start, end, depart_at=None):
+        url = f"{self.tmap_url}/transit/routes/sub/"
         headers = {
             "appKey": self.sk_api_key,
             "accept": "application/json",
             "content-type": "application/json"
         }
-        now = datetime.now()
+        depart_at = depart_at or datetime.now()
         payload = {
             "startX": str(start["lon"]), "startY": str(start["lat"]),
             "endX": str(end["lon"]), "endY": str(end["lat"]),
             "format": "json", "count": 10,
-            "searchDttm": now.strftime("%Y%m%d%H%M")
+            "searchDttm": depart_at.strftime("%Y%m%d%H%M")
         }
         try:
-            response = requests.post(url, headers=headers, json=payload, verify=False)
+            response = self.http.post(url, headers=headers, json=payload, verify=False)
             if response.status_code != 200:
                 raise Exception(f"Transit route calculation failed: {response.status_code}")
 
@@ -273,15 +401,158 @@ class KkokkiEngine:
                 "coordinates": []  # Transit API doesn't return polyline
             }
         except Exception as e:
-            self.log(f"Transit route error: {e}")
+            self.log(f"Transit route error: {e}", level="error", kind="upstream_error")
             raise
 
+    # ─── Departure Solver ──────────────────────────────────────
+
+    def _route_at(self, start, end, transport_mode, ts, calls):
+        """Route when leaving at epoch `ts`. Transit asks TMAP for that departure
+        minute; car/walk use a confident history prediction for that slot, else
+        the live route (TMAP has no departure time for them). `calls` counts
+        upstream requests."""
+        origin, destination, _ = self.route_cache.base_key(start, end, transport_mode)
+        if transport_mode != 'transit':
+            estimate = self.history.predict(f"{origin}:{destination}", transport_mode, ts)
+            if estimate and estimate["confident"]:
+                return {"mode": transport_mode, "minutes": round(estimate["minutes"]), "distance": 0}
+
+            def live():
+                calls[0] += 1
+                return self.calculate_route(start, end, transport_mode)
+            return self.route_cache.get_or_load(start, end, transport_mode, live)[0]
+
+        def load():
+            calls[0] += 1
+            return self.calculate_transit_route(start, end, depart_at=datetime.fromtimestamp(ts))
+        return self.probe_cache.get_or_load((origin, destination, transport_mode, ts), load)
+
+    def solve_departure(self, start, end, arrival, transport_mode='car', now=None, guess_minutes=None):
+        """Latest departure from `start` that reaches `end` by `arrival` (datetime).
+
+        Returns a dict with departure/arrival datetimes, minutes, feasible,
+        method, probes, upstream_calls and the route at that departure.
+        """
+        now = now or datetime.now()
+        calls = [0]
+        routes = {}
+
+        def minutes_at(ts):
+            routes[ts] = self._route_at(start, end, transport_mode, ts, calls)
+            return routes[ts]["minutes"]
+
+        solution = solve_departure(minutes_at, arrival.timestamp(), guess_minutes=guess_minutes,
+                                   earliest=now.timestamp())
+        return {
+            "departure": datetime.fromtimestamp(solution["departure"]),
+            "arrival": datetime.fromtimestamp(solution["arrival"]),
+            "minutes": solution["minutes"],
+            "feasible": solution["feasible"],
+            "method": solution["method"],
+            "probes": solution["probes"],
+            "upstream_calls": calls[0],
+            "route": routes[solution["departure"]],
+        }
+
+    # ─── Route Comparison ──────────────────────────────────────
+
+    def _route_option(self, start, end, option):
+        """Route for a comparison option such as "walk" or "car:free"."""
+        mode, _, variant = option.partition(":")
+        if mode == "car":
+            search_option = CAR_SEARCH_OPTIONS[variant or "recommended"]
+            return self.calculate_car_route(start, end, search_option)
+        return self.calculate_route(start, end, mode)
+
+    def compare_routes(self, start, end, options=None, deadlines=None):
+        """Run every option concurrently and yield each result as it completes.
+
+        Options that miss their mode's deadline are yielded with status
+        "timeout" and left to finish in the background (warming the route
+        cache), so one slow mode never holds up the others.
+        """
+        options = list(options or COMPARE_OPTIONS)
+        unknown = [o for o in options if o.partition(":")[0] not in COMPARE_DEADLINES
+                   or (o.startswith("car:") and o[4:] not in CAR_SEARCH_OPTIONS)]
+        if unknown:
+            raise ValueError(f"Unknown route options: {', '.join(unknown)}")
+        # Validated here, not inside the generator, so bad input surfaces before streaming starts
+        deadlines = {**COMPARE_DEADLINES, **self._check_deadlines(deadlines)}
+        return self._compare_routes(start, end, options, deadlines)
+
+    @staticmethod
+    def _check_deadlines(deadlines):
+        """Per-mode deadlines from a request as floats clamped to COMPARE_DEADLINE_RANGE.
+        Raises ValueError for unknown modes or non-numeric values."""
+        if deadlines is None:
+            return {}
+        if not isinstance(deadlines, dict):
+            raise ValueError("deadlines must be an object of mode -> seconds")
+        low, high = COMPARE_DEADLINE_RANGE
+        checked = {}
+        for mode, seconds in deadlines.items():
+            if mode not in COMPARE_DEADLINES:
+                raise ValueError(f"Unknown deadline mode: {mode}")
+            try:
+                value = float(seconds)
+            except (TypeError, ValueError):
+                value = math.nan
+            if math.isnan(value):
+                raise ValueError(f"Deadline for {mode} must be a number of seconds, got {seconds!r}")
+            checked[mode] = min(high, max(low, value))
+        return checked
+
+    def _compare_routes(self, start, end, options, deadlines):
+        t0 = time.monotonic()
+        pending = {}
+        for option in options:
+            future = self.compare_pool.submit(
+                self.route_cache.get_or_load, start, end, option,
+                lambda option=option: self._route_option(start, end, option))
+            pending[future] = (option, t0 + deadlines[option.partition(":")[0]])
+
+        while pending:
+            next_deadline = min(deadline for _, deadline in pending.values())
+            done, _ = wait(pending, timeout=max(0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            elapsed_ms = round((time.monotonic() - t0) * 1000)
+            for future in done:
+                option, _ = pending.pop(future)
+                mode, _, variant = option.partition(":")
+                result = {"option": option, "mode": mode, "variant": variant or None,
+                          "elapsed_ms": elapsed_ms}
+                try:
+                    route, cache_status = future.result()
+                    result.update(status="ok", cache=cache_status,
+                                  route={k: v for k, v in route.items() if k != "coordinates"})
+                except Exception as e:
+                    result.update(status="error", error=str(e))
+                yield result
+            now = time.monotonic()
+            for future, (option, deadline) in list(pending.items()):
+                if deadline <= now:
+                    del pending[future]
+                    mode, _, variant = option.partition(":")
+                    yield {"option": option, "mode": mode, "variant": variant or None,
+                           "status": "timeout", "elapsed_ms": elapsed_ms}
+
+    @staticmethod
+    def rank_routes(results):
+        """Successful comparison results ordered by travel time, then distance."""
+        ok = [r for r in results if r["status"] == "ok"]
+        ranked = sorted(ok, key=lambda r: (r["route"]["minutes"], r["route"].get("distance", 0)))
+        return [
+            {"rank": i + 1, "option": r["option"], "minutes": r["route"]["minutes"],
+             "distance": r["route"].get("distance"), "fare": r["route"].get("fare")}
+            for i, r in enumerate(ranked)
+        ]
+
     # ─── AI & Notifications ────────────────────────────────────
 
-    def generate_delay_message(self, start, end, target_time, delay_min):
-        now = datetime.now()
-        eta = now + timedelta(minutes=delay_min)
-        eta_str = eta.strftime("%H:%M")
+    def _write_late_draft(self, start, end, target_time):
+        """LLM draft of the late alert with {delay}/{eta} left as slots (runs on a draft worker)."""
+        if not self.has_model:
+            return None
         prompt = f"""슬랙 지각 알림 메시지를 딱 1개만 작성해줘. 아래 규칙을 반드시 따라:
 
 - 한국어, 반말(편한 톤), 이모지 적당히 사용
@@ -289,25 +560,35 @@ class KkokkiEngine:
 - "옵션", "---", "**옵션" 같은 구분 절대 금지
 - 5줄 이내로 간결하게
 - 출발지/도착지/지연시간/새 도착예상시간 포함
+- 지연시간은 {{delay}}, 새 도착예상시간은 {{eta}} 라고 중괄호째 그대로 적어 (나중에 값이 채워짐)
 
 상황:
 - 출발: {start}
 - 도착: {end}
 - 원래 도착 예정: {target_time}
-- 지연: 약 {delay_min}분
-- 새 도착 예상: {eta_str}"""
-        try:
-            if hasattr(self, 'model'):
-                response = self.model.generate_content(prompt)
-                return response.text
-            else:
-                return f"교통 체증으로 약 {delay_min}분 늦을 예정입니다."
-        except Exception:
-            return f"현재 교통 체증으로 인해 약 {delay_min}분 정도 늦을 것 같습니다. 죄송합니다."
+- 지연: 약 {{delay}}분
+- 새 도착 예상: {{eta}}"""
+        with track_upstream("gemini", "generate_content"):
+            return self.model.generate_content(prompt).text
+
+    def prepare_delay_message(self, start, end, target_time):
+        """Start drafting the late alert for this route in the background."""
+        return self.drafts.prefetch((start, end, target_time), start, end, target_time)
 
-    def send_slack_message(self, message):
+    def render_delay_message(self, start, end, target_time, delay_min):
+        """Late alert text without waiting on the LLM. Returns (message, source)
+        where source is "draft" (pre-generated) or "template"."""
+        eta = (datetime.now() + timedelta(minutes=delay_min)).strftime("%H:%M")
+        return self.drafts.render((start, end, target_time), LATE_TEMPLATE, delay=delay_min, eta=eta)
+
+    def generate_delay_message(self, start, end, target_time, delay_min):
+        return self.render_delay_message(start, end, target_time, delay_min)[0]
+
+    def send_slack_message(self, message, key=None):
+        """Queue a Slack alert for background delivery; never blocks on Slack.
+        Alerts with the same `key` are delivered at most once."""
         if not self.slack_webhook_url:
-            self.log("Slack Webhook URL not set.")
+            self.log("Slack Webhook URL not set.", level="warning", kind="slack")
             return False
         payload = {
             "text": "*Kkokki Late Alert*",
@@ -317,174 +598,297 @@ class KkokkiEngine:
                 "footer": "Kkokki Digital Rooster"
             }]
         }
-        try:
-            response = requests.post(
-                self.slack_webhook_url,
-                data=json.dumps(payload),
-                headers={'Content-Type': 'application/json'}
-            )
-            if response.status_code == 200:
-                self.log("Slack: Message sent!")
-                return True
-            else:
-                self.log(f"Slack send failed: {response.status_code}")
-                return False
-        except Exception as e:
-            self.log(f"Slack error: {e}")
-            return False
+        queued = self.notifier.enqueue(self.slack_webhook_url, payload, key=key)
+        if not queued:
+            self.log("Slack: Duplicate alert skipped", kind="slack", key=key)
+        return queued
+
+    def _on_notify_event(self, message, level="info", **fields):
+        self.log(message, level=level, kind="slack", **fields)
 
     # ─── Monitoring ────────────────────────────────────────────
 
-    def start_monitoring(self, start_name, end_name, arrival_time, transport_mode='car'):
-        if self.is_running:
-            self.log("Restarting with new settings...")
-            self.stop_monitoring()
+    def start_monitoring(self, start_name, end_name, arrival_time, transport_mode='car',
+                         job_id=DEFAULT_JOB_ID, **settings):
+        """Register a commute with the scheduler. `settings` override the engine defaults
+        (prep_time, buffer_time, check_count, early_warning_enabled,
+        early_warning_minutes, urgent_alert_enabled) for this job only."""
+        previous = self.scheduler.get(job_id)
+        if previous is not None and previous.is_running:
+            self.log("Restarting with new settings...", kind="job", job_id=job_id)
+            self.stop_monitoring(job_id)
+
+        config = {
+            "prep_time": self.prep_time,
+            "buffer_time": self.buffer_time,
+            "check_count": self.check_count,
+            "early_warning_enabled": self.early_warning_enabled,
+            "early_warning_minutes": self.early_warning_minutes,
+            "urgent_alert_enabled": self.urgent_alert_enabled,
+        }
+        config.update({k: v for k, v in settings.items() if v is not None})
+        job = MonitorJob(start_name, end_name, arrival_time, transport_mode,
+                         job_id=job_id, on_change=functools.partial(self.feed.bump, job_id), **config)
+        job.sampler = AdaptiveSampler(check_count=job.check_count, max_calls=self.max_checks_per_job)
+        if self.jobstore:
+            self.jobstore.put(job)
+        return self.scheduler.submit(job)
+
+    def recover_jobs(self):
+        """Reschedule the jobs in the job store, soonest wake-up first, with their
+        first checks spread over `recovery_spread` seconds. Stored coordinates and
+        alert flags are reused, so nothing is re-geocoded or re-sent."""
+        t0 = time.perf_counter()
+        rows = self.jobstore.load()
+        rows.sort(key=lambda row: (row["latest_result"] or {}).get("wake_up_iso") or "")
+        for i, row in enumerate(rows):
+            definition = row["definition"]
+            job = MonitorJob(definition["start"], definition["end"], definition["arrival_time"],
+                             definition["transport_mode"], job_id=row["job_id"],
+                             on_change=functools.partial(self.feed.bump, row["job_id"]),
+                             **definition["settings"])
+            job.start_coord, job.end_coord = row["start_coord"], row["end_coord"]
+            job.latest_result = row["latest_result"]
+            job.slack_sent = row["slack_sent"]
+            job.alarm_dismissed = row["alarm_dismissed"]
+            job.status = row["status"] or "INITIALIZING"
+            job.sampler = AdaptiveSampler(check_count=job.check_count, max_calls=self.max_checks_per_job)
+            self.jobstore.adopt(job)
+            self.scheduler.submit(job, delay=self.recovery_spread * i / len(rows))
+        elapsed = time.perf_counter() - t0
+        if rows:
+            self.log(f"Recovered {len(rows)} jobs in {elapsed * 1000:.0f}ms", kind="job",
+                     jobs=len(rows), elapsed_ms=round(elapsed * 1000, 1))
+        return {"jobs": len(rows), "seconds": elapsed}
+
+    def _monitor_step(self, job):
+        """Scheduler entry point: one check, then persist (or drop) the job's state."""
+        next_delay = self._run_check(job)
+        if self.jobstore:
+            if next_delay is None:
+                self.jobstore.delete(job)
+            else:
+                self.jobstore.save_state(job)
+        return next_delay
+
+    def _resolve_locations(self, job):
+        """Geocode start/end once per job; returns False on failure."""
+        try:
+            if isinstance(job.start, dict) and 'lat' in job.start:
+                job.start_coord = job.start
+            else:
+                job.start_coord = self.get_coordinates(job.start)
 
-        self.is_running = True
-        self.status = "INITIALIZING"
-        self.transport_mode = transport_mode
-        self.slack_sent = False
-        self.alarm_dismissed = False
-        self.latest_result = None  # Clear stale data from previous run
+            if isinstance(job.end, dict) and 'lat' in job.end:
+                job.end_coord = job.end
+            else:
+                job.end_coord = self.get_coordinates(job.end)
+        except Exception as e:
+            self.log(f"Location error: {e}", level="error", kind="location", job_id=job.job_id)
+            job.status = "LOCATION_ERROR"
+            return False
 
-        mode_names = {'car': 'Driving', 'transit': 'Transit', 'walk': 'Walking'}
-        mode_display = mode_names.get(transport_mode, transport_mode)
+        s_name = job.start_coord.get('name', 'Start')
+        e_name = job.end_coord.get('name', 'End')
+        self.log(f"Tmap: {s_name} -> {e_name}", kind="location", job_id=job.job_id,
+                 start=s_name, end=e_name)
+        return True
+
+    def _run_check(self, job):
+        """One monitoring iteration. Returns seconds until the next check,
+        IDLE once polling is no longer useful, or None to finish."""
+        if job.start_coord is None:
+            mode_names = {'car': 'Driving', 'transit': 'Transit', 'walk': 'Walking'}
+            self.log(f"Tmap: Route set [{mode_names.get(job.transport_mode, job.transport_mode)}]",
+                     kind="job", job_id=job.job_id, mode=job.transport_mode)
+            if not self._resolve_locations(job):
+                return None
+
+        if job.status == "INITIALIZING":
+            job.status = "MONITORING"
+        try:
+            now = datetime.now()
+            target = datetime.strptime(job.arrival_time, "%H:%M").replace(
+                year=now.year, month=now.month, day=now.day
+            )
+            if target < now:
+                target += timedelta(days=1)
+
+            route, source = self._sample_route(job, now, target)
+            ROUTE_CHECKS.labels(job.transport_mode, source).inc()
+            if job.cancelled:
+                return None
+
+            travel_min = route["minutes"]
+            # Solved departures already account for waiting on the timetable
+            departure_time = route.get("departure") or target - timedelta(minutes=travel_min)
+            wake_up_time = departure_time - timedelta(minutes=job.prep_time + job.buffer_time)
+
+            # Time calculations
+            seconds_until_departure = (departure_time - now).total_seconds()
+            seconds_until_wake = (wake_up_time - now).total_seconds()
+
+            is_late = False
+            delay = 0
+            early_warning_active = False
+
+            if seconds_until_wake <= 0:
+                is_late = True
+                delay = abs(int(seconds_until_wake // 60))
+                job.status = "LATE_RISK"
+            else:
+                job.status = "MONITORING"
+
+            # Draft the late alert while there is still time to spare
+            if (0 < seconds_until_wake <= DRAFT_LEAD_SECONDS and job.urgent_alert_enabled
+                    and not job.slack_sent and self.has_model):
+                self.prepare_delay_message(job.start_coord.get('name', 'Start'),
+                                           job.end_coord.get('name', 'End'), job.arrival_time)
+
+            # Early warning check
+            if job.early_warning_enabled and 0 < seconds_until_wake <= job.early_warning_minutes * 60:
+                early_warning_active = True
+
+            job.latest_result = {
+                "timestamp": now.strftime("%H:%M:%S"),
+                "travel_minutes": travel_min,
+                "distance": route["distance"],
+                "wake_up_time": wake_up_time.strftime("%H:%M"),
+                "leave_time": departure_time.strftime("%H:%M"),
+                "arrival_time": target.strftime("%H:%M"),
+                "prep_time": job.prep_time,
+                "buffer_time": job.buffer_time,
+                "is_late": is_late,
+                "delay": delay,
+                # Absolute timestamps (ISO) — client calculates countdown locally
+                "wake_up_iso": wake_up_time.isoformat(),
+                "departure_iso": departure_time.isoformat(),
+                "early_warning_active": early_warning_active,
+                "api_calls": job.sampler.calls,
+                "source": source,
+            }
 
-        def run_loop():
-            try:
-                self.log(f"Tmap: Route set [{mode_display}]")
+            if is_late:
+                self.log(f"Tmap: LATE RISK! {delay}min overdue", level="warning", kind="route_sample",
+                         job_id=job.job_id, travel_minutes=travel_min, delay=delay,
+                         arrival_iso=target.isoformat(), slack_minutes=job.prep_time + job.buffer_time)
+
+                # Send Slack once
+                if not job.slack_sent and job.urgent_alert_enabled:
+                    source = None
+                    if self.has_model:
+                        msg, source = self.render_delay_message(
+                            job.start_coord.get('name', 'Start'),
+                            job.end_coord.get('name', 'End'),
+                            job.arrival_time, delay)
+                        self.send_slack_message(msg, key=f"{job.job_id}:late:{target.date()}")
+                    job.slack_sent = True
+                    if self.jobstore:
+                        # After the enqueue (journaled by the outbox), before anything can crash
+                        self.jobstore.save_state(job, sync=True)
+                    self.log("Kkokki: Late alert sent!", kind="alert", job_id=job.job_id,
+                             message_source=source)
+            else:
+                self.log(f"Tmap: {travel_min}min travel | Wake {wake_up_time.strftime('%H:%M')}",
+                         kind="route_sample", job_id=job.job_id, travel_minutes=travel_min,
+                         wake_up_time=wake_up_time.strftime('%H:%M'),
+                         arrival_iso=target.isoformat(), slack_minutes=job.prep_time + job.buffer_time)
 
-                # Geocoding
-                try:
-                    if isinstance(start_name, dict) and 'lat' in start_name:
-                        start_coord = start_name
-                    else:
-                        start_coord = self.get_coordinates(start_name)
+        except Exception as e:
+            MONITOR_ERRORS.labels("check").inc()
+            self.log(f"Monitor error: {e}", level="error", kind="monitor_error", job_id=job.job_id)
+            if job.sampler.calls_left == 0:
+                self.log("Polling stopped (budget_exhausted)", kind="schedule", job_id=job.job_id)
+                CHECKS_PER_JOB.observe(job.sampler.calls)
+                return IDLE
+            return job.sampler.min_interval
+
+        sleep_seconds = job.sampler.next_interval(
+            seconds_until_wake, seconds_until_departure, alert_fired=job.slack_sent)
+        if sleep_seconds is None:
+            self.log(f"Polling stopped ({job.sampler.stop_reason})", kind="schedule",
+                     job_id=job.job_id, api_calls=job.sampler.calls)
+            CHECKS_PER_JOB.observe(job.sampler.calls)
+            return IDLE
+
+        self.log(f"Next check in {sleep_seconds // 60}min {sleep_seconds % 60}s",
+                 kind="schedule", job_id=job.job_id, next_check_seconds=sleep_seconds,
+                 volatility=job.sampler.volatility())
+        return sleep_seconds
+
+    def _history_key(self, job):
+        origin, destination, _ = self.route_cache.base_key(job.start_coord, job.end_coord, job.transport_mode)
+        return f"{origin}:{destination}"
+
+    def _sample_route(self, job, now, target):
+        """Travel sample for this check: TMAP, or the history prediction when it is
+        confident and the wake deadline is far off, or when TMAP fails.
+        Returns (route, source)."""
+        key = self._history_key(job)
+        estimate = self.history.predict(key, job.transport_mode, now.timestamp())
+
+        if estimate and estimate["confident"] and job.sampler.samples:
+            last_minutes = job.sampler.samples[-1][1]
+            pessimistic = estimate["minutes"] + 2 * estimate["std"]
+            slack = (target - now).total_seconds() - (pessimistic + job.prep_time + job.buffer_time) * 60
+            if abs(last_minutes - estimate["minutes"]) <= 2 * estimate["std"] + 2 and slack > HISTORY_SKIP_MARGIN:
+                distance = job.latest_result["distance"] if job.latest_result else 0
+                return {"minutes": round(estimate["minutes"]), "distance": distance}, "history"
 
-                    if isinstance(end_name, dict) and 'lat' in end_name:
-                        end_coord = end_name
-                    else:
-                        end_coord = self.get_coordinates(end_name)
-                except Exception as e:
-                    self.log(f"Location error: {e}")
-                    self.is_running = False
-                    self.status = "LOCATION_ERROR"
-                    return
-
-                s_name = start_coord.get('name', 'Start')
-                e_name = end_coord.get('name', 'End')
-                self.log(f"Tmap: {s_name} -> {e_name}")
-
-                # Monitoring Loop
-                while self.is_running:
-                    self.status = "MONITORING"
-                    try:
-                        route = self.calculate_route(start_coord, end_coord, transport_mode)
-
-                        now = datetime.now()
-                        target = datetime.strptime(arrival_time, "%H:%M").replace(
-                            year=now.year, month=now.month, day=now.day
-                        )
-                        if target < now:
-                            target += timedelta(days=1)
-
-                        travel_min = route["minutes"]
-                        departure_time = target - timedelta(minutes=travel_min)
-                        wake_up_time = departure_time - timedelta(minutes=self.prep_time + self.buffer_time)
-
-                        # Time calculations
-                        seconds_until_departure = (departure_time - now).total_seconds()
-                        seconds_until_wake = (wake_up_time - now).total_seconds()
-
-                        is_late = False
-                        delay = 0
-                        early_warning_active = False
-
-                        if seconds_until_wake <= 0:
-                            is_late = True
-                            delay = abs(int(seconds_until_wake // 60))
-                            self.status = "LATE_RISK"
-                        else:
-                            self.status = "MONITORING"
-
-                        # Early warning check
-                        if self.early_warning_enabled and 0 < seconds_until_wake <= self.early_warning_minutes * 60:
-                            early_warning_active = True
-
-                        result = {
-                            "timestamp": now.strftime("%H:%M:%S"),
-                            "travel_minutes": travel_min,
-                            "distance": route["distance"],
-                            "wake_up_time": wake_up_time.strftime("%H:%M"),
-                            "leave_time": departure_time.strftime("%H:%M"),
-                            "arrival_time": target.strftime("%H:%M"),
-                            "prep_time": self.prep_time,
-                            "buffer_time": self.buffer_time,
-                            "is_late": is_late,
-                            "delay": delay,
-                            # Absolute timestamps (ISO) — client calculates countdown locally
-                            "wake_up_iso": wake_up_time.isoformat(),
-                            "departure_iso": departure_time.isoformat(),
-                            "early_warning_active": early_warning_active,
-                        }
-                        self.latest_result = result
-
-                        log_msg = f"Tmap: {travel_min}min travel | Wake {wake_up_time.strftime('%H:%M')}"
-                        if is_late:
-                            log_msg = f"Tmap: LATE RISK! {delay}min overdue"
-                            self.log(log_msg)
-
-                            # Send Slack once
-                            if not self.slack_sent and self.urgent_alert_enabled:
-                                if hasattr(self, 'model'):
-                                    msg = self.generate_delay_message(
-                                        s_name, e_name, arrival_time, delay)
-                                    self.send_slack_message(msg)
-                                self.slack_sent = True
-                                self.log("Kkokki: Late alert sent!")
-                        else:
-                            self.log(log_msg)
-
-                    except Exception as e:
-                        self.log(f"Monitor error: {e}")
-
-                    # Smart sleep: divide remaining time by check_count
-                    remaining = max(0, int(seconds_until_wake)) if not is_late else 0
-                    if remaining > 0 and self.check_count > 0:
-                        sleep_seconds = max(60, remaining // self.check_count)
-                    else:
-                        sleep_seconds = 60  # When late, check every 60s
-
-                    self.log(f"Next check in {sleep_seconds // 60}min {sleep_seconds % 60}s")
-                    for _ in range(sleep_seconds):
-                        if not self.is_running:
-                            break
-                        time.sleep(1)
-
-            except Exception as e:
-                self.log(f"Fatal error: {e}")
-                self.is_running = False
-                self.status = "ERROR"
-
-        self.monitor_thread = threading.Thread(target=run_loop)
-        self.monitor_thread.daemon = True
-        self.monitor_thread.start()
-
-    def stop_monitoring(self):
-        if self.is_running:
-            self.is_running = False
-            self.log("Kkokki: Monitoring stopped.")
-            self.status = "STOPPED"
-            if self.monitor_thread:
-                self.monitor_thread.join(timeout=2)
-            self.status = "STANDBY"
+        try:
+            if job.transport_mode == 'transit':
+                # Timetables make travel time depend on the departure minute
+                guess = job.sampler.samples[-1][1] if job.sampler.samples else None
+                solution = self.solve_departure(job.start_coord, job.end_coord, target, 'transit',
+                                                now=now, guess_minutes=guess)
+                route = dict(solution["route"], departure=solution["departure"])
+                calls = solution["upstream_calls"]
+            else:
+                route = self.calculate_route(job.start_coord, job.end_coord, job.transport_mode)
+                calls = 1
+        except Exception as e:
+            job.sampler.record_failure()
+            if not estimate:
+                raise
+            self.log(f"Tmap unavailable ({e}); using history estimate", level="warning",
+                     kind="history_fallback", job_id=job.job_id, **estimate)
+            distance = job.latest_result["distance"] if job.latest_result else 0
+            return {"minutes": round(estimate["minutes"]), "distance": distance}, "history_fallback"
+
+        job.sampler.record(route["minutes"], calls=calls)
+        if "departure" in route:
+            self.history.append(key, job.transport_mode, route["minutes"], route["distance"],
+                                route["departure"].timestamp())
+        else:
+            self.history.append(key, job.transport_mode, route["minutes"], route["distance"], now.timestamp())
+            # Warm the preview cache with the monitor's own sample
+            self.route_cache.put(job.start_coord, job.end_coord, job.transport_mode, route)
+        return route, "tmap"
+
+    def _on_check_error(self, job, error):
+        MONITOR_ERRORS.labels("fatal").inc()
+        if self.jobstore:
+            self.jobstore.delete(job)
+        self.log(f"Fatal error: {error}", level="error", kind="monitor_error", job_id=job.job_id)
+
+    def stop_monitoring(self, job_id=DEFAULT_JOB_ID):
+        job = self.scheduler.cancel(job_id)
+        if job is not None:
+            if getattr(job, "sampler", None) and job.sampler.stop_reason is None:
+                CHECKS_PER_JOB.observe(job.sampler.calls)
+            if self.jobstore:
+                self.jobstore.delete(job)
+            self.log("Kkokki: Monitoring stopped.", kind="job", job_id=job_id)
+            job.status = "STANDBY"
         else:
-            self.log("No active monitoring.")
+            self.log("No active monitoring.", kind="job", job_id=job_id)
 
-    def get_status(self):
+    def get_status(self, job_id=DEFAULT_JOB_ID):
+        job = self.scheduler.get(job_id)
         return {
-            "is_running": self.is_running,
-            "status": self.status,
-            "logs": self.logs[-10:],  # Last 10 logs for display
-            "latest_result": self.latest_result
+            "version": self.feed.version_of(job_id),
+            "is_running": job.is_running if job else False,
+            "status": job.status if job else "STANDBY",
+            "logs": [format_event(e) for e in self.events.tail(10, job_id)],  # Last 10 logs for display
+            "latest_result": job.latest_result if job else None
         }
@@ -0,0 +1,47 @@
+"""Monitor process for multi-worker serving.
+
+One process owns the scheduler (and the job store, outbox and event log);
+any number of web workers serve the API from the state it publishes:
+
+    KKOKKI_STATE_PATH=/var/lib/kkokki/state.db python monitor_service.py
+    KKOKKI_STATE_PATH=/var/lib/kkokki/state.db gunicorn -w 4 -b :5050 app:app
+
+Web workers queue /api/start and /api/stop for this process and read
+/api/status, /api/status/stream and /api/events from the shared file
+(see core/sharedstate.py). KKOKKI_PUBLISH_INTERVAL (seconds, default 0.1)
+bounds how stale those reads can be.
+"""
+import os
+import signal
+import sys
+import threading
+
+from core.sharedstate import StatePublisher
+from engine import KkokkiEngine
+
+
+def main():
+    path = os.getenv("KKOKKI_STATE_PATH")
+    if not path:
+        sys.exit("KKOKKI_STATE_PATH is not set.")
+
+    engine = KkokkiEngine()
+    publisher = StatePublisher(engine, path, interval=float(os.getenv("KKOKKI_PUBLISH_INTERVAL", "0.1")))
+    publisher.start()
+    engine.log(f"Monitor service publishing to {path}")
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    try:
+        stopping.wait()
+    except KeyboardInterrupt:
+        pass
+    publisher.stop()
+    engine.scheduler.shutdown()
+    engine.notifier.flush(timeout=5)
+    if engine.jobstore:
+        engine.jobstore.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,11 @@
-from .kkokki_orchestrator import get_kkokki_agent, app
+from . import kkokki_orchestrator
+from .kkokki_orchestrator import get_kkokki_agent, get_app
 
-__all__ = ["get_kkokki_agent", "app"]
+__all__ = ["get_kkokki_agent", "get_app", "app"]
+
+
+def __getattr__(name):
+    # `from src.agents import app` 은 여기서 처음 App을 만듭니다
+    if name == "app":
+        return kkokki_orchestrator.get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,13 @@
-"""메인 오케스트레이터 에이전트 — Pillow to Desk 워크플로우 자율 수행."""
-from google.adk.agents import Agent
-from google.adk.apps import App
+"""메인 오케스트레이터 에이전트 — Pillow to Desk 워크플로우 자율 수행.
+
+ADK SDK는 import 비용이 커서, 에이전트·App은 처음 사용할 때 생성합니다.
+"""
+from typing import TYPE_CHECKING
 
 from src.config import MODEL_NAME
+from src.utils.memo import bind_tool_session
 from src.tools import (
+    get_morning_snapshot,
     get_calendar_schedule,
     get_realtime_traffic,
     get_weather_impact,
@@ -13,15 +17,18 @@ from src.tools import (
     send_team_notification,
 )
 
+if TYPE_CHECKING:
+    from google.adk.agents import Agent
+    from google.adk.apps import App
+
 KKOKKI_INSTRUCTION = """당신은 사용자의 아침을 책임지는 'Digital Rooster' Kkokki입니다.
 침대(Pillow)에서 책상(Desk)까지의 전 과정을 자율적으로 최적화하세요.
 
 **필수 수행 워크플로우:**
 
 1. **상황 분석 (Sensing):** (위치/장소가 없어도 도구 기본값으로 즉시 호출)
-   - get_calendar_schedule()로 오늘의 첫 공식 일정을 확인합니다.
-   - get_realtime_traffic()으로 목적지까지 현재 소요 시간을 조회합니다. (인자 없으면 기본 출발지/목적지 사용)
-   - get_weather_impact()로 눈·비 등이 이동 시간에 미치는 영향을 조회합니다. (사용자가 "눈 온다"고 하면 conditions에 반영)
+   - get_morning_snapshot()을 **한 번만** 호출하면 첫 공식 일정(calendar), 목적지까지 현재 소요 시간(traffic), 날씨 영향(weather)이 동시에 조회됩니다. (인자 없으면 기본 출발지/목적지 사용, 사용자가 "눈 온다"고 하면 conditions에 반영)
+   - get_calendar_schedule / get_realtime_traffic / get_weather_impact는 스냅샷의 특정 항목만 다시 조회해야 할 때만 개별로 사용하세요.
 
 2. **계획 수립 (Planning):**
    - 수집된 데이터를 calculate_optimal_wakeup에 입력하여 '최종 기상 시간'을 결정합니다.
@@ -38,22 +45,25 @@ KKOKKI_INSTRUCTION = """당신은 사용자의 아침을 책임지는 'Digital R
 5. **예외 처리 (Emergency):**
    - 불가항력적인 지연이 발생하여 지각이 확실시될 경우, send_team_notification을 통해 팀원들에게 상황과 예상 도착 시간을 자동으로 전송합니다.
 
-**예외 상황 대응:** (일정 없음) get_calendar_schedule 결과에 첫 일정이 없거나 first_event가 비어 있으면, "오늘 공식 일정이 없습니다. 평소 기상 시간을 권장드릴까요?"라고 안내한 뒤 기본 통근 시간(예: 45분)만으로 기상 시간을 제안하세요. (날씨 실패) get_weather_impact 응답에 success: false 또는 error 필드가 있으면 날씨 영향은 0분으로 간주하고, "날씨 정보를 불러오지 못했습니다. 여유 있게 출발하세요."라고 한 줄 안내한 뒤 나머지 로직을 진행하세요.
+**예외 상황 대응:** (일정 없음) 스냅샷의 calendar 결과에 첫 일정이 없거나 first_event가 비어 있으면, "오늘 공식 일정이 없습니다. 평소 기상 시간을 권장드릴까요?"라고 안내한 뒤 기본 통근 시간(예: 45분)만으로 기상 시간을 제안하세요. (날씨 실패) 스냅샷의 weather 결과에 success: false 또는 error 필드가 있으면 날씨 영향은 0분으로 간주하고, "날씨 정보를 불러오지 못했습니다. 여유 있게 출발하세요."라고 한 줄 안내한 뒤 나머지 로직을 진행하세요.
 
 **중요 규칙:**
-- **반드시 도구를 먼저 호출하세요.** 사용자가 위치·장소를 안 말해도, 도구 기본값(예: 출발지/목적지)으로 get_calendar_schedule → get_realtime_traffic → get_weather_impact 순으로 조회한 뒤 calculate_optimal_wakeup으로 기상 시간을 계산하고 제안하세요. "위치를 알려주세요"라고만 하지 마세요.
+- **반드시 도구를 먼저 호출하세요.** 사용자가 위치·장소를 안 말해도, 도구 기본값(예: 출발지/목적지)으로 get_morning_snapshot을 한 번 호출한 뒤 곧바로 calculate_optimal_wakeup으로 기상 시간을 계산하고 제안하세요. "위치를 알려주세요"라고만 하지 마세요.
 - 모든 결정의 근거(교통량, 날씨 등)를 사용자에게 브리핑해야 합니다.
 - 사용자의 이동 속도가 기준치 미달일 경우 능동적으로 개입하세요.
 - 최종 목적지(Desk)에 도착할 때까지 에이전트 상태를 유지합니다.
 """
 
 
-def get_kkokki_agent() -> Agent:
+def get_kkokki_agent() -> "Agent":
     """Kkokki 오케스트레이터 에이전트 인스턴스를 반환합니다."""
+    from google.adk.agents import Agent
+
     return Agent(
         name="KkokkiOrchestrator",
         model=MODEL_NAME,
         tools=[
+            get_morning_snapshot,
             get_calendar_schedule,
             get_realtime_traffic,
             get_weather_impact,
@@ -63,8 +73,28 @@ def get_kkokki_agent() -> Agent:
             send_team_notification,
         ],
         instruction=KKOKKI_INSTRUCTION,
+        # 세션 단위 도구 캐시(src.utils.memo)가 ToolContext의 세션을 알 수 있도록
+        before_tool_callback=bind_tool_session,
     )
 
 
-# ADK Runner / CLI 호환: `app` 이름으로 노출
-app = App(name="kkokki", root_agent=get_kkokki_agent())
+_app = None
+
+
+def get_app() -> "App":
+    """ADK App을 처음 호출 시 한 번만 생성해 반환합니다."""
+    global _app
+    if _app is None:
+        from google.adk.apps import App
+
+        from .tracing_plugin import TracingPlugin
+
+        _app = App(name="kkokki", root_agent=get_kkokki_agent(), plugins=[TracingPlugin()])
+    return _app
+
+
+def __getattr__(name):
+    # ADK Runner / CLI 호환: `app` 이름으로 노출 (접근 시점에 생성)
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
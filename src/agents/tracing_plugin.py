@@ -0,0 +1,82 @@
+"""ADK 플러그인 — 사용자 턴·모델 호출·도구 호출을 src.utils.tracing 스팬으로 기록.
+
+ADK를 import하므로 get_app()에서만 불러옵니다.
+"""
+from google.adk.plugins.base_plugin import BasePlugin
+
+from src.utils.tracing import Tracer, tracer as default_tracer
+
+
+class TracingPlugin(BasePlugin):
+    """invocation_id를 trace ID로 씁니다. 모든 콜백은 None을 반환해 실행 흐름을 바꾸지 않습니다."""
+
+    def __init__(self, tracer: Tracer | None = None):
+        super().__init__(name="kkokki_tracing")
+        self.tracer = tracer or default_tracer
+
+    # ─── 사용자 턴 ──────────────────────────────────────────
+
+    async def before_run_callback(self, *, invocation_context):
+        text = ""
+        content = invocation_context.user_content
+        if content and content.parts:
+            text = " ".join(p.text for p in content.parts if getattr(p, "text", None))
+        self.tracer.start(
+            "turn", "agent_turn", invocation_context.invocation_id, key=invocation_context.invocation_id,
+            session_id=invocation_context.session.id, user_id=invocation_context.user_id,
+            agent=invocation_context.agent.name, query=text[:200],
+        )
+        return None
+
+    async def after_run_callback(self, *, invocation_context):
+        trace_id = invocation_context.invocation_id
+        if self.tracer.end("turn", trace_id):
+            self.tracer.write_trace(trace_id)
+        return None
+
+    async def on_run_error_callback(self, *, invocation_context, error):
+        trace_id = invocation_context.invocation_id
+        if self.tracer.end("turn", trace_id, error=error):
+            self.tracer.write_trace(trace_id)
+        return None
+
+    # ─── 모델 호출 ──────────────────────────────────────────
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        trace_id = callback_context.invocation_id
+        self.tracer.start("model", llm_request.model or "model", trace_id, key=trace_id,
+                          parent=self.tracer.active("turn", trace_id), agent=callback_context.agent_name)
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        if llm_response.partial:
+            return None   # 스트리밍 조각은 마지막 응답에서 한 번만 종료
+        usage = llm_response.usage_metadata
+        parts = (llm_response.content.parts if llm_response.content else None) or []
+        self.tracer.end(
+            "model", callback_context.invocation_id,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            output_tokens=getattr(usage, "candidates_token_count", None),
+            function_calls=[p.function_call.name for p in parts if getattr(p, "function_call", None)],
+        )
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self.tracer.end("model", callback_context.invocation_id, error=error)
+        return None
+
+    # ─── 도구 호출 ──────────────────────────────────────────
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        trace_id = tool_context.invocation_id
+        self.tracer.start("tool", tool.name, trace_id, key=tool_context.function_call_id,
+                          parent=self.tracer.active("turn", trace_id), args=dict(tool_args))
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self.tracer.end("tool", tool_context.function_call_id)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self.tracer.end("tool", tool_context.function_call_id, error=error)
+        return None
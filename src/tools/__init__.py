@@ -3,6 +3,7 @@ from .maps_tools import get_realtime_traffic, check_user_movement
 from .calendar_tools import get_calendar_schedule, calculate_optimal_wakeup
 from .weather_tools import get_weather_impact
 from .notification_tools import set_dynamic_alarm, send_team_notification
+from .sensing_tools import get_morning_snapshot
 
 __all__ = [
     "get_realtime_traffic",
@@ -12,4 +13,5 @@ __all__ = [
     "get_weather_impact",
     "set_dynamic_alarm",
     "send_team_notification",
+    "get_morning_snapshot",
 ]
@@ -1,9 +1,11 @@
 """Google Calendar (Schedule) 연동. 실연 시 Calendar API로 교체."""
 from src.utils.logger import get_logger
+from src.utils.memo import memoize
 
 logger = get_logger(__name__)
 
 
+@memoize(ttl=300)
 def get_calendar_schedule(
     date: str | None = None,
     user_id: str = "default",
@@ -28,6 +30,7 @@ def get_calendar_schedule(
     return result
 
 
+@memoize(ttl=3600)
 def calculate_optimal_wakeup(
     first_event_time: str,
     commute_minutes: int,
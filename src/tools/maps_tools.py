@@ -1,9 +1,11 @@
 """Google Maps (Traffic, Route, ETA) 연동. 실연 시 Routes API로 교체."""
 from src.utils.logger import get_logger
+from src.utils.memo import memoize, no_memo
 
 logger = get_logger(__name__)
 
 
+@memoize(ttl=120)
 def get_realtime_traffic(
     origin: str = "사용자_집",
     destination: str = "목적지_회사",
@@ -23,6 +25,7 @@ def get_realtime_traffic(
     return result
 
 
+@no_memo  # 실시간 속도 스트림이라 매 호출이 새 관측값
 def check_user_movement(
     user_id: str = "default",
     current_speed_kmh: float | None = None,
@@ -1,9 +1,11 @@
 """Slack, Gmail, Push 알림 연동. 실연 시 웹훅/API로 교체."""
 from src.utils.logger import get_logger
+from src.utils.memo import no_memo
 
 logger = get_logger(__name__)
 
 
+@no_memo
 def set_dynamic_alarm(
     wakeup_time: str,
     user_id: str = "default",
@@ -22,6 +24,7 @@ def set_dynamic_alarm(
     return result
 
 
+@no_memo
 def send_team_notification(
     message: str,
     channel: str = "slack",
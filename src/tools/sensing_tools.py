@@ -0,0 +1,66 @@
+"""아침 상황 분석(Sensing) 도구 묶음 — 일정·교통·날씨를 동시에 조회."""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.logger import get_logger
+from src.utils.memo import memoize
+
+from .calendar_tools import get_calendar_schedule
+from .maps_tools import get_realtime_traffic
+from .weather_tools import get_weather_impact
+
+logger = get_logger(__name__)
+
+# 세 조회는 서로 독립적이므로 순차 대기 없이 병렬 실행 (실연 시 각각 외부 API 호출)
+_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="kkokki-sensing")
+
+
+def _run(fn, **kwargs) -> dict:
+    """개별 조회 실패가 스냅샷 전체를 깨뜨리지 않도록 오류를 결과로 감쌉니다."""
+    try:
+        return fn(**kwargs)
+    except Exception as e:
+        logger.warning("[Sensing] %s 실패: %s", fn.__name__, e)
+        return {"success": False, "error": str(e)}
+
+
+@memoize(ttl=120)
+def get_morning_snapshot(
+    origin: str = "사용자_집",
+    destination: str = "목적지_회사",
+    date: str | None = None,
+    user_id: str = "default",
+    region: str = "서울",
+    conditions: str | None = None,
+) -> dict:
+    """
+    오늘의 첫 일정, 목적지까지의 실시간 교통, 날씨 영향을 한 번에 조회합니다.
+    세 조회를 동시에 수행하므로 각각 따로 호출하는 것보다 빠르고, 에이전트 턴도 하나로 줄어듭니다.
+    개별 조회가 실패하면 해당 항목에 success: false 와 error 필드가 담깁니다.
+    """
+    logger.info(
+        "[Tool 호출 전] get_morning_snapshot(origin=%s, destination=%s, date=%s, region=%s, conditions=%s)",
+        origin, destination, date or "today", region, conditions,
+    )
+    t0 = time.perf_counter()
+    # 세션 정보(contextvar)가 작업 스레드까지 전달되도록 호출마다 컨텍스트를 복사
+    calls = {
+        "calendar": (get_calendar_schedule, {"date": date, "user_id": user_id}),
+        "traffic": (get_realtime_traffic, {"origin": origin, "destination": destination}),
+        "weather": (get_weather_impact, {"region": region, "conditions": conditions}),
+    }
+    futures = {
+        name: _pool.submit(contextvars.copy_context().run, _run, fn, **kwargs)
+        for name, (fn, kwargs) in calls.items()
+    }
+    result = {name: future.result() for name, future in futures.items()}
+    result["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    logger.info(
+        "[Tool 호출 후] get_morning_snapshot → 첫 일정 %s, 통근 %s분, 날씨 지연 %s분 (%.1fms)",
+        (result["calendar"].get("first_event") or {}).get("start"),
+        result["traffic"].get("duration_minutes"),
+        result["weather"].get("additional_minutes"),
+        result["elapsed_ms"],
+    )
+    return result
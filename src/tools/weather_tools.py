@@ -1,9 +1,11 @@
 """날씨 API 연동 및 이동 시간 영향 분석. 실연 시 Weather API로 교체."""
 from src.utils.logger import get_logger
+from src.utils.memo import memoize
 
 logger = get_logger(__name__)
 
 
+@memoize(ttl=600)
 def get_weather_impact(
     region: str = "서울",
     conditions: str | None = None,
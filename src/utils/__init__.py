@@ -1,4 +1,18 @@
 from .logger import get_logger
-from .response_utils import events_to_text
+from .response_utils import count_turns, events_to_text
+from .memo import bind_tool_session, clear_memo, memo_stats, memoize, no_memo
+from .tracing import Tracer, format_breakdown, tracer
 
-__all__ = ["get_logger", "events_to_text"]
+__all__ = [
+    "get_logger",
+    "events_to_text",
+    "count_turns",
+    "memoize",
+    "no_memo",
+    "bind_tool_session",
+    "clear_memo",
+    "memo_stats",
+    "Tracer",
+    "tracer",
+    "format_breakdown",
+]
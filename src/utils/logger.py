@@ -1,6 +1,47 @@
-"""에이전트 추론 과정 로깅."""
+"""에이전트 추론 과정 로깅.
+
+도구 호출 경로에서 stdout 쓰기를 기다리지 않도록, 로그 레코드는 큐에 넣고
+백그라운드 리스너 스레드 하나가 모아서 출력합니다. (종료 시 남은 로그를 비움)
+"""
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: logging.handlers.QueueListener | None = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener() -> None:
+    """stdout 출력 리스너를 처음 한 번만 시작합니다."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
+        ))
+        _listener = logging.handlers.QueueListener(_queue, handler, respect_handler_level=False)
+        _listener.start()
+
+
+def flush_logs(restart: bool = True) -> None:
+    """큐에 남은 로그를 모두 출력합니다. 종료 시에는 restart=False로 리스너를 멈춥니다."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+    if restart:
+        _ensure_listener()
+
+
+atexit.register(flush_logs, restart=False)
 
 
 def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
@@ -8,11 +49,8 @@ def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     logger = logging.getLogger(name)
     if not logger.handlers:
         logger.setLevel(level)
-        handler = logging.StreamHandler(sys.stdout)
+        handler = logging.handlers.QueueHandler(_queue)
         handler.setLevel(level)
-        formatter = logging.Formatter(
-            "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
-        )
-        handler.setFormatter(formatter)
         logger.addHandler(handler)
+    _ensure_listener()
     return logger
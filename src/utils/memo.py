@@ -0,0 +1,117 @@
+"""세션 단위 도구 호출 메모이제이션.
+
+같은 ADK 세션 안에서 모델이 같은 인자로 도구를 다시 부르면(특히 사용자 승인 직후)
+외부 API를 다시 호출하지 않고 직전 결과를 재사용합니다.
+
+- 도구마다 TTL을 지정: `@memoize(ttl=120)`
+- 세션 구분: 에이전트의 before_tool_callback에 `bind_tool_session`을 등록하면
+  ToolContext의 세션 ID가 캐시 키에 들어갑니다. (세션 밖 호출은 "default")
+- 부작용이 있는 도구(알람 설정, 팀 알림 등)는 `@no_memo`로 명시적으로 제외합니다.
+"""
+import contextvars
+import copy
+import functools
+import inspect
+import json
+import threading
+import time
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+_session = contextvars.ContextVar("kkokki_tool_session", default="default")
+_lock = threading.Lock()
+_cache: dict[tuple, tuple[float, object]] = {}   # (세션, 도구, 인자) -> (만료 시각, 결과)
+_stats: dict[str, dict[str, int]] = {}
+MAX_ENTRIES = 1024
+
+
+def bind_tool_session(tool=None, args=None, tool_context=None):
+    """before_tool_callback: 이번 도구 호출을 ToolContext의 세션에 묶습니다. (항상 None → 도구 실행 계속)"""
+    session = getattr(tool_context, "session", None)
+    if session is not None:
+        _session.set(session.id)
+    return None
+
+
+def set_tool_session(session_id: str) -> contextvars.Token:
+    """ADK 밖(테스트, 스크립트)에서 세션을 직접 지정합니다."""
+    return _session.set(session_id)
+
+
+def no_memo(fn):
+    """부작용이 있어 절대 캐시하면 안 되는 도구 표시."""
+    fn.memo_disabled = True
+    return fn
+
+
+def memoize(ttl: float):
+    """같은 세션·같은 인자 호출을 `ttl`초 동안 캐시하는 도구 데코레이터.
+
+    시그니처·docstring은 그대로 유지되므로 ADK가 만드는 함수 선언도 바뀌지 않습니다.
+    """
+    def decorator(fn):
+        if getattr(fn, "memo_disabled", False):
+            raise ValueError(f"{fn.__name__}은(는) @no_memo 도구라 캐시할 수 없습니다.")
+        signature = inspect.signature(fn)
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            session = _session.get()
+            key = (session, name, json.dumps(bound.arguments, sort_keys=True, ensure_ascii=False, default=str))
+            now = time.monotonic()
+            with _lock:
+                counts = _stats.setdefault(name, {"hits": 0, "misses": 0})
+                entry = _cache.get(key)
+                if entry is not None and entry[0] > now:
+                    counts["hits"] += 1
+                    result = entry[1]
+                else:
+                    counts["misses"] += 1
+                    result = None
+            if result is not None:
+                logger.info("[Memo 적중] %s(session=%s) → 캐시 결과 재사용 (%.0f초 남음)", name, session, entry[0] - now)
+                return copy.deepcopy(result)
+
+            result = fn(*args, **kwargs)
+            with _lock:
+                if len(_cache) >= MAX_ENTRIES:
+                    _prune(now)
+                _cache[key] = (now + ttl, copy.deepcopy(result))
+            return result
+
+        wrapper.memo_ttl = ttl
+        return wrapper
+    return decorator
+
+
+def _prune(now):
+    """만료 항목을 지우고, 그래도 가득 차 있으면 오래된 것부터 제거. 호출자가 lock 보유."""
+    for key in [k for k, (expires, _) in _cache.items() if expires <= now]:
+        del _cache[key]
+    while len(_cache) >= MAX_ENTRIES:
+        del _cache[next(iter(_cache))]
+
+
+def clear_memo(session_id: str | None = None) -> None:
+    """한 세션(또는 전체)의 캐시를 비웁니다."""
+    with _lock:
+        if session_id is None:
+            _cache.clear()
+            _stats.clear()
+        else:
+            for key in [k for k in _cache if k[0] == session_id]:
+                del _cache[key]
+
+
+def memo_stats() -> dict:
+    """도구별 hits / misses / hit_rate."""
+    with _lock:
+        return {
+            name: dict(counts, hit_rate=round(counts["hits"] / max(1, counts["hits"] + counts["misses"]), 3))
+            for name, counts in _stats.items()
+        }
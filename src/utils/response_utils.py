@@ -1,8 +1,16 @@
 """에이전트 응답(Event)에서 텍스트 추출 등."""
+from .tracing import format_breakdown, tracer
 
 
-def events_to_text(response, empty_fallback: str = "(도구 호출만 수행되었습니다. 최종 텍스트 응답이 없습니다.)") -> str:
-    """run_debug 응답(Event 또는 Event 리스트)에서 모델 응답 텍스트만 추출."""
+def events_to_text(
+    response,
+    empty_fallback: str = "(도구 호출만 수행되었습니다. 최종 텍스트 응답이 없습니다.)",
+    timings: bool = False,
+) -> str:
+    """run_debug 응답(Event 또는 Event 리스트)에서 모델 응답 텍스트만 추출.
+
+    timings=True면 해당 턴(invocation)의 트레이스로 모델·도구별 소요 시간 분석을 덧붙입니다.
+    """
     events = response if isinstance(response, list) else [response]
     texts = []
     for event in events:
@@ -10,4 +18,24 @@ def events_to_text(response, empty_fallback: str = "(도구 호출만 수행되
             for part in event.content.parts:
                 if getattr(part, "text", None):
                     texts.append(part.text.strip())
-    return "\n\n".join(texts) if texts else empty_fallback
+    text = "\n\n".join(texts) if texts else empty_fallback
+    if timings:
+        trace_ids = [i for i in dict.fromkeys(getattr(e, "invocation_id", None) for e in events) if i]
+        spans = [s for trace_id in trace_ids for s in tracer.spans(trace_id)]
+        text += "\n\n" + format_breakdown(spans)
+    return text
+
+
+def count_turns(response) -> dict:
+    """run_debug 응답에서 모델 턴 수(LLM 호출 수)와 도구 호출 수를 셉니다."""
+    events = response if isinstance(response, list) else [response]
+    llm_turns = tool_calls = 0
+    for event in events:
+        if getattr(event, "author", "user") == "user" or not getattr(event, "content", None):
+            continue
+        parts = getattr(event.content, "parts", None) or []
+        calls = sum(1 for part in parts if getattr(part, "function_call", None))
+        if calls or any(getattr(part, "text", None) for part in parts):
+            llm_turns += 1
+        tool_calls += calls
+    return {"llm_turns": llm_turns, "tool_calls": tool_calls}
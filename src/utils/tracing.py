@@ -0,0 +1,179 @@
+"""경량 스팬 트레이싱 — 사용자 턴 / 모델 호출 / 도구 호출 단위 소요 시간 기록.
+
+한 번의 사용자 턴(ADK invocation)이 하나의 trace이며, 그 아래에 모델 호출과
+도구 호출 스팬이 붙습니다. ADK 연결은 src.agents.tracing_plugin이 담당하고,
+여기는 ADK에 의존하지 않습니다.
+
+    with tracer.span("tool", "get_weather_impact", trace_id="t1", region="서울"):
+        ...
+    print(format_breakdown(tracer.spans("t1")))
+    tracer.export_json("trace.json")
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+KIND_LABELS = {"model": "모델 호출", "tool": "도구 호출"}
+
+
+class Span:
+    """시작·종료 시각과 속성을 가진 하나의 구간."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "kind", "name", "start", "end",
+                 "_t0", "duration_ms", "attributes", "status", "error")
+
+    def __init__(self, trace_id, kind, name, parent_id=None, attributes=None):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.kind = kind
+        self.name = name
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.end = None
+        self.duration_ms = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+
+    def finish(self, error=None, **attributes):
+        self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+        self.end = self.start + self.duration_ms / 1000
+        self.attributes.update(attributes)
+        if error is not None:
+            self.status, self.error = "error", str(error)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "kind": self.kind, "name": self.name, "start": self.start, "end": self.end,
+            "duration_ms": self.duration_ms, "status": self.status, "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """진행 중 스팬은 키(예: function_call_id)로 찾고, 끝난 스팬은 최근 `capacity`개만 보관."""
+
+    def __init__(self, capacity=10_000, sink_path=None):
+        self._lock = threading.Lock()
+        self._active: dict[tuple, Span] = {}
+        self._finished: deque[Span] = deque(maxlen=capacity)
+        self.sink_path = sink_path
+
+    def start(self, kind, name, trace_id, key=None, parent=None, **attributes) -> Span:
+        span = Span(trace_id, kind, name, parent.span_id if parent else None, attributes)
+        with self._lock:
+            self._active[(kind, key or span.span_id)] = span
+        return span
+
+    def active(self, kind, key) -> Span | None:
+        with self._lock:
+            return self._active.get((kind, key))
+
+    def end(self, kind, key, error=None, **attributes) -> Span | None:
+        """키로 진행 중 스팬을 종료합니다. (없으면 None — 콜백 누락에도 안전)"""
+        with self._lock:
+            span = self._active.pop((kind, key), None)
+        if span is None:
+            return None
+        span.finish(error, **attributes)
+        with self._lock:
+            self._finished.append(span)
+        logger.debug("[Trace] %s %s %.1fms (%s)", kind, span.name, span.duration_ms, span.status)
+        return span
+
+    @contextmanager
+    def span(self, kind, name, trace_id=None, parent=None, **attributes):
+        span = self.start(kind, name, trace_id or (parent.trace_id if parent else uuid.uuid4().hex),
+                          parent=parent, **attributes)
+        key = span.span_id
+        try:
+            yield span
+        except BaseException as e:
+            self.end(kind, key, error=e)
+            raise
+        else:
+            self.end(kind, key)
+
+    def spans(self, trace_id=None) -> list[Span]:
+        """끝난 스팬 목록 (trace_id로 거르기, 시작 순)."""
+        with self._lock:
+            spans = [s for s in self._finished if trace_id is None or s.trace_id == trace_id]
+        return sorted(spans, key=lambda s: s._t0)
+
+    def export_json(self, path, trace_id=None) -> int:
+        """끝난 스팬을 JSON 파일로 저장하고 저장한 스팬 수를 반환합니다."""
+        spans = [s.to_dict() for s in self.spans(trace_id)]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"spans": spans}, f, ensure_ascii=False, indent=2, default=str)
+        return len(spans)
+
+    def write_trace(self, trace_id) -> None:
+        """sink_path가 있으면 한 trace를 JSON 한 줄로 덧붙입니다."""
+        if not self.sink_path:
+            return
+        line = json.dumps({"trace_id": trace_id, "spans": [s.to_dict() for s in self.spans(trace_id)]},
+                          ensure_ascii=False, default=str)
+        with open(self.sink_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._active.clear()
+            self._finished.clear()
+
+
+def breakdown(spans) -> dict:
+    """스팬 목록을 종류별·도구별 합계로 요약합니다. (병렬 도구 호출은 각각 합산)"""
+    total = sum(s.duration_ms or 0 for s in spans if s.parent_id is None)
+    kinds: dict[str, dict] = {}
+    tools: dict[str, dict] = {}
+    for s in spans:
+        if s.parent_id is None or s.duration_ms is None:
+            continue
+        k = kinds.setdefault(s.kind, {"count": 0, "ms": 0.0})
+        k["count"] += 1
+        k["ms"] += s.duration_ms
+        if s.kind == "tool":
+            t = tools.setdefault(s.name, {"count": 0, "ms": 0.0})
+            t["count"] += 1
+            t["ms"] += s.duration_ms
+    accounted = sum(k["ms"] for k in kinds.values())
+    return {"total_ms": total, "kinds": kinds, "tools": tools, "other_ms": max(0.0, total - accounted)}
+
+
+def _format_ms(ms):
+    return f"{ms / 1000:.2f}초" if ms >= 1000 else f"{ms:.1f}ms"
+
+
+def format_breakdown(spans) -> str:
+    """사람이 읽는 소요 시간 분석 (events_to_text에 덧붙이는 형식)."""
+    summary = breakdown(spans)
+    total = summary["total_ms"]
+    if not total:
+        return "[소요 시간] 기록된 스팬이 없습니다."
+
+    def share(ms):
+        return f"{_format_ms(ms)} ({ms / total:.0%})"
+
+    lines = [f"[소요 시간] 총 {_format_ms(total)}"]
+    for kind, k in summary["kinds"].items():
+        lines.append(f"  {KIND_LABELS.get(kind, kind)} {k['count']}회 {share(k['ms'])}")
+        if kind == "tool":
+            for name, t in sorted(summary["tools"].items(), key=lambda item: -item[1]["ms"]):
+                lines.append(f"    - {name} {t['count']}회 {_format_ms(t['ms'])}")
+    lines.append(f"  기타(프레임워크·세션 처리) {share(summary['other_ms'])}")
+    return "\n".join(lines)
+
+
+# KKOKKI_TRACE_PATH를 지정하면 턴이 끝날 때마다 trace를 JSON Lines로 덧붙여 저장
+tracer = Tracer(sink_path=os.getenv("KKOKKI_TRACE_PATH") or None)
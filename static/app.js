@@ -24,10 +24,14 @@ const State = {
     startCoord: null,
     endCoord: null,
     hasRoutePreview: false,
+    routeZoom: null,       // zoom the drawn route was simplified for
+    routeRequest: 0,       // sequence of the latest route preview request
 
     // Map objects
     map: null,
     searchMarkers: [],
+    renderedQuery: null,   // query whose results (instant or full) are on screen
+    searchedQuery: null,   // query the full search last answered
     routeMarkers: { start: null, end: null },
     // Route lines managed via MapLibre sources/layers
 
@@ -47,6 +51,9 @@ const State = {
     // Timers
     searchTimeout: null,
     pollInterval: null,
+    statusSource: null,
+    statusVersion: -1,
+    statusSnapshot: { is_running: false, status: 'STANDBY', logs: [], latest_result: null },
     countdownInterval: null,
     bgmPreviewAudio: null,
 };
@@ -138,6 +145,14 @@ function initMap() {
 
     State.map.addControl(new maplibregl.NavigationControl({ showCompass: false }), 'bottom-right');
 
+    // Zooming in past the drawn route's simplification → fetch a finer line
+    State.map.on('zoomend', () => {
+        if (State.hasRoutePreview && State.routeZoom !== null
+            && Math.round(State.map.getZoom()) > State.routeZoom) {
+            previewRoute(true);
+        }
+    });
+
     // Map click → set location
     State.map.on('click', async (e) => {
         const lat = e.lngLat.lat;
@@ -237,81 +252,121 @@ function updateStartBtn() {
 
 function debounceSearch() {
     clearTimeout(State.searchTimeout);
+    // Instant suggestions from places the server has already resolved; TMAP once typing pauses
+    suggestLocal(document.getElementById('searchInput').value.trim());
     State.searchTimeout = setTimeout(performSearch, 500);
 }
 
-async function performSearch() {
-    const query = document.getElementById('searchInput').value.trim();
-    const resultList = document.getElementById('searchResults');
+async function suggestLocal(query) {
+    if (query.length < 2) return;
+    try {
+        const res = await fetch(`/api/search?local=1&keyword=${encodeURIComponent(query)}`);
+        const data = await res.json();
+        // Only while still current and before the full search for it has answered
+        if (data.results && data.results.length && isCurrentQuery(query) && State.searchedQuery !== query) {
+            renderSearchResults(data.results, query, false);
+        }
+    } catch (err) {
+        // The debounced search reports errors
+    }
+}
 
+function isCurrentQuery(query) {
+    return document.getElementById('searchInput').value.trim() === query;
+}
+
+function clearSearchMarkers() {
     State.searchMarkers.forEach(m => m.remove());
     State.searchMarkers = [];
+}
+
+async function performSearch() {
+    const query = document.getElementById('searchInput').value.trim();
+    const resultList = document.getElementById('searchResults');
 
     if (!query || query.length < 2) {
+        clearSearchMarkers();
+        State.renderedQuery = State.searchedQuery = null;
         resultList.innerHTML = '<div class="search-hint">Type a place name to search</div>';
         resultList.classList.add('active');
         return;
     }
 
-    resultList.innerHTML = '<div class="search-loading">Searching...</div>';
-    resultList.classList.add('active');
+    // Instant suggestions for this query stay on screen until the full results arrive
+    if (State.renderedQuery !== query) {
+        clearSearchMarkers();
+        resultList.innerHTML = '<div class="search-loading">Searching...</div>';
+        resultList.classList.add('active');
+    }
 
     try {
         const res = await fetch(`/api/search?keyword=${encodeURIComponent(query)}`);
         const data = await res.json();
+        if (!isCurrentQuery(query)) return;
+        State.searchedQuery = query;
 
         if (!data.results || data.results.length === 0) {
+            clearSearchMarkers();
+            State.renderedQuery = null;
             resultList.innerHTML = '<div class="search-no-results">No results found</div>';
             return;
         }
-
-        resultList.innerHTML = '';
-        const bounds = new maplibregl.LngLatBounds();
-
-        data.results.forEach((place, i) => {
-            // Map marker
-            const el = document.createElement('div');
-            el.className = 'custom-pin search-result-pin';
-            el.innerHTML = `<div class="pin-body pin-search"><span class="pin-number">${i + 1}</span></div>`;
-            el.style.cursor = 'pointer';
-            el.addEventListener('click', (e) => {
-                e.stopPropagation();
-                selectPlace(place);
-                State.map.flyTo({ center: [place.lon, place.lat], zoom: 16 });
-            });
-            const marker = new maplibregl.Marker({ element: el })
-                .setLngLat([place.lon, place.lat])
-                .addTo(State.map);
-            State.searchMarkers.push(marker);
-            bounds.extend([place.lon, place.lat]);
-
-            // Dropdown item
-            const item = document.createElement('div');
-            item.className = 'search-item';
-            item.innerHTML = `
-                <span class="item-number">${i + 1}</span>
-                <div class="item-content">
-                    <strong>${highlightMatch(place.name, query)}</strong>
-                    <small>${place.address || ''}</small>
-                </div>
-                <span class="item-select-hint">${State.selectionMode === 'start' ? 'START' : 'DEST'}</span>
-            `;
-            item.addEventListener('click', () => {
-                selectPlace(place);
-                State.map.flyTo({ center: [place.lon, place.lat], zoom: 16 });
-            });
-            resultList.appendChild(item);
-        });
-
-        if (State.routeMarkers.start) bounds.extend(State.routeMarkers.start.getLngLat());
-        if (State.routeMarkers.end) bounds.extend(State.routeMarkers.end.getLngLat());
-        if (!bounds.isEmpty()) State.map.fitBounds(bounds, { padding: { top: 50, bottom: 200, left: 50, right: 50 } });
+        renderSearchResults(data.results, query, true);
 
     } catch (err) {
         resultList.innerHTML = '<div class="search-no-results">Search error</div>';
     }
 }
 
+function renderSearchResults(results, query, fitMap) {
+    const resultList = document.getElementById('searchResults');
+    clearSearchMarkers();
+    State.renderedQuery = query;
+    resultList.innerHTML = '';
+    resultList.classList.add('active');
+    const bounds = new maplibregl.LngLatBounds();
+
+    results.forEach((place, i) => {
+        // Map marker
+        const el = document.createElement('div');
+        el.className = 'custom-pin search-result-pin';
+        el.innerHTML = `<div class="pin-body pin-search"><span class="pin-number">${i + 1}</span></div>`;
+        el.style.cursor = 'pointer';
+        el.addEventListener('click', (e) => {
+            e.stopPropagation();
+            selectPlace(place);
+            State.map.flyTo({ center: [place.lon, place.lat], zoom: 16 });
+        });
+        const marker = new maplibregl.Marker({ element: el })
+            .setLngLat([place.lon, place.lat])
+            .addTo(State.map);
+        State.searchMarkers.push(marker);
+        bounds.extend([place.lon, place.lat]);
+
+        // Dropdown item
+        const item = document.createElement('div');
+        item.className = 'search-item';
+        item.innerHTML = `
+            <span class="item-number">${i + 1}</span>
+            <div class="item-content">
+                <strong>${highlightMatch(place.name, query)}</strong>
+                <small>${place.address || ''}</small>
+            </div>
+            <span class="item-select-hint">${State.selectionMode === 'start' ? 'START' : 'DEST'}</span>
+        `;
+        item.addEventListener('click', () => {
+            selectPlace(place);
+            State.map.flyTo({ center: [place.lon, place.lat], zoom: 16 });
+        });
+        resultList.appendChild(item);
+    });
+
+    if (!fitMap) return;
+    if (State.routeMarkers.start) bounds.extend(State.routeMarkers.start.getLngLat());
+    if (State.routeMarkers.end) bounds.extend(State.routeMarkers.end.getLngLat());
+    if (!bounds.isEmpty()) State.map.fitBounds(bounds, { padding: { top: 50, bottom: 200, left: 50, right: 50 } });
+}
+
 function highlightMatch(text, query) {
     if (!query) return text;
     const regex = new RegExp(`(${query.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')})`, 'gi');
@@ -320,10 +375,12 @@ function highlightMatch(text, query) {
 
 // ─── Route Preview ────────────────────────────────────────
 
-async function previewRoute() {
+async function previewRoute(refine = false) {
     if (!State.startCoord || !State.endCoord) return;
 
-    document.getElementById('statusText').innerText = 'Calculating route...';
+    const request = ++State.routeRequest;
+    const zoom = Math.round(State.map.getZoom());
+    if (!refine) document.getElementById('statusText').innerText = 'Calculating route...';
 
     try {
         const res = await fetch('/api/route', {
@@ -332,10 +389,14 @@ async function previewRoute() {
             body: JSON.stringify({
                 start: State.startCoord,
                 end: State.endCoord,
-                transport: State.transportMode
+                transport: State.transportMode,
+                format: 'polyline',
+                zoom
             })
         });
         const data = await res.json();
+        if (request !== State.routeRequest) return;   // superseded by a newer preview
+        if (refine && !(data.success && data.route)) return;   // keep the coarser line
 
         if (data.success && data.route) {
             const route = data.route;
@@ -352,21 +413,51 @@ async function previewRoute() {
             }
             document.getElementById('statusText').innerText = msg;
             State.hasRoutePreview = true;
+            State.routeZoom = zoom;
 
             // Draw polyline on map
-            drawRoutePolyline(route.coordinates, route.mode);
+            const coordinates = route.polyline !== undefined
+                ? decodePolyline(route.polyline, route.precision)
+                : route.coordinates;
+            drawRoutePolyline(coordinates, route.mode);
+            // The map may have zoomed in (fitBounds) while this request was in flight
+            if (Math.round(State.map.getZoom()) > zoom) previewRoute(true);
         } else {
             document.getElementById('statusText').innerText = data.error || 'Route calculation failed';
             State.hasRoutePreview = false;
             drawFallbackLine();
         }
     } catch (err) {
+        if (request !== State.routeRequest || refine) return;
         document.getElementById('statusText').innerText = 'Route calculation error';
         State.hasRoutePreview = false;
         drawFallbackLine();
     }
 }
 
+// Decode a Google encoded polyline into [[lon, lat], ...]
+function decodePolyline(encoded, precision = 5) {
+    const factor = Math.pow(10, precision);
+    const coords = [];
+    let index = 0, lat = 0, lon = 0;
+    while (index < encoded.length) {
+        const deltas = [];
+        for (let k = 0; k < 2; k++) {
+            let shift = 0, result = 0, b;
+            do {
+                b = encoded.charCodeAt(index++) - 63;
+                result |= (b & 0x1f) << shift;
+                shift += 5;
+            } while (b >= 0x20);
+            deltas.push((result & 1) ? ~(result >> 1) : (result >> 1));
+        }
+        lat += deltas[0];
+        lon += deltas[1];
+        coords.push([lon / factor, lat / factor]);
+    }
+    return coords;
+}
+
 function drawRoutePolyline(coordinates, mode) {
     removeRouteLines();
 
@@ -893,39 +984,65 @@ function stopBGMPreview() {
    MODULE: Status Polling
    ═══════════════════════════════════════════════════════════ */
 
-async function pollStatus() {
-    try {
-        const res = await fetch('/api/status');
-        const data = await res.json();
+// Latest known server status; SSE deltas and poll snapshots are merged into it
+function applyStatus(data) {
+    const snap = State.statusSnapshot;
+    if (data.version !== undefined) State.statusVersion = data.version;
+    if (data.logs) snap.logs = data.logs;
+    if (data.new_logs) snap.logs = snap.logs.concat(data.new_logs).slice(-10);
+    ['is_running', 'status', 'latest_result'].forEach(k => {
+        if (k in data) snap[k] = data[k];
+    });
+    handleStatus(snap);
+}
 
-        State.isRunning = data.is_running;
+function handleStatus(data) {
+    State.isRunning = data.is_running;
 
-        // Just store server data directly — timestamps are absolute,
-        // client calculates countdown locally, so no oscillation possible
-        if (data.latest_result) {
-            State.latestResult = data.latest_result;
-        }
+    // Just store server data directly — timestamps are absolute,
+    // client calculates countdown locally, so no oscillation possible
+    if (data.latest_result) {
+        State.latestResult = data.latest_result;
+    }
 
-        // Update main screen if visible
-        if (State.currentScreen === 'main' && data.is_running) {
-            updateMainScreen();
-            updateLogs(data.logs);
-        }
+    // Update main screen if visible
+    if (State.currentScreen === 'main' && data.is_running) {
+        updateMainScreen();
+        updateLogs(data.logs);
+    }
 
-        // Check alarm trigger
-        if (data.is_running && State.latestResult) {
-            checkAlarmTrigger({ is_running: data.is_running, latest_result: State.latestResult });
-        }
+    // Check alarm trigger
+    if (data.is_running && State.latestResult) {
+        checkAlarmTrigger({ is_running: data.is_running, latest_result: State.latestResult });
+    }
 
-        // If monitoring stopped externally
-        if (!data.is_running && State.currentScreen === 'main') {
-            updateToggleUI(false);
-        }
+    // If monitoring stopped externally
+    if (!data.is_running && State.currentScreen === 'main') {
+        updateToggleUI(false);
+    }
+}
 
+async function pollStatus() {
+    try {
+        const res = await fetch(`/api/status?since=${State.statusVersion}`);
+        if (res.status === 304) return;  // Nothing changed since our version
+        applyStatus(await res.json());
     } catch (e) { /* network error, skip */ }
 }
 
 function startPolling() {
+    // Prefer the push stream; fall back to 2s polling if SSE is unavailable
+    if (window.EventSource) {
+        const source = new EventSource('/api/status/stream');
+        source.addEventListener('status', e => applyStatus(JSON.parse(e.data)));
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED && !State.pollInterval) {
+                State.pollInterval = setInterval(pollStatus, 2000);
+            }
+        };
+        State.statusSource = source;
+        return;
+    }
     State.pollInterval = setInterval(pollStatus, 2000);
     pollStatus(); // Immediate first check
 }
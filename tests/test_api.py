@@ -0,0 +1,133 @@
+"""Flask API 테스트 — 외부 API 없이 test_client로 상태 조회·스트림 동작 검증."""
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app as kkokki_app
+
+
+def client():
+    return kkokki_app.app.test_client()
+
+
+def test_status_supports_since_and_etag():
+    c = client()
+    first = c.get('/api/status')
+    version = first.json['version']
+    assert first.headers['ETag']
+
+    assert c.get(f'/api/status?since={version}').status_code == 304
+    assert c.get('/api/status', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    kkokki_app.engine.log("something happened")
+    changed = c.get(f'/api/status?since={version}')
+    assert changed.status_code == 200
+    assert changed.json['version'] > version
+
+
+def test_status_version_is_per_job():
+    c = client()
+    first = c.get('/api/status?job_id=job-b')
+    version = first.json['version']
+
+    kkokki_app.engine.log("only about job A", job_id="job-a")
+    assert c.get(f'/api/status?job_id=job-b&since={version}').status_code == 304
+    assert c.get('/api/status?job_id=job-b', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    assert c.get(f'/api/status?job_id=job-a&since={version}').status_code == 200
+    assert kkokki_app.engine.feed.wait(version, timeout=0.01, key="job-b") == version
+
+    kkokki_app.engine.log("about job B", job_id="job-b")
+    assert c.get(f'/api/status?job_id=job-b&since={version}').json['version'] > version
+
+
+def test_status_stream_sends_snapshot_then_deltas():
+    c = client()
+    response = c.get('/api/status/stream', buffered=False)
+    stream = response.response
+
+    first = next(stream)
+    first = first.decode() if isinstance(first, bytes) else first
+    snapshot = json.loads(first.split("data: ", 1)[1])
+    assert {"version", "status", "logs", "latest_result"} <= set(snapshot)
+
+    kkokki_app.engine.log("new line")
+    delta = next(stream)
+    delta = delta.decode() if isinstance(delta, bytes) else delta
+    payload = json.loads(delta.split("data: ", 1)[1])
+    assert payload["new_logs"][-1].endswith("new line")
+    assert payload["version"] > snapshot["version"]
+    assert "latest_result" not in payload
+    response.close()
+
+
+def test_route_compare_runs_modes_concurrently(monkeypatch):
+    import time
+    engine = kkokki_app.engine
+    delays = {"0": 0.3, "1": 0.3, "2": 0.3, "10": 0.3}
+
+    def car(start, end, search_option="0"):
+        time.sleep(delays[search_option])
+        return {"minutes": 20 + int(search_option), "distance": 10.0, "coordinates": [[0, 0]]}
+
+    def walk(start, end):
+        time.sleep(0.3)
+        return {"minutes": 90, "distance": 6.0, "coordinates": []}
+
+    def transit(start, end):
+        time.sleep(2)
+        return {"minutes": 35, "distance": 9.0, "coordinates": []}
+
+    monkeypatch.setattr(engine, "calculate_car_route", car)
+    monkeypatch.setattr(engine, "calculate_walk_route", walk)
+    monkeypatch.setattr(engine, "calculate_transit_route", transit)
+
+    start = {"lat": 37.1101, "lon": 127.1101}
+    end = {"lat": 37.2202, "lon": 127.2202}
+    t0 = time.monotonic()
+    response = kkokki_app.app.test_client().post('/api/route/compare', json={
+        "start": start, "end": end, "stream": True, "deadlines": {"transit": 0.6}})
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    elapsed = time.monotonic() - t0
+
+    # Six calls of 0.3 s each finish together; transit is cut off at its deadline
+    assert elapsed < 1.2
+    results = {r["option"]: r for r in lines if r["type"] == "result"}
+    assert results["transit"]["status"] == "timeout"
+    assert results["car:fastest"]["status"] == "ok"
+    assert "coordinates" not in results["car"]["route"]
+    ranking = lines[-1]["ranking"]
+    assert [r["option"] for r in ranking[:2]] == ["car", "car:free"]
+    assert len(ranking) == 5
+
+
+def test_route_compare_rejects_unknown_option():
+    response = kkokki_app.app.test_client().post('/api/route/compare', json={
+        "start": {"lat": 1, "lon": 1}, "end": {"lat": 2, "lon": 2}, "options": ["car:scenic"]})
+    assert response.status_code == 400
+
+
+def test_route_compare_validates_deadlines():
+    c = client()
+    body = {"start": {"lat": 1, "lon": 1}, "end": {"lat": 2, "lon": 2}}
+    for deadlines in ({"car": "x"}, {"car": None}, {"car": "nan"}, {"boat": 1}, [1]):
+        response = c.post('/api/route/compare', json=dict(body, deadlines=deadlines))
+        assert response.status_code == 400 and response.json["success"] is False
+
+    check = kkokki_app.engine._check_deadlines
+    assert check({"car": -5, "walk": "2.5", "transit": 1e9}) == {"car": 0.1, "walk": 2.5, "transit": 30.0}
+
+
+def test_importing_app_and_agents_does_not_load_llm_sdks():
+    code = (
+        "import sys, app, src.agents\n"
+        "assert app.app.test_client().get('/api/status').status_code == 200\n"
+        "loaded = [m for m in ('google.generativeai', 'google.adk.agents', 'google.adk.apps') if m in sys.modules]\n"
+        "assert not loaded, loaded\n"
+    )
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    env = dict(os.environ, GOOGLE_API_KEY="test-key")
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
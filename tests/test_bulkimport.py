@@ -0,0 +1,117 @@
+"""일괄 등록 테스트 — CSV/JSONL 파싱·검증, 장소 중복 제거 지오코딩, 호출 예산, 행별 오류 보고 검증."""
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.bulkimport import BulkImporter, RateBudget, parse_rows
+from engine import KkokkiEngine
+
+CSV = """user,origin,destination,arrival_time,mode,prep_time
+kim,강남역,서울시청,09:00,car,20
+lee,강남역 ,서울시청,09:30,transit,
+park,판교역,서울시청,9시,car,
+choi,없는곳,서울시청,10:00,walk,
+jung,판교역,강남역,08:30,bus,
+kim,강남역,판교역,09:00,car,
+"""
+
+
+def fake_engine(monkeypatch, fetched):
+    engine = KkokkiEngine()
+    lock = threading.Lock()
+
+    def fetch_pois(keyword):
+        with lock:
+            fetched.append(keyword)
+        time.sleep(0.02)
+        if keyword == "없는곳":
+            return []
+        return [{"name": keyword.strip(), "lat": 37.5, "lon": 127.0, "address": "",
+                 "front_lat": 37.5 + len(fetched) * 1e-3, "front_lon": 127.0}]
+
+    monkeypatch.setattr(engine, "_fetch_pois", fetch_pois)
+    monkeypatch.setattr(engine, "calculate_route",
+                        lambda start, end, mode="car": {"mode": mode, "minutes": 35, "distance": 12.0})
+    return engine
+
+
+def test_parse_rows_validates_each_line():
+    rows = parse_rows(CSV)
+    errors = {line: error for line, row, error in rows if row is None}
+    assert errors == {
+        4: "arrival_time must be HH:MM, got '9시'",
+        6: "mode must be one of car, transit, walk, got 'bus'",
+        7: "duplicate user 'kim'",
+    }
+    first = rows[0][1]
+    assert first == {"user": "kim", "origin": "강남역", "destination": "서울시청",
+                     "arrival_time": "09:00", "mode": "car", "prep_time": 20}
+
+    jsonl = '{"user": "a", "origin": "x", "destination": "y", "arrival_time": "07:00"}\n\nnot json\n[1]\n'
+    rows = parse_rows(jsonl)
+    assert rows[0][1]["mode"] == "car"
+    assert [line for line, row, _ in rows if row is None] == [3, 4]
+
+
+def test_import_geocodes_each_place_once_and_reports_rows(monkeypatch):
+    fetched = []
+    engine = fake_engine(monkeypatch, fetched)
+    registered = []
+    importer = BulkImporter(engine, rate=1000, workers=4, register=lambda **job: registered.append(job))
+
+    events = list(importer.run(parse_rows(CSV)))
+    assert sorted(fetched) == sorted(["강남역", "서울시청", "없는곳"])   # "강남역 " shares the cache entry
+    assert [e["done"] for e in events if e["type"] == "geocode"] == [1, 2, 3]
+
+    summary = events[-1]
+    assert summary["type"] == "summary"
+    assert (summary["imported"], summary["failed"], summary["geocode_calls"]) == (2, 4, 3)
+    assert summary["route_calls"] == 2   # (강남역, 서울시청) by car and by transit
+    assert [e["line"] for e in summary["errors"]] == [4, 5, 6, 7]
+    assert summary["errors"][1] == {"line": 5, "user": "choi", "error": "origin: Cannot find location: '없는곳'"}
+
+    assert [job["job_id"] for job in registered] == ["kim", "lee"]
+    assert registered[0]["start_name"]["name"] == "강남역" and registered[0]["prep_time"] == 20
+    assert registered[1]["transport_mode"] == "transit" and "prep_time" not in registered[1]
+
+    # Geocoded places feed the autocomplete index like any other upstream result
+    assert [poi["name"] for poi in engine.poi_index.search("강남")] == ["강남역"]
+    assert [poi["name"] for poi in engine.poi_index.search("ㅅㅇㅅㅊ")] == ["서울시청"]
+
+    # A second import hits the POI cache: no upstream geocoding, nothing spent
+    fetched.clear()
+    dry = list(importer.run(parse_rows(CSV), dry_run=True))[-1]
+    assert fetched == [] and dry["geocode_calls"] == 0 and dry["imported"] == 2
+    assert len(registered) == 2
+    engine.scheduler.shutdown()
+
+
+def test_rate_budget_spaces_calls():
+    budget = RateBudget(rate=50, burst=1)
+    t0 = time.monotonic()
+    for _ in range(6):
+        budget.acquire()
+    assert time.monotonic() - t0 >= 0.09   # first call free, then 5 x 20 ms
+
+
+def test_import_endpoint_streams_ndjson(monkeypatch):
+    import app as kkokki_app
+
+    engine = kkokki_app.engine
+    monkeypatch.setattr(engine, "_fetch_pois", lambda keyword: [
+        {"name": keyword, "lat": 37.5, "lon": 127.0, "address": "", "front_lat": 37.5, "front_lon": 127.0}])
+    monkeypatch.setattr(engine, "calculate_route",
+                        lambda start, end, mode="car": {"mode": mode, "minutes": 20, "distance": 5.0})
+    body = "user,origin,destination,arrival_time\nimport-a,역삼역,을지로입구역,09:00\n"
+    response = kkokki_app.app.test_client().post(
+        '/api/import?dry_run=1', data=body.encode(), content_type='text/csv')
+    assert response.mimetype == 'application/x-ndjson'
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert events[0] == {"type": "parsed", "rows": 1, "invalid": 0, "places": 2}
+    assert events[-2] == {"type": "row", "line": 2, "user": "import-a", "ok": True, "minutes": 20}
+    assert events[-1]["imported"] == 1 and events[-1]["dry_run"]
+    assert engine.scheduler.get("import-a") is None
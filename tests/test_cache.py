@@ -0,0 +1,171 @@
+"""TTLCache / POI 캐시 테스트 — 동일 키워드 중복 호출 병합 및 TTL·LRU 검증."""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.cache import TTLCache, normalize_keyword
+from engine import KkokkiEngine
+
+
+def test_lru_eviction_and_ttl_expiry():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1          # "a" becomes most recent
+    cache.set("c", 3)                   # evicts "b"
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_empty_results_expire_sooner():
+    cache = TTLCache(ttl=60, empty_ttl=0.05)
+    loads = []
+    load = lambda: loads.append(1) or ([] if len(loads) == 1 else ["강남역"])
+    assert cache.get_or_load("강넘역", load) == []
+    assert cache.get_or_load("강넘역", load) == []   # still cached for a moment
+    time.sleep(0.06)
+    assert cache.get_or_load("강넘역", load) == ["강남역"]
+    time.sleep(0.06)
+    assert cache.get_or_load("강넘역", load) == ["강남역"] and len(loads) == 2
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    calls = []
+    gate = threading.Event()
+
+    def loader():
+        calls.append(1)
+        gate.wait(1)
+        return ["강남역"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [["강남역"]] * 8
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_failed_load_is_not_cached():
+    cache = TTLCache()
+
+    def boom():
+        raise RuntimeError("503")
+
+    for _ in range(2):
+        try:
+            cache.get_or_load("k", boom)
+        except RuntimeError:
+            pass
+    assert cache.stats()["misses"] == 2
+
+
+def test_get_coordinates_reuses_search_results():
+    engine = KkokkiEngine()
+    calls = []
+
+    def fetch(keyword):
+        calls.append(keyword)
+        return [{"name": "강남역", "lat": 37.49, "lon": 127.02, "address": "서울 강남구",
+                 "front_lat": "37.497", "front_lon": "127.027"}]
+
+    engine._fetch_pois = fetch
+    assert engine.search_locations("강남역")[0]["name"] == "강남역"
+    assert engine.get_coordinates("  강남역 ") == {"name": "강남역", "lon": "127.027", "lat": "37.497"}
+    assert calls == ["강남역"]
+    assert normalize_keyword("Gangnam  Station") == normalize_keyword("gangnam station")
+
+
+def test_geohash_matches_reference_value():
+    from core.geocache import geohash_encode
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_nearby_taps_share_one_reverse_geocode(tmp_path):
+    from core.geocache import GeohashCache
+    path = str(tmp_path / "geo.bin")
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"name": "파크시엘", "address": "서울 강남구 역삼동"}
+
+    cache = GeohashCache(precision=7, path=path, disk_capacity=64)
+    cache.get_or_load(37.49790, 127.02760, loader)
+    cache.get_or_load(37.49795, 127.02766, loader)   # a few metres away
+    assert len(calls) == 1
+    assert cache.stats()["avoided"] == 1
+    cache.disk.flush()
+
+    # A fresh process reads the same cell from the mmap tier
+    reloaded = GeohashCache(precision=7, path=path, disk_capacity=64)
+    assert reloaded.get_or_load(37.49790, 127.02760, loader)["name"] == "파크시엘"
+    assert len(calls) == 1
+    assert reloaded.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_initialisation_is_serialised(tmp_path):
+    import fcntl
+    from core.geocache import MmapGeoStore
+    path = str(tmp_path / "geo.bin")
+    first = MmapGeoStore(path, precision=7, capacity=64)
+    first.put("wydm9qy", {"name": "강남역"})
+
+    # Another worker mid-initialisation holds the lock: opening waits for it
+    opened = []
+    with open(path, "rb") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        thread = threading.Thread(target=lambda: opened.append(MmapGeoStore(path, precision=7, capacity=64)))
+        thread.start()
+        time.sleep(0.05)
+        assert not opened
+    thread.join(2)
+    assert opened[0].get("wydm9qy") == {"name": "강남역"}   # nothing wiped
+
+
+def test_route_cache_serves_stale_then_refreshes(monkeypatch):
+    from core import routecache
+    from core.routecache import RouteCache
+
+    clock = [1000.0]
+    monkeypatch.setattr(routecache.time, "time", lambda: clock[0])
+    cache = RouteCache(bucket_seconds=300)
+    start, end = {"lat": 37.49, "lon": 127.02}, {"lat": 37.56, "lon": 126.97}
+    minutes = iter([30, 42])
+    loader = lambda: {"minutes": next(minutes)}
+
+    assert cache.get_or_load(start, end, "car", loader) == ({"minutes": 30}, "miss")
+    assert cache.get_or_load(start, end, "car", loader) == ({"minutes": 30}, "fresh")
+
+    clock[0] += 300   # next traffic bucket
+    assert cache.get_or_load(start, end, "car", loader) == ({"minutes": 30}, "stale")
+    cache._refresher.shutdown(wait=True)
+    assert cache.get_or_load(start, end, "car", loader) == ({"minutes": 42}, "fresh")
+
+
+def test_monitor_samples_warm_route_previews():
+    engine = KkokkiEngine()
+    calls = []
+    engine.calculate_route = lambda s, e, mode='car': calls.append(mode) or {"minutes": 25, "distance": 8.0}
+    start, end = {"name": "A", "lat": 37.49, "lon": 127.02}, {"name": "B", "lat": 37.56, "lon": 126.97}
+    job = engine.start_monitoring(start, end, "09:00", job_id="warm")
+    deadline = time.monotonic() + 2
+    while job.latest_result is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    engine.stop_monitoring("warm")
+
+    route, status = engine.get_route(start, end, "car")
+    assert status == "fresh" and route["minutes"] == 25
+    assert calls == ["car"]
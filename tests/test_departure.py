@@ -0,0 +1,85 @@
+"""출발 시각 계산기 테스트 — 시간대별 소요시간에서 가장 늦은 출발 시각과 호출 횟수 검증."""
+import math
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.departure import solve_departure
+from engine import KkokkiEngine
+
+ARRIVAL = 1_760_342_400 + 9 * 3600
+
+
+def brute_force(minutes, arrival, earliest):
+    d = arrival // 60 * 60
+    while d >= earliest:
+        if d + minutes(d) * 60 <= arrival:
+            return d
+        d -= 60
+    return None
+
+
+def test_flat_profile_settles_at_the_fixed_point():
+    calls = []
+
+    def minutes(ts):
+        calls.append(ts)
+        return 30
+
+    solution = solve_departure(minutes, ARRIVAL, guess_minutes=30)
+    assert solution["departure"] == ARRIVAL - 30 * 60
+    assert solution["feasible"] and solution["method"] == "fixed_point"
+    # One probe for the fixed point, one proving the next minute is too late
+    assert len(calls) == 2
+
+
+def test_timetable_profile_matches_linear_scan_with_few_calls():
+    def train(ts):
+        # 5 min walk, trains every 12 minutes from :03, 25 min ride
+        at_stop = ts + 300
+        wait = (180 - at_stop) % 720
+        return math.ceil((300 + wait + 1500) / 60)
+
+    calls = []
+
+    def minutes(ts):
+        calls.append(ts)
+        return train(ts)
+
+    earliest = ARRIVAL - 3 * 3600
+    solution = solve_departure(minutes, ARRIVAL, guess_minutes=30, earliest=earliest)
+    assert solution["departure"] == brute_force(train, ARRIVAL, earliest)
+    assert solution["arrival"] <= ARRIVAL
+    assert len(calls) <= 10
+
+
+def test_reports_infeasible_when_even_earliest_is_late():
+    solution = solve_departure(lambda ts: 90, ARRIVAL, earliest=ARRIVAL - 3600)
+    assert not solution["feasible"]
+    assert solution["departure"] == ARRIVAL - 3600
+
+
+def test_engine_solves_transit_with_cached_probes(monkeypatch):
+    engine = KkokkiEngine()
+    requested = []
+
+    def transit(start, end, depart_at=None):
+        requested.append(depart_at)
+        # Last useful train leaves at 08:30 and arrives 08:55
+        minutes = 25 if depart_at.minute <= 30 or depart_at.hour < 8 else 40
+        return {"mode": "transit", "minutes": minutes + (30 - depart_at.minute) % 30, "distance": 9.0}
+
+    monkeypatch.setattr(engine, "calculate_transit_route", transit)
+    start, end = {"lat": 37.51, "lon": 127.01}, {"lat": 37.56, "lon": 126.97}
+    now = datetime(2025, 10, 13, 7, 0)
+    arrival = datetime(2025, 10, 13, 9, 0)
+
+    first = engine.solve_departure(start, end, arrival, 'transit', now=now, guess_minutes=25)
+    assert first["departure"] == datetime(2025, 10, 13, 8, 30)
+    assert first["upstream_calls"] == len(requested)
+
+    again = engine.solve_departure(start, end, arrival, 'transit', now=now, guess_minutes=25)
+    assert again["departure"] == first["departure"]
+    assert again["upstream_calls"] == 0
@@ -0,0 +1,75 @@
+"""지각 알림 초안 테스트 — 백그라운드 초안 생성, 슬롯 채우기, 템플릿 즉시 대체 검증."""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.drafts import DraftCache
+from engine import KkokkiEngine
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_render_uses_template_until_draft_is_ready():
+    release = threading.Event()
+    calls = []
+
+    def generate(route):
+        calls.append(route)
+        release.wait(2)
+        return f"{route}: 약 {{delay}}분 늦어, {{eta}} 도착 예정 {{curly}}"
+
+    drafts = DraftCache(generate)
+    assert drafts.prefetch("a-b", "a-b")
+    assert not drafts.prefetch("a-b", "a-b")   # already in flight
+
+    t0 = time.monotonic()
+    message, source = drafts.render("a-b", "{delay}분 지연 ({eta})", delay=12, eta="09:12")
+    assert time.monotonic() - t0 < 0.1
+    assert (message, source) == ("12분 지연 (09:12)", "template")
+
+    release.set()
+    assert wait_for(lambda: drafts.ready("a-b"))
+    message, source = drafts.render("a-b", "unused", delay=12, eta="09:12")
+    assert source == "draft"
+    assert message == "a-b: 약 12분 늦어, 09:12 도착 예정 {curly}"
+    assert calls == ["a-b"]
+
+
+def test_drafts_without_slots_or_failures_are_discarded():
+    def generate(kind):
+        if kind == "bad":
+            return "슬롯 없는 고정 문구"
+        raise RuntimeError("quota exceeded")
+
+    drafts = DraftCache(generate)
+    drafts.prefetch("bad", "bad")
+    drafts.prefetch("boom", "boom")
+    assert wait_for(lambda: drafts.stats()["rejected"] == 2)
+    assert drafts.render("bad", "{delay}분", delay=3, eta="x") == ("3분", "template")
+    assert drafts.prefetch("bad", "bad")       # may retry later
+
+
+def test_late_alert_does_not_wait_for_llm(monkeypatch):
+    engine = KkokkiEngine()
+    release = threading.Event()
+
+    class SlowModel:
+        def generate_content(self, prompt):
+            release.wait(5)
+            raise TimeoutError("LLM too slow")
+
+    engine.model = SlowModel()
+    engine.prepare_delay_message("집", "회사", "09:00")
+    t0 = time.monotonic()
+    message, source = engine.render_delay_message("집", "회사", "09:00", 15)
+    assert time.monotonic() - t0 < 0.1
+    assert source == "template" and "15분" in message
+    release.set()
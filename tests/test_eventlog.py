@@ -0,0 +1,36 @@
+"""EventLog 테스트 — 링 버퍼 보존 범위, 증분 조회, 파일 sink 재생 검증."""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.eventlog import EventLog, format_event, read_events
+
+
+def test_ring_keeps_last_capacity_events_in_order():
+    log = EventLog(capacity=3)
+    for i in range(5):
+        log.append(f"m{i}", job_id="a" if i % 2 else "b")
+    assert [e["seq"] for e in log.since(0)] == [3, 4, 5]
+    assert [e["message"] for e in log.since(4)] == ["m4"]
+    assert [e["message"] for e in log.tail(2, job_id="a")] == ["m3"]
+    assert format_event(log.since(4)[0]).endswith("] m4")
+
+
+def test_sink_replays_and_continues_sequence(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    log = EventLog(capacity=2, sink_path=path)
+    log.append("Tmap: 30min travel", kind="route_sample", job_id="u1", travel_minutes=30)
+    log.append("Kkokki: Late alert sent!", kind="alert", job_id="u1")
+    log.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 3, "torn')   # crash mid-write
+
+    replayed = list(read_events(path, job_id="u1"))
+    assert [e["kind"] for e in replayed] == ["route_sample", "alert"]
+    assert replayed[0]["fields"] == {"travel_minutes": 30}
+
+    restarted = EventLog(sink_path=path)
+    assert restarted.append("after restart")["seq"] == 3
+    restarted.close()
+    assert [e["message"] for e in read_events(path, since=2)] == ["after restart"]
@@ -0,0 +1,78 @@
+"""TravelHistory 테스트 — 요일·시간대 예측, 파일 재적재, TMAP 장애 시 이력 대체 검증."""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.history import TravelHistory
+from engine import KkokkiEngine
+
+MONDAY_8AM_UTC = 1_760_342_400 + 8 * 3600   # 2025-10-13 is a Monday
+
+
+def test_predicts_per_weekday_slot_and_survives_reload(tmp_path):
+    path = str(tmp_path / "history.bin")
+    store = TravelHistory(path, utc_offset=0)
+    week = 7 * 86400
+    store.append_many([("a:b", "car", 40 + (i % 2), 12.0, MONDAY_8AM_UTC + i * week) for i in range(6)])
+    store.append_many([("a:b", "car", 25, 12.0, MONDAY_8AM_UTC + 86400 + i * week) for i in range(6)])
+    store.close()
+
+    reloaded = TravelHistory(path, utc_offset=0)
+    assert len(reloaded) == 12
+    monday = reloaded.predict("a:b", "car", MONDAY_8AM_UTC + 10 * week)
+    tuesday = reloaded.predict("a:b", "car", MONDAY_8AM_UTC + 86400 + 10 * week)
+    assert monday["basis"] == "weekday_slot" and monday["confident"]
+    assert round(monday["minutes"]) in (40, 41)
+    assert tuesday["minutes"] == 25
+    assert reloaded.predict("x:y", "car") is None
+
+
+def test_in_memory_history_keeps_a_bounded_ring():
+    store = TravelHistory(utc_offset=0, memory_records=100)
+    store.append_many([("a:b", "car", 40, 12.0, MONDAY_8AM_UTC + i // 2) for i in range(1000)])
+    store.append("a:b", "car", 40, 12.0, MONDAY_8AM_UTC + 600)
+    raw = list(store.scan())
+    assert 100 <= len(raw) <= 125 and raw[-1][0] == MONDAY_8AM_UTC + 600   # newest kept
+    assert len(store) == 1001 and store.predict("a:b", "car", MONDAY_8AM_UTC)["samples"] == 1001
+
+
+def test_readonly_reader_never_repairs_and_follows_the_writer(tmp_path):
+    path = str(tmp_path / "history.bin")
+    writer = TravelHistory(path, utc_offset=0)
+    writer.append_many([("a:b", "car", 40, 12.0, MONDAY_8AM_UTC + i * 7 * 86400) for i in range(3)])
+    with open(path, "ab") as f:
+        f.write(b"\0" * 5)             # a record the writer is still in the middle of
+    size = os.path.getsize(path)
+
+    reader = TravelHistory(path, utc_offset=0, readonly=True)
+    assert os.path.getsize(path) == size and len(reader) == 3
+    with open(path, "r+b") as f:
+        f.truncate(size - 5)            # (the writer finishes its record)
+    writer.append_many([("c:d", "walk", 15, 1.0, MONDAY_8AM_UTC + i * 7 * 86400) for i in range(5)])
+    assert reader.predict("c:d", "walk", MONDAY_8AM_UTC)["samples"] == 5
+    assert len(reader) == 8
+    with pytest.raises(ValueError):
+        reader.append("a:b", "car", 30)
+
+
+def test_monitor_falls_back_to_history_when_tmap_fails():
+    engine = KkokkiEngine()
+    start, end = {"name": "A", "lat": 37.49, "lon": 127.02}, {"name": "B", "lat": 37.56, "lon": 126.97}
+    probe = type("Job", (), {"start_coord": start, "end_coord": end, "transport_mode": "car"})
+    engine.history.append(engine._history_key(probe), "car", 33, 9.0)
+
+    def down(*args, **kwargs):
+        raise Exception("Car route calculation failed: 503")
+
+    engine.calculate_route = down
+    job = engine.start_monitoring(start, end, "09:00", job_id="fallback")
+    deadline = time.monotonic() + 2
+    while job.latest_result is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    engine.stop_monitoring("fallback")
+    assert job.latest_result["source"] == "history_fallback"
+    assert job.latest_result["travel_minutes"] == 33
@@ -0,0 +1,121 @@
+"""작업 저장소 테스트 — SQLite 스냅샷, 지연 쓰기, 재시작 후 복구(재지오코딩·중복 알림 없음) 검증."""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.jobstore import JobStore
+from core.scheduler import MonitorJob
+from engine import KkokkiEngine
+
+START = {"name": "A", "lat": 37.49, "lon": 127.02}
+END = {"name": "B", "lat": 37.56, "lon": 126.97}
+
+
+def wait_until(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_store_round_trip_and_write_behind(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"), flush_interval=60)
+    job = MonitorJob("강남역", "서울시청", "09:00", "transit", job_id="u1", prep_time=20)
+    store.put(job)
+    job.start_coord, job.end_coord = START, END
+    job.latest_result = {"wake_up_iso": "2026-10-19T07:40:00", "travel_minutes": 42}
+    store.save_state(job)
+    assert store.stats()["pending"] == 1
+    assert store.load()[0]["latest_result"]["travel_minutes"] == 42   # load flushes first
+
+    row = store.load()[0]
+    assert row["definition"]["settings"]["prep_time"] == 20
+    assert row["definition"]["start"] == "강남역"
+    assert row["start_coord"] == START and not row["slack_sent"]
+    store.close()
+
+
+def test_stale_job_objects_cannot_overwrite_or_delete(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    old = MonitorJob(START, END, "09:00", job_id="u1")
+    store.put(old)
+    new = MonitorJob(START, END, "10:00", job_id="u1")
+    store.put(new)
+
+    old.slack_sent = True
+    store.save_state(old, sync=True)      # 재시작 전 작업의 늦은 체크 결과
+    store.save_state(old)
+    store.delete(old)
+    rows = store.load()
+    assert len(rows) == 1 and rows[0]["definition"]["arrival_time"] == "10:00" and not rows[0]["slack_sent"]
+
+    store.delete(new)
+    assert store.count() == 0
+    store.close()
+
+
+@pytest.fixture
+def engine_factory(tmp_path, monkeypatch):
+    monkeypatch.setenv("KKOKKI_JOBSTORE_PATH", str(tmp_path / "jobs.db"))
+    monkeypatch.setenv("KKOKKI_RECOVERY_SPREAD", "0")
+    calls = {"geocode": 0, "slack": []}
+
+    def get_coordinates(self, keyword):
+        calls["geocode"] += 1
+        return dict(START if keyword == "A역" else END, name=keyword)
+
+    monkeypatch.setattr(KkokkiEngine, "get_coordinates", get_coordinates)
+    monkeypatch.setattr(KkokkiEngine, "calculate_route",
+                        lambda self, s, e, mode='car': {"minutes": 60, "distance": 10.0})
+    monkeypatch.setattr(KkokkiEngine, "render_delay_message",
+                        lambda self, s, e, t, delay: (f"{delay}분 지연", "template"))
+    monkeypatch.setattr(KkokkiEngine, "send_slack_message",
+                        lambda self, message, key=None: calls["slack"].append(key))
+    monkeypatch.setattr(KkokkiEngine, "prepare_delay_message", lambda self, *args: None)
+    engines = []
+
+    def make():
+        engine = KkokkiEngine()
+        engine.google_api_key = "test"
+        engines.append(engine)
+        return engine
+
+    yield make, calls
+    for engine in engines:
+        engine.scheduler.shutdown()
+        engine.jobstore.close()
+
+
+def test_restart_recovers_jobs_without_regeocoding_or_resending(engine_factory):
+    make, calls = engine_factory
+    first = make()
+    arrival = (datetime.now() + timedelta(minutes=30)).strftime("%H:%M")   # 60분 걸리니 지각 위험
+    first.start_monitoring("A역", "B역", arrival, job_id="late", prep_time=0, buffer_time=0)
+    calm = (datetime.now() + timedelta(hours=6)).strftime("%H:%M")
+    first.start_monitoring("A역", "B역", calm, job_id="calm")
+    first.start_monitoring("A역", "B역", calm, job_id="stopped")
+    assert wait_until(lambda: first.get_status("late")["status"] == "LATE_RISK"
+                      and first.get_status("calm")["latest_result"]
+                      and first.get_status("stopped")["latest_result"])
+    first.stop_monitoring("stopped")
+    first.jobstore.flush()
+    assert calls["geocode"] == 6 and len(calls["slack"]) == 1
+    # 크래시: 작업을 멈추지 않고 스케줄러만 버림
+    first.scheduler.shutdown()
+
+    second = make()
+    assert second.recovery["jobs"] == 2
+    assert second.scheduler.get("stopped") is None
+    late = second.scheduler.get("late")
+    assert late.slack_sent and late.start_coord["name"] == "A역"
+    assert wait_until(lambda: late.check_runs >= 1 and second.scheduler.get("calm").check_runs >= 1)
+    assert calls["geocode"] == 6           # 좌표는 저장본 사용
+    assert len(calls["slack"]) == 1        # 알림 재발송 없음
+    assert second.get_status("late")["status"] == "LATE_RISK"
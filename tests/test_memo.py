@@ -0,0 +1,93 @@
+"""세션 단위 도구 메모이제이션 테스트 — TTL, 세션 구분, 부작용 도구 제외, 적중률 집계 검증."""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils import memo
+from src.utils.memo import bind_tool_session, clear_memo, memo_stats, memoize, no_memo, set_tool_session
+from src.tools import get_realtime_traffic, send_team_notification, set_dynamic_alarm
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo():
+    clear_memo()
+    token = set_tool_session("test")
+    yield
+    memo._session.reset(token)
+    clear_memo()
+
+
+def counting_tool(ttl=60):
+    calls = []
+
+    @memoize(ttl=ttl)
+    def lookup(origin: str = "집", destination: str = "회사") -> dict:
+        """테스트용 조회 도구."""
+        calls.append((origin, destination))
+        return {"route": f"{origin}->{destination}", "stops": [1, 2]}
+
+    return lookup, calls
+
+
+def test_same_arguments_hit_cache_within_session():
+    lookup, calls = counting_tool()
+    first = lookup()
+    assert lookup(origin="집") == first          # 기본값 명시 여부와 무관하게 같은 키
+    assert lookup("집", "회사") == first
+    assert len(calls) == 1
+    lookup(destination="학교")
+    assert len(calls) == 2
+    assert memo_stats()["lookup"] == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+
+
+def test_cached_results_are_copies():
+    lookup, _ = counting_tool()
+    lookup()["stops"].append(3)
+    assert lookup()["stops"] == [1, 2]
+
+
+def test_sessions_do_not_share_entries():
+    lookup, calls = counting_tool()
+    lookup()
+    bind_tool_session(tool_context=SimpleNamespace(session=SimpleNamespace(id="other")))
+    lookup()
+    assert len(calls) == 2
+    clear_memo("other")
+    lookup()
+    assert len(calls) == 3
+
+
+def test_entries_expire_after_ttl():
+    lookup, calls = counting_tool(ttl=0.05)
+    lookup()
+    time.sleep(0.08)
+    lookup()
+    assert len(calls) == 2
+
+
+def test_signature_and_docstring_are_preserved_for_adk():
+    import inspect
+
+    assert list(inspect.signature(get_realtime_traffic).parameters) == ["origin", "destination", "departure_time"]
+    assert "소요 시간" in get_realtime_traffic.__doc__
+    assert get_realtime_traffic.memo_ttl == 120
+
+
+def test_side_effecting_tools_are_never_memoized(monkeypatch):
+    assert set_dynamic_alarm.memo_disabled and send_team_notification.memo_disabled
+    first = set_dynamic_alarm("07:10")
+    second = set_dynamic_alarm("07:10")
+    assert first == second and "set_dynamic_alarm" not in memo_stats()
+    with pytest.raises(ValueError):
+        memoize(ttl=60)(set_dynamic_alarm)
+
+    @no_memo
+    def page_team() -> dict:
+        return {}
+    with pytest.raises(ValueError):
+        memoize(ttl=60)(page_team)
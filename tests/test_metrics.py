@@ -0,0 +1,58 @@
+"""메트릭 테스트 — 히스토그램/카운터/게이지 텍스트 출력과 /metrics 엔드포인트 검증."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.metrics import Registry, UPSTREAM_ERRORS, track_upstream
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("demo_seconds", "Demo.", ("upstream",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("tmap").observe(value)
+    lines = registry.render().splitlines()
+    assert 'demo_seconds_bucket{upstream="tmap",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{upstream="tmap",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{upstream="tmap",le="+Inf"} 4' in lines
+    assert 'demo_seconds_count{upstream="tmap"} 4' in lines
+    assert "# TYPE demo_seconds histogram" in lines
+
+
+def test_counters_gauges_and_label_escaping():
+    registry = Registry()
+    alerts = registry.counter("demo_total", "Demo.", ("channel",))
+    alerts.labels(channel='sl"ack').inc(2)
+    plain = registry.counter("plain_total", "Unlabelled.")
+    plain.inc()
+    registry.gauge("demo_jobs", "Jobs.", ("status",), callback=lambda: {("MONITORING",): 3, ("LATE_RISK",): 1})
+    text = registry.render()
+    assert 'demo_total{channel="sl\\"ack"} 2' in text
+    assert "plain_total 1" in text
+    assert 'demo_jobs{status="MONITORING"} 3' in text
+    with pytest.raises(ValueError):
+        alerts.labels("a", "b")
+
+
+def test_track_upstream_counts_errors():
+    before = UPSTREAM_ERRORS.labels("test", "boom").value
+    with pytest.raises(RuntimeError):
+        with track_upstream("test", "boom"):
+            raise RuntimeError("upstream down")
+    assert UPSTREAM_ERRORS.labels("test", "boom").value == before + 1
+
+
+def test_metrics_endpoint_exposes_request_and_job_metrics():
+    import app as kkokki_app
+    client = kkokki_app.app.test_client()
+    client.get('/api/status')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert 'kkokki_http_requests_total{endpoint="/api/status",method="GET",status="200"}' in text
+    assert 'kkokki_jobs{status="LATE_RISK"}' in text
+    assert "kkokki_active_jobs " in text
@@ -0,0 +1,133 @@
+"""알림 디스패처 테스트 — 비동기 전송, 중복 제거, 묶음 전송, 429 재시도, outbox 복구 검증."""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.notify import NotificationDispatcher
+
+URL = "https://hooks.example/T000/B000"
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeHttp:
+    """Records posts; answers from `plan` (status, headers) then 200."""
+
+    def __init__(self, plan=(), delay=0.0):
+        self.plan = list(plan)
+        self.delay = delay
+        self.posts = []
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, **kwargs):
+        time.sleep(self.delay)
+        with self.lock:
+            self.posts.append((time.monotonic(), json))
+            status, headers = self.plan.pop(0) if self.plan else (200, {})
+        return FakeResponse(status, headers)
+
+
+def alert(text):
+    return {"text": "*Kkokki Late Alert*", "attachments": [{"text": text}]}
+
+
+def test_enqueue_never_blocks_and_dedups_by_key():
+    http = FakeHttp(delay=0.5)
+    notifier = NotificationDispatcher(http, coalesce_window=0, min_interval=0)
+    t0 = time.monotonic()
+    assert notifier.enqueue(URL, alert("late"), key="job1:late:2025-10-13")
+    assert not notifier.enqueue(URL, alert("late again"), key="job1:late:2025-10-13")
+    assert time.monotonic() - t0 < 0.1
+    assert notifier.flush(timeout=3)
+    assert not notifier.enqueue(URL, alert("after delivery"), key="job1:late:2025-10-13")
+    assert len(http.posts) == 1
+    assert notifier.stats()["deduplicated"] == 2
+    notifier.close()
+
+
+def test_alerts_within_window_are_coalesced_into_one_post():
+    http = FakeHttp()
+    notifier = NotificationDispatcher(http, coalesce_window=0.2, min_interval=0)
+    for i in range(3):
+        notifier.enqueue(URL, alert(f"job{i}"), key=f"job{i}:late")
+    assert notifier.flush(timeout=3)
+    assert len(http.posts) == 1
+    payload = http.posts[0][1]
+    assert [a["text"] for a in payload["attachments"]] == ["job0", "job1", "job2"]
+    notifier.close()
+
+
+def test_429_retry_after_and_5xx_backoff_then_delivery():
+    http = FakeHttp(plan=[(429, {"Retry-After": "0.3"}), (503, {})])
+    notifier = NotificationDispatcher(http, coalesce_window=0, min_interval=0, backoff_base=0.1)
+    notifier.enqueue(URL, alert("late"), key="k")
+    assert notifier.flush(timeout=5)
+    (t1, _), (t2, _), (t3, _) = http.posts
+    assert t2 - t1 >= 0.3
+    assert t3 - t2 >= 0.05
+    stats = notifier.stats()
+    assert stats["rate_limited"] == 1 and stats["retries"] == 1 and stats["sent"] == 1
+    notifier.close()
+
+
+def test_pending_alerts_survive_restart(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    down = FakeHttp(plan=[(503, {})] * 10)
+    first = NotificationDispatcher(down, outbox_path=path, coalesce_window=0, backoff_base=60)
+    first.enqueue(URL, alert("late"), key="job1:late")
+    time.sleep(0.2)
+    first.close()
+
+    up = FakeHttp()
+    assert URL not in open(path).read()          # only the webhook alias is journaled
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    second = NotificationDispatcher(up, outbox_path=path, coalesce_window=0, webhooks=[URL])
+    assert second.flush(timeout=3)
+    assert [p["attachments"][0]["text"] for _, p in up.posts] == ["late"]
+    second.close()
+
+    third = NotificationDispatcher(FakeHttp(), outbox_path=path)
+    assert third.pending() == 0
+    assert not third.enqueue(URL, alert("late"), key="job1:late")
+    third.close()
+
+
+def test_unknown_webhook_is_dropped_on_replay(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    first = NotificationDispatcher(FakeHttp(plan=[(503, {})] * 10), outbox_path=path,
+                                   coalesce_window=0, backoff_base=60)
+    first.enqueue(URL, alert("late"), key="job1:late")
+    first.close()
+
+    second = NotificationDispatcher(FakeHttp(), outbox_path=path)   # webhook no longer configured
+    assert second.pending() == 0 and second.stats()["dropped"] == 1
+    second.close()
+
+
+def test_delivered_keys_expire_and_the_journal_compacts(tmp_path):
+    path = str(tmp_path / "outbox.jsonl")
+    notifier = NotificationDispatcher(FakeHttp(), outbox_path=path, coalesce_window=0, min_interval=0,
+                                      remember=0.2, max_batch=500)
+    notifier._outbox.COMPACT_MIN_LINES = 20
+    for i in range(100):
+        notifier.enqueue(URL, alert("late"), key=f"job{i}:late")
+    assert notifier.flush(timeout=5)
+    time.sleep(0.25)
+    for i in range(30):
+        notifier.enqueue(URL, alert("late"), key=f"later{i}:late")
+    assert notifier.flush(timeout=5)
+
+    assert len(notifier._keys) == 30                    # only the keys still within `remember`
+    assert notifier.enqueue(URL, alert("again"), key="job0:late")   # forgotten, so sent again
+    assert notifier.flush(timeout=5)
+    with open(path) as f:
+        journal = f.read()
+    assert "job1:late" not in journal and journal.count("\n") < 100   # 260+ lines written
+    notifier.close()
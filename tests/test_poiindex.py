@@ -0,0 +1,100 @@
+"""POI 자동완성 색인 테스트 — 자모 접두어·초성·오타 허용 검색, 스냅샷 재적재, TMAP 이전 조회 검증."""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.poiindex import PoiIndex, to_chosung, to_jamo
+from engine import KkokkiEngine
+
+POIS = [
+    {"name": "강남역 2호선", "lat": 37.4979, "lon": 127.0276, "address": "서울 강남구 역삼동"},
+    {"name": "강남역 신분당선", "lat": 37.4968, "lon": 127.0284, "address": "서울 강남구"},
+    {"name": "스타벅스 강남R점", "lat": 37.5010, "lon": 127.0260, "address": "서울 강남구"},
+    {"name": "서울시청", "lat": 37.5663, "lon": 126.9779, "address": "서울 중구 태평로1가"},
+    {"name": "판교역 [신분당선]", "lat": 37.3948, "lon": 127.1112, "address": "경기 성남시"},
+    {"name": "광화문", "lat": 37.5759, "lon": 126.9768, "address": "서울 종로구"},
+]
+
+
+def names(results):
+    return [poi["name"] for poi in results]
+
+
+def test_decomposition():
+    assert to_jamo("광화문") == "ㄱㅗㅏㅇㅎㅗㅏㅁㅜㄴ"     # compound vowels split
+    assert to_jamo("닭") == "ㄷㅏㄹㄱ"                     # compound finals split
+    assert to_chosung("강남역 2호선") == "ㄱㄴㅇ 2ㅎㅅ"
+
+
+def test_prefix_chosung_and_word_matches():
+    index = PoiIndex()
+    assert index.add_many(POIS) == 6
+    assert index.add_many(POIS[:1]) == 0                 # already known: only counted
+
+    assert names(index.search("강나"))[:2] == ["강남역 2호선", "강남역 신분당선"]   # mid-syllable
+    assert names(index.search("강남"))[-1] == "스타벅스 강남R점"    # later word ranks after
+    assert names(index.search("ㄱㄴㅇ")) == ["강남역 2호선", "강남역 신분당선"]
+    assert names(index.search("ㅅㅇㅅㅊ")) == ["서울시청"]
+    assert names(index.search("서울 시청")) == ["서울시청"]      # spacing ignored
+    assert names(index.search("신분당")) == ["강남역 신분당선", "판교역 [신분당선]"]
+    assert names(index.search("과")) == ["광화문"]
+    assert index.search("강남", limit=1)[0] == POIS[0]      # more upstream hits rank first
+
+
+def test_typo_tolerance():
+    index = PoiIndex()
+    index.add_many(POIS)
+    assert names(index.search("서울시첨")) == ["서울시청"]
+    assert names(index.search("감남역"))[:2] == ["강남역 2호선", "강남역 신분당선"]
+    assert names(index.search("광하문")) == ["광화문"]
+    assert index.search("감남역", fuzzy=False) == []
+    assert index.search("부산역") == []
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "pois.idx")
+    index = PoiIndex(path)
+    index.add_many(POIS)
+    index.add_many(POIS[3:4])
+    index.save()
+
+    loaded = PoiIndex(path)
+    assert len(loaded) == len(POIS)
+    assert names(loaded.search("ㄱㄴㅇ")) == names(index.search("ㄱㄴㅇ"))
+    assert names(loaded.search("서울시첨")) == ["서울시청"]
+    assert loaded.add_many(POIS[:1]) == 0
+
+    reader = PoiIndex(path, readonly=True)   # a web worker: loads, never writes
+    reader.add_many([dict(POIS[0], name="새 장소")])
+    reader.close()
+    assert len(PoiIndex(path)) == len(POIS)
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+    assert len(PoiIndex(path)) == 0        # a damaged snapshot starts empty
+
+
+def test_engine_searches_locally_before_tmap(monkeypatch):
+    engine = KkokkiEngine()
+    calls = []
+
+    def fetch_pois(keyword):
+        calls.append(keyword)
+        return [dict(poi, front_lat=poi["lat"], front_lon=poi["lon"]) for poi in POIS[:2]] + [
+            {"name": f"강남역 {i}번 출구", "lat": 37.49 + i * 1e-3, "lon": 127.02, "address": "",
+             "front_lat": 37.49, "front_lon": 127.02} for i in range(1, 5)]
+
+    monkeypatch.setattr(engine, "_fetch_pois", fetch_pois)
+    assert engine.search_locations("ㄱㄴ", local_only=True) == []
+    first = engine.search_locations("강남역")
+    assert calls == ["강남역"] and len(first) == 6
+
+    # Enough exact local matches: answered without TMAP, by prefix and by 초성
+    assert len(engine.search_locations("강남")) == 6
+    assert len(engine.search_locations("ㄱㄴㅇ")) == 6
+    assert calls == ["강남역"]
+    assert names(engine.search_locations("감남역", local_only=True))[0] == "강남역 2호선"
+    engine.search_locations("서울시청")
+    assert calls == ["강남역", "서울시청"]
+    engine.scheduler.shutdown()
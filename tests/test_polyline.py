@@ -0,0 +1,29 @@
+"""경로 geometry 압축 테스트 — encoded polyline 왕복 및 줌 기반 단순화 검증."""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.polyline import compact_route, decode_polyline, encode_polyline, simplify, tolerance_for_zoom
+
+
+def test_reference_encoding_and_round_trip():
+    # Example from the encoded polyline algorithm reference
+    coords = [[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]]
+    encoded = encode_polyline(coords)
+    assert encoded == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline(encoded) == coords
+
+
+def test_simplify_drops_collinear_points_but_keeps_corners():
+    line = [[127.0 + i * 0.001, 37.5] for i in range(50)] + [[127.049, 37.5 + i * 0.001] for i in range(1, 50)]
+    simplified = simplify(line, tolerance_for_zoom(16))
+    assert simplified == [line[0], line[49], line[-1]]
+
+
+def test_compact_route_keeps_other_fields():
+    route = {"mode": "car", "minutes": 30, "coordinates": [[127.0, 37.5], [127.1, 37.6]]}
+    compact = compact_route(route, zoom=14)
+    assert "coordinates" not in compact and compact["minutes"] == 30
+    assert decode_polyline(compact["polyline"]) == route["coordinates"]
+    assert "coordinates" in route
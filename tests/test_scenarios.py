@@ -2,6 +2,7 @@
 import asyncio
 import os
 import sys
+import time
 
 # 프로젝트 루트를 path에 추가
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -10,48 +11,69 @@ from dotenv import load_dotenv
 from google.adk.runners import InMemoryRunner
 
 from src.agents import app
-from src.utils import events_to_text
+from src.utils import count_turns, events_to_text, memo_stats
 
 load_dotenv()
 
+# 시나리오별 모델 턴 수 / 도구 호출 수 / 소요 시간 (워크플로우 변경 전후 비교용)
+SCENARIO_METRICS: dict[str, dict] = {}
 
-async def run_scenario(name: str, query: str) -> None:
-    """단일 시나리오 실행 후 응답 출력."""
+
+async def run_scenario(name: str, query: str) -> dict:
+    """단일 시나리오 실행 후 응답과 턴 수·소요 시간 출력."""
     print(f"\n{'='*60}")
     print(f" 시나리오: {name}")
     print(f" 질의: {query}")
     print("=" * 60)
     runner = InMemoryRunner(app=app)
+    t0 = time.perf_counter()
+    metrics = {"llm_turns": None, "tool_calls": None}
     try:
         response = await runner.run_debug(query)
+        metrics = count_turns(response)
         print("\n[Kkokki 응답]")
-        print(events_to_text(response))
+        print(events_to_text(response, timings=True))
     except Exception as e:
         print(f"[오류] {e}")
+    metrics["wall_seconds"] = round(time.perf_counter() - t0, 2)
+    SCENARIO_METRICS[name] = metrics
+    print(f"\n[측정] 모델 턴 {metrics['llm_turns']}회, 도구 호출 {metrics['tool_calls']}회, {metrics['wall_seconds']}초")
+    return metrics
+
+
+def print_metrics() -> None:
+    """실행한 시나리오들의 측정값을 표로 출력."""
+    print(f"\n{'시나리오':12s} {'턴':>4s} {'도구':>4s} {'초':>7s}")
+    for name, m in SCENARIO_METRICS.items():
+        print(f"{name:12s} {m['llm_turns'] or 0:4d} {m['tool_calls'] or 0:4d} {m['wall_seconds']:7.2f}")
+    stats = memo_stats()
+    if stats:
+        print(f"\n{'도구 캐시':28s} {'적중':>4s} {'미스':>4s} {'적중률':>6s}")
+        for tool, s in stats.items():
+            print(f"{tool:28s} {s['hits']:4d} {s['misses']:4d} {s['hit_rate']:6.1%}")
+
+
+# 시나리오 이름과 질의 (부하 테스트: benchmarks.bench_scenarios도 같은 목록 사용)
+SCENARIOS = {
+    "snow": ("폭설 상황", "오늘 오전 9시에 중요한 발표가 있어. 밖에는 눈이 오고 있네. 나 언제 깨울 거야?"),
+    "late": ("지각 위기 상황", "지금 출발했는데 교통사고로 막혀서 9시 회의에 늦을 것 같아. 팀한테 좀 말해줘."),
+    "normal": ("일반 아침", "오늘 첫 일정이 10시 회의야. 나 몇 시에 일어나면 돼?"),
+}
 
 
 async def test_heavy_snow():
     """폭설 상황: 평소보다 일찍 기상 제안 확인."""
-    await run_scenario(
-        "폭설 상황",
-        "오늘 오전 9시에 중요한 발표가 있어. 밖에는 눈이 오고 있네. 나 언제 깨울 거야?",
-    )
+    await run_scenario(*SCENARIOS["snow"])
 
 
 async def test_late_crisis():
     """지각 위기 상황: 팀 알림 + 대안 경로 등 예외 처리 확인."""
-    await run_scenario(
-        "지각 위기 상황",
-        "지금 출발했는데 교통사고로 막혀서 9시 회의에 늦을 것 같아. 팀한테 좀 말해줘.",
-    )
+    await run_scenario(*SCENARIOS["late"])
 
 
 async def test_normal_morning():
     """일반 아침: 캘린더·교통 반영한 기상 시간 제안."""
-    await run_scenario(
-        "일반 아침",
-        "오늘 첫 일정이 10시 회의야. 나 몇 시에 일어나면 돼?",
-    )
+    await run_scenario(*SCENARIOS["normal"])
 
 
 if __name__ == "__main__":
@@ -64,6 +86,19 @@ if __name__ == "__main__":
         asyncio.run(test_late_crisis())
     elif scenario == "normal":
         asyncio.run(test_normal_morning())
+    elif scenario == "load":
+        # 가짜 모델로 동시 세션 부하 테스트 (Gemini 키 불필요): 추가 인자는 bench_scenarios로 전달
+        from benchmarks.bench_scenarios import main as load_main
+
+        sys.exit(load_main(sys.argv[2:]))
+    elif scenario == "all":
+        async def run_all():
+            await test_heavy_snow()
+            await test_late_crisis()
+            await test_normal_morning()
+
+        asyncio.run(run_all())
     else:
-        print("Usage: python -m tests.test_scenarios [snow|late|normal]")
+        print("Usage: python -m tests.test_scenarios [snow|late|normal|all|load]")
         asyncio.run(test_heavy_snow())
+    print_metrics()
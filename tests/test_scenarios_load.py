@@ -0,0 +1,62 @@
+"""시나리오 부하 테스트 러너 검증 — 가짜 모델의 도구 호출 순서, 동시 세션 실행, 측정값 형식."""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_scenarios import EXPECTED_TOOLS, build_runner, measure_load, measure_memory, tool_sequence
+from benchmarks.fake_llm import next_step
+from src.utils.tracing import tracer
+from src.utils import events_to_text
+from src.utils.memo import clear_memo
+
+SNOW = "오늘 오전 9시에 중요한 발표가 있어. 밖에는 눈이 오고 있네. 나 언제 깨울 거야?"
+LATE = "지금 출발했는데 교통사고로 막혀서 9시 회의에 늦을 것 같아. 팀한테 좀 말해줘."
+NORMAL = "오늘 첫 일정이 10시 회의야. 나 몇 시에 일어나면 돼?"
+
+
+def test_scripted_morning_flow():
+    first = next_step(SNOW, {})
+    assert first.function_call.name == "get_morning_snapshot"
+    assert first.function_call.args == {"conditions": "눈"}
+
+    snapshot = {"calendar": {"first_event": {"start": "09:00"}}, "traffic": {"duration_minutes": 45},
+                "weather": {"additional_minutes": 20}}
+    second = next_step(NORMAL, {"get_morning_snapshot": snapshot})
+    assert second.function_call.name == "calculate_optimal_wakeup"
+    assert second.function_call.args == {"first_event_time": "10:00", "commute_minutes": 45,
+                                         "weather_delay_minutes": 20}
+
+    final = next_step(NORMAL, {"get_morning_snapshot": snapshot,
+                               "calculate_optimal_wakeup": {"optimal_wakeup_time": "08:40"}})
+    assert final.text == "08:40에 깨워드릴까요?"
+
+
+def test_scripted_late_flow():
+    assert next_step(LATE, {}).function_call.name == "check_user_movement"
+    notify = next_step(LATE, {"check_user_movement": {"on_track": False}})
+    assert notify.function_call.name == "send_team_notification"
+    assert "09:00" in notify.function_call.args["message"]
+    assert next_step(LATE, {"check_user_movement": {}, "send_team_notification": {}}).text
+
+
+def test_scripted_runner_drives_the_real_orchestrator():
+    clear_memo()
+    events = asyncio.run(build_runner().run_debug("몇 시에 일어나?", quiet=True))
+    assert tool_sequence(events) == EXPECTED_TOOLS["morning"]
+    spans = tracer.spans(events[-1].invocation_id)
+    assert [s.kind for s in spans] == ["turn", "model", "tool", "model", "tool", "model"]
+    assert events_to_text(events).startswith("08:00에 깨워드릴까요?")   # 09:00 - 통근 45분 - 버퍼 15분
+
+    events = asyncio.run(build_runner(sensing="sequential").run_debug(NORMAL, quiet=True))
+    assert tool_sequence(events) == EXPECTED_TOOLS["morning_sequential"]
+
+
+def test_concurrent_sessions_through_one_runner():
+    result = measure_load([SNOW, LATE, NORMAL], sessions=30, concurrency=10, latency_ms=5)
+    assert result["errors"] == 0
+    assert result["model_turns_per_session"] == 3
+    assert result["p99_ms"] >= result["p50_ms"] >= 15      # 모델 턴 3회 × 5ms
+    assert result["events_to_text_us"] > 0
+    assert measure_memory([NORMAL], sessions=10, concurrency=5)["retained_kb_per_session"] > 0
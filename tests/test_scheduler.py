@@ -0,0 +1,124 @@
+"""MonitorScheduler / per-job monitoring 테스트 — TMAP 호출 없이 스텁으로 검증."""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.scheduler import MonitorScheduler, MonitorJob
+from engine import KkokkiEngine
+
+START = {"name": "A", "lat": 37.49, "lon": 127.02}
+END = {"name": "B", "lat": 37.56, "lon": 126.97}
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_due_checks_run_in_deadline_order():
+    order = []
+    done = threading.Event()
+
+    def check(job):
+        order.append(job.job_id)
+        if len(order) == 3:
+            done.set()
+        return None
+
+    scheduler = MonitorScheduler(check, max_workers=1)
+    scheduler.submit(MonitorJob(START, END, "09:00", job_id="late"), delay=0.15)
+    scheduler.submit(MonitorJob(START, END, "09:00", job_id="early"), delay=0.05)
+    scheduler.submit(MonitorJob(START, END, "09:00", job_id="now"))
+    assert done.wait(2)
+    assert order == ["now", "early", "late"]
+    scheduler.shutdown()
+
+
+def test_cancel_is_immediate_and_stops_rescheduling():
+    calls = []
+    scheduler = MonitorScheduler(lambda job: calls.append(job.job_id) or 0.02, max_workers=2)
+    scheduler.submit(MonitorJob(START, END, "09:00", job_id="x"))
+    assert wait_until(lambda: len(calls) >= 2)
+
+    t0 = time.perf_counter()
+    scheduler.cancel("x")
+    assert time.perf_counter() - t0 < 0.05
+    settled = len(calls)
+    time.sleep(0.1)
+    assert len(calls) <= settled + 1
+    assert not scheduler.get("x").is_running
+    scheduler.shutdown()
+
+
+def test_done_jobs_leave_the_registry():
+    def check(job):
+        if job.job_id == "fails":
+            raise RuntimeError("boom")
+        return None if job.job_id == "done" else 60
+
+    scheduler = MonitorScheduler(check, max_workers=2, keep_finished=10)
+    for i in range(100):
+        scheduler.submit(MonitorJob(START, END, "09:00", job_id=f"j{i}"), delay=60)
+        scheduler.cancel(f"j{i}")
+    scheduler.submit(MonitorJob(START, END, "09:00", job_id="done"))
+    scheduler.submit(MonitorJob(START, END, "09:00", job_id="fails"))
+    scheduler.submit(MonitorJob(START, END, "09:00", job_id="live"))
+    assert wait_until(lambda: [job.job_id for job in scheduler.jobs()] == ["live"])
+
+    assert scheduler.active_count() == 1
+    assert len(scheduler.finished()) == 10          # bounded
+    assert scheduler.get("fails").status == "ERROR"  # final state still visible
+    assert scheduler.get("j0") is None
+    scheduler.shutdown()
+
+
+def test_engine_jobs_keep_their_own_settings():
+    engine = KkokkiEngine()
+    engine.calculate_route = lambda s, e, mode='car': {"minutes": 30, "distance": 10.0}
+    engine.start_monitoring(START, END, "09:00", job_id="u1", prep_time=10, buffer_time=5)
+    engine.start_monitoring(START, END, "09:00", job_id="u2", prep_time=50, buffer_time=0)
+    assert wait_until(lambda: engine.get_status("u1")["latest_result"]
+                      and engine.get_status("u2")["latest_result"])
+
+    r1 = engine.get_status("u1")["latest_result"]
+    r2 = engine.get_status("u2")["latest_result"]
+    assert (r1["prep_time"], r1["buffer_time"]) == (10, 5)
+    assert (r2["prep_time"], r2["buffer_time"]) == (50, 0)
+
+    engine.stop_monitoring("u1")
+    assert engine.get_status("u1")["is_running"] is False
+    assert engine.get_status("u2")["is_running"] is True
+    engine.scheduler.shutdown()
+
+
+def test_sampler_backs_off_when_stable_and_tightens_when_volatile():
+    from core.sampler import AdaptiveSampler
+
+    stable = AdaptiveSampler(check_count=5, window=3)
+    volatile = AdaptiveSampler(check_count=5, window=3)
+    for i, (a, b) in enumerate([(30, 30), (30, 36), (31, 44)]):
+        stable.record(a, at=i * 600)
+        volatile.record(b, at=i * 600)
+    assert stable.next_interval(6000, 9000) > 6000 / 5
+    assert volatile.next_interval(6000, 9000) < 6000 / 5
+
+
+def test_sampler_stops_after_alert_departure_or_budget():
+    from core.sampler import AdaptiveSampler
+
+    sampler = AdaptiveSampler(max_calls=2)
+    assert sampler.next_interval(600, 1200, alert_fired=True) is None
+    assert sampler.stop_reason == "alert_sent"
+    assert sampler.next_interval(-60, 0) is None
+    assert sampler.stop_reason == "departed"
+    sampler.record(30)
+    sampler.record(30)
+    assert sampler.next_interval(600, 1200) is None
+    assert sampler.stop_reason == "budget_exhausted"
@@ -0,0 +1,77 @@
+"""아침 스냅샷 도구 테스트 — 일정·교통·날씨 동시 조회, 개별 실패 격리, 턴 수 집계 검증."""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.tools import sensing_tools
+from src.tools.sensing_tools import get_morning_snapshot
+from src.utils import clear_memo, count_turns
+
+
+@pytest.fixture(autouse=True)
+def fresh_memo():
+    clear_memo()
+    yield
+    clear_memo()
+
+
+def slow(result, delay=0.2):
+    def call(**kwargs):
+        time.sleep(delay)
+        return dict(result)
+    return call
+
+
+def test_snapshot_runs_sensing_calls_concurrently(monkeypatch):
+    monkeypatch.setattr(sensing_tools, "get_calendar_schedule", slow({"first_event": {"start": "09:00"}}))
+    monkeypatch.setattr(sensing_tools, "get_realtime_traffic", slow({"duration_minutes": 45}))
+    monkeypatch.setattr(sensing_tools, "get_weather_impact", slow({"additional_minutes": 20}))
+
+    t0 = time.perf_counter()
+    snapshot = get_morning_snapshot(conditions="눈")
+    elapsed = time.perf_counter() - t0
+
+    assert elapsed < 0.45   # 순차 실행이면 0.6초 이상
+    assert snapshot["calendar"]["first_event"]["start"] == "09:00"
+    assert snapshot["traffic"]["duration_minutes"] == 45
+    assert snapshot["weather"]["additional_minutes"] == 20
+    assert snapshot["elapsed_ms"] < 450
+
+
+def test_snapshot_isolates_a_failing_call(monkeypatch):
+    def broken(**kwargs):
+        raise RuntimeError("weather api down")
+
+    monkeypatch.setattr(sensing_tools, "get_weather_impact", broken)
+    snapshot = get_morning_snapshot()
+    assert snapshot["weather"] == {"success": False, "error": "weather api down"}
+    assert snapshot["traffic"]["duration_minutes"] == 45
+    assert snapshot["calendar"]["first_event"]["start"] == "09:00"
+
+
+def test_snapshot_passes_conditions_to_weather():
+    snapshot = get_morning_snapshot(conditions="폭설")
+    assert snapshot["weather"]["additional_minutes"] == 20
+
+
+def test_count_turns():
+    def event(author, *parts):
+        return SimpleNamespace(author=author, content=SimpleNamespace(parts=list(parts)))
+
+    call = SimpleNamespace(function_call=SimpleNamespace(name="get_morning_snapshot"), text=None)
+    reply = SimpleNamespace(function_response=SimpleNamespace(response={}), function_call=None, text=None)
+    text = SimpleNamespace(function_call=None, text="07:10에 깨워드릴까요?")
+    events = [
+        event("user", SimpleNamespace(text="몇 시에 일어나?", function_call=None)),
+        event("KkokkiOrchestrator", call),
+        event("KkokkiOrchestrator", reply),
+        event("KkokkiOrchestrator", call, call),
+        event("KkokkiOrchestrator", reply, reply),
+        event("KkokkiOrchestrator", text),
+    ]
+    assert count_turns(events) == {"llm_turns": 3, "tool_calls": 3}
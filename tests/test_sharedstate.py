@@ -0,0 +1,156 @@
+"""공유 상태 테스트 — 모니터 프로세스가 게시한 작업 상태·이벤트를 웹 워커가 읽고, 시작/중지 명령을 전달하는지 검증."""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.scheduler import MonitorJob
+from core.sharedstate import SharedState, StatePublisher
+from engine import KkokkiEngine
+
+START = {"name": "A", "lat": 37.49, "lon": 127.02}
+END = {"name": "B", "lat": 37.56, "lon": 126.97}
+
+
+def make_pair(tmp_path):
+    engine = KkokkiEngine()
+    path = str(tmp_path / "state.db")
+    return engine, StatePublisher(engine, path), SharedState(path)
+
+
+def test_published_status_matches_engine(tmp_path):
+    engine, publisher, state = make_pair(tmp_path)
+    assert state.get_status("u1")["status"] == "STANDBY"
+
+    job = MonitorJob(START, END, "09:00", job_id="u1")
+    engine.scheduler.submit(job, delay=3600)
+    job.status = "MONITORING"
+    job.latest_result = {"travel_minutes": 42, "is_late": False}
+    engine.log("checked", job_id="u1")
+    engine.log("for someone else", job_id="u2")
+    assert publisher.publish()
+    assert not publisher.publish()   # nothing changed, no new version
+
+    status = state.get_status("u1")
+    expected = engine.get_status("u1")
+    for key in ("is_running", "status", "latest_result"):
+        assert status[key] == expected[key]
+    assert status["logs"][-1].endswith("checked")
+    assert all("someone else" not in line for line in status["logs"])
+    assert state.active_count() == 1
+    assert state.job_statuses() == [("MONITORING", 1)]
+
+    job.status = "LATE_RISK"
+    publisher.publish()
+    assert state.get_status("u1")["status"] == "LATE_RISK"   # cache follows the version
+    engine.scheduler.shutdown()
+
+
+def test_events_since_and_last_seq(tmp_path):
+    engine, publisher, state = make_pair(tmp_path)
+    for i in range(3):
+        engine.log(f"event {i}", job_id="u1")
+    publisher.publish()
+    events = state.events.since(0)
+    assert [e["message"] for e in events][-3:] == ["event 0", "event 1", "event 2"]
+    assert state.events.last_seq == events[-1]["seq"]
+    assert state.events.since(events[-2]["seq"]) == events[-1:]
+
+
+def test_feed_wakes_waiters_on_publish(tmp_path):
+    engine, publisher, state = make_pair(tmp_path)
+    seen = state.feed.version
+    assert state.feed.wait(seen, timeout=0.05) == seen   # times out unchanged
+
+    woke = {}
+
+    def waiter():
+        woke["version"] = state.feed.wait(seen, timeout=2)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    engine.log("change")
+    publisher.publish()
+    thread.join()
+    assert woke["version"] == seen + 1
+
+
+def test_commands_run_in_the_publisher_process(tmp_path, monkeypatch):
+    engine, publisher, state = make_pair(tmp_path)
+    started = []
+    monkeypatch.setattr(engine, "start_monitoring", lambda **job: started.append(job))
+    job = MonitorJob(START, END, "09:00", job_id="u2")
+    engine.scheduler.submit(job, delay=3600)
+
+    state.submit("start", start_name="강남역", end_name="서울시청", arrival_time="09:00", job_id="u1")
+    state.submit("stop", job_id="u2")
+    assert publisher.apply_commands() == 2
+    assert started == [{"start_name": "강남역", "end_name": "서울시청", "arrival_time": "09:00", "job_id": "u1"}]
+    assert job.cancelled
+    assert publisher.apply_commands() == 0   # each command runs once
+
+    publisher.publish()
+    assert state.get_status("u2")["status"] == "STANDBY"
+    engine.scheduler.shutdown()
+
+
+def test_version_survives_publisher_restart(tmp_path):
+    engine, publisher, state = make_pair(tmp_path)
+    engine.log("before restart")
+    publisher.publish()
+    version = state.version
+
+    restarted = StatePublisher(KkokkiEngine(), publisher.path)
+    restarted.engine.log("after restart")
+    restarted.publish()
+    assert state.version == version + 1
+    assert state.events.tail(1)[0]["message"] == "after restart"
+
+
+def test_job_versions_ignore_other_jobs(tmp_path):
+    engine, publisher, state = make_pair(tmp_path)
+    engine.log("about u1", job_id="u1")
+    publisher.publish()
+    v1 = state.get_status("u1")["version"]
+
+    engine.log("about u2", job_id="u2")
+    publisher.publish()
+    assert state.get_status("u1")["version"] == state.feed.version_of("u1") == v1
+    assert state.feed.wait(v1, timeout=0.05, key="u1") == v1
+    assert state.feed.version_of("u2") > v1
+
+    engine.log("for everyone")
+    publisher.publish()
+    assert state.feed.version_of("u1") == state.version
+
+
+def test_departed_jobs_are_deleted_and_the_cache_is_bounded(tmp_path):
+    engine, publisher, _ = make_pair(tmp_path)
+    state = SharedState(publisher.path, cache_size=8)
+    jobs = [MonitorJob(START, END, "09:00", job_id=f"u{i}") for i in range(3)]
+    for job in jobs:
+        engine.scheduler.submit(job, delay=3600)
+        job.status = "MONITORING"
+    publisher.publish()
+    v1 = state.get_status("u1")["version"]
+    assert len(state.job_statuses()) == 3
+
+    engine.stop_monitoring("u1")
+    assert publisher.publish()
+    assert state.get_status("u1")["status"] == "STANDBY"
+    assert state.get_status("u1")["version"] > v1       # its readers are woken
+    assert sorted(state.job_statuses()) == [("MONITORING", 1)] * 2
+    assert set(publisher._fingerprints) == {"u0", "u2"}
+
+    # A restarted publisher drops rows left by jobs it never saw
+    engine.scheduler.shutdown()
+    restarted = StatePublisher(KkokkiEngine(), publisher.path)
+    assert restarted.publish()
+    assert state.job_statuses() == []
+
+    for i in range(20):
+        state.get_status(f"x{i}")
+    assert len(state._cache) == 8
@@ -0,0 +1,39 @@
+"""오프라인 스텁 서버 테스트 — 실제 키 없이 엔진이 TMAP 스텁 응답을 파싱하고 오류 주입을 처리하는지 검증."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.stub_server import StubServer
+from engine import KkokkiEngine
+
+
+@pytest.fixture
+def stub_engine(monkeypatch):
+    stub = StubServer(seed=3).start()
+    monkeypatch.setenv("KKOKKI_TMAP_URL", stub.url)
+    monkeypatch.setenv("SK_API_KEY", "stub")
+    yield stub, KkokkiEngine()
+    stub.stop()
+
+
+def test_engine_parses_replayed_tmap_responses(stub_engine):
+    stub, engine = stub_engine
+    start, end = {"lat": 37.4979, "lon": 127.0276}, {"lat": 37.5663, "lon": 126.9780}
+
+    assert engine.search_locations("강남역")[0]["name"] == "강남역 2호선"
+    assert engine.reverse_geocode(37.5663, 126.9780)["name"] == "서울특별시청"
+    car = engine.calculate_route(start, end, "car")
+    assert car["minutes"] == 33 and len(car["coordinates"]) > 100
+    assert engine.calculate_route(start, end, "transit")["route_options"]
+    assert stub.snapshot()["car"]["hits"] == 1
+
+
+def test_injected_errors_surface_as_upstream_failures(stub_engine):
+    stub, engine = stub_engine
+    stub.error_rate = 1.0
+    with pytest.raises(Exception, match="503"):
+        engine.calculate_route({"lat": 37.1, "lon": 127.1}, {"lat": 37.2, "lon": 127.2}, "walk")
+    assert stub.snapshot()["walk"]["errors"] >= 1
@@ -0,0 +1,106 @@
+"""스팬 트레이싱 테스트 — 턴·모델·도구 스팬 연결, JSON 내보내기, 소요 시간 분석, 비동기 로깅 검증."""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils import events_to_text, logger as logger_module
+from src.utils.memo import clear_memo
+from src.utils.tracing import Tracer, breakdown, format_breakdown, tracer
+
+
+def test_spans_link_to_turn_and_record_duration(tmp_path):
+    t = Tracer(sink_path=str(tmp_path / "traces.jsonl"))
+    turn = t.start("turn", "agent_turn", "inv-1", key="inv-1", query="몇 시에 일어나?")
+    with t.span("model", "gemini", parent=turn):
+        time.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with t.span("tool", "get_weather_impact", parent=turn, region="서울"):
+            raise RuntimeError("weather down")
+    t.end("turn", "inv-1")
+    assert t.end("turn", "inv-1") is None      # 중복 종료는 무시
+
+    spans = t.spans("inv-1")
+    assert [s.kind for s in spans] == ["turn", "model", "tool"]
+    assert all(s.parent_id == turn.span_id for s in spans[1:])
+    assert spans[1].duration_ms >= 10
+    assert spans[2].status == "error" and spans[2].error == "weather down"
+    assert spans[2].attributes == {"region": "서울"}
+
+    path = tmp_path / "trace.json"
+    assert t.export_json(str(path), "inv-1") == 3
+    exported = json.loads(path.read_text(encoding="utf-8"))["spans"]
+    assert exported[0]["attributes"]["query"] == "몇 시에 일어나?"
+
+    t.write_trace("inv-1")
+    line = json.loads((tmp_path / "traces.jsonl").read_text(encoding="utf-8"))
+    assert line["trace_id"] == "inv-1" and len(line["spans"]) == 3
+
+
+def test_breakdown_sums_by_kind_and_tool():
+    t = Tracer()
+    turn = t.start("turn", "agent_turn", "inv", key="inv")
+    for name in ("get_morning_snapshot", "calculate_optimal_wakeup", "get_morning_snapshot"):
+        with t.span("tool", name, parent=turn):
+            pass
+    with t.span("model", "gemini", parent=turn):
+        time.sleep(0.005)
+    t.end("turn", "inv")
+
+    summary = breakdown(t.spans("inv"))
+    assert summary["kinds"]["tool"]["count"] == 3
+    assert summary["tools"]["get_morning_snapshot"]["count"] == 2
+    assert summary["total_ms"] >= summary["kinds"]["model"]["ms"]
+    text = format_breakdown(t.spans("inv"))
+    assert "모델 호출 1회" in text and "- get_morning_snapshot 2회" in text
+
+
+def test_logging_goes_through_queue():
+    logger = logging.getLogger("src.tools.maps_tools")
+    handlers = [type(h) for h in logger_module.get_logger("src.tools.maps_tools").handlers]
+    assert handlers == [logging.handlers.QueueHandler]
+    assert logger_module._listener is not None
+    logger_module.flush_logs()
+    assert logger_module._listener is not None   # flush 후 다시 출력 가능
+
+
+def test_agent_run_produces_turn_model_and_tool_spans():
+    from google.adk.apps import App
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from src.agents.kkokki_orchestrator import get_kkokki_agent
+    from src.agents.tracing_plugin import TracingPlugin
+
+    class SnapshotThenAnswer(BaseLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            if any(p.function_response for p in llm_request.contents[-1].parts):
+                part = types.Part(text="07:10에 깨워드릴까요?")
+            else:
+                part = types.Part(function_call=types.FunctionCall(name="get_morning_snapshot", args={}))
+            yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+    clear_memo()
+    agent = get_kkokki_agent()
+    agent.model = SnapshotThenAnswer(model="scripted")
+    runner = InMemoryRunner(app=App(name="kkokki", root_agent=agent, plugins=[TracingPlugin()]))
+    events = asyncio.run(runner.run_debug("몇 시에 일어나?", quiet=True))
+
+    trace_id = events[-1].invocation_id
+    spans = tracer.spans(trace_id)
+    assert [s.kind for s in spans] == ["turn", "model", "tool", "model"]
+    assert spans[2].name == "get_morning_snapshot"
+    assert spans[1].attributes["function_calls"] == ["get_morning_snapshot"]
+    assert {s.parent_id for s in spans[1:]} == {spans[0].span_id}
+
+    text = events_to_text(events, timings=True)
+    assert text.startswith("07:10에 깨워드릴까요?")
+    assert "[소요 시간]" in text and "- get_morning_snapshot 1회" in text
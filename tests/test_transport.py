@@ -0,0 +1,89 @@
+"""HttpTransport 테스트 — 로컬 HTTP 서버로 재시도/커넥션 재사용/타임아웃 검증."""
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.transport import HttpTransport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    plan = []
+
+    def do_GET(self):
+        status, delay = self.plan.pop(0) if self.plan else (200, 0)
+        time.sleep(delay)
+        body = b'{"ok": true}'
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", _Handler.plan
+    httpd.shutdown()
+    _Handler.plan.clear()
+
+
+def test_retries_5xx_and_429_then_succeeds(server):
+    url, plan = server
+    plan.extend([(503, 0), (429, 0)])
+    transport = HttpTransport(max_retries=2, backoff_base=0.001)
+    assert transport.get(url).status_code == 200
+    stats = transport.stats()[url.split("//")[1]]
+    assert stats["requests"] == 3
+    assert stats["retries"] == 2
+
+
+def test_keep_alive_reuses_one_connection(server):
+    url, _ = server
+    transport = HttpTransport()
+    for _ in range(5):
+        transport.get(url)
+    stats = transport.stats()[url.split("//")[1]]
+    assert stats["requests"] == 5
+    assert stats["new_connections"] == 1
+
+
+def test_read_timeout_bounds_a_hung_server(server):
+    url, plan = server
+    plan.append((200, 1.0))
+    transport = HttpTransport(read_timeout=0.1, max_retries=0)
+    t0 = time.perf_counter()
+    with pytest.raises(requests.Timeout):
+        transport.get(url)
+    assert time.perf_counter() - t0 < 0.8
+
+
+def test_falls_back_to_the_next_resolved_address(server, monkeypatch):
+    url, _ = server
+    port = int(url.rsplit(":", 1)[1])
+    resolve = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        if host == "kkokki.test":   # first address refuses, second is the server
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.2", port)),
+                    (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+        return resolve(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    transport = HttpTransport(max_retries=0)
+    assert transport.get(f"http://kkokki.test:{port}").status_code == 200
+    assert transport.stats()[f"kkokki.test:{port}"]["new_connections"] == 1